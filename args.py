@@ -17,6 +17,20 @@
 
 from argparse import ArgumentParser
 
+from options import (
+    CORPORA,
+    DEFAULT_BENCHMARK_ENGINES,
+    DEFAULT_BOX_SIZES,
+    DEFAULT_CORPUS_TIMEOUT,
+    DEFAULT_ENGINE,
+    DEFAULT_FORMAT,
+    DEFAULT_OUTPUT_FILE,
+    DEFAULT_STARTUP_TARGET,
+    DEFAULT_THRESHOLD,
+    ENGINE_NAMES,
+    FORMATS,
+)
+
 
 class Args:
     """
@@ -44,6 +58,83 @@ class Args:
 
         gui_parser = subparsers.add_parser("gui", help="use the PyQt GUI")
         gui_parser.set_defaults(gui=True)
+        gui_parser.add_argument(
+            "--replay",
+            dest="replay",
+            help="load a trace saved with --trace, ready to replay",
+            metavar="trace.sdkt",
+            required=False,
+            default=None,
+        )
+
+        serve_parser = subparsers.add_parser(
+            "serve", help="solve puzzles sent over HTTP/JSON, on localhost"
+        )
+        serve_parser.set_defaults(serve=True)
+        serve_parser.add_argument(
+            "--host",
+            dest="host",
+            help="address to listen on, only this machine by default",
+            metavar="ADDRESS",
+            required=False,
+            default="127.0.0.1",
+        )
+        serve_parser.add_argument(
+            "--port",
+            dest="port",
+            help="port to listen on, 0 for any free one",
+            metavar="N",
+            required=False,
+            default=8080,
+            type=int,
+        )
+        serve_parser.add_argument(
+            "-w",
+            "--workers",
+            dest="workers",
+            help="number of processes to solve across, 0 for one per cpu",
+            metavar="N",
+            required=False,
+            default=0,
+            type=int,
+        )
+        serve_parser.add_argument(
+            "-e",
+            "--engine",
+            dest="engine",
+            help="solving engine for requests that don't pick one",
+            metavar=f"<{'|'.join(ENGINE_NAMES)}>",
+            required=False,
+            default=DEFAULT_ENGINE,
+            choices=ENGINE_NAMES,
+        )
+        serve_parser.add_argument(
+            "--timeout",
+            dest="timeout",
+            help="most seconds a request can take, queueing included",
+            metavar="SECONDS",
+            required=False,
+            default=10,
+            type=float,
+        )
+        serve_parser.add_argument(
+            "--queue-size",
+            dest="queue_size",
+            help="requests waiting or being solved before more are turned away",
+            metavar="N",
+            required=False,
+            default=256,
+            type=int,
+        )
+        serve_parser.add_argument(
+            "--max-batch",
+            dest="max_batch",
+            help="most puzzles in one batch request",
+            metavar="N",
+            required=False,
+            default=1000,
+            type=int,
+        )
 
         headless_parser = subparsers.add_parser(
             "headless", help="run solely in command prompt"
@@ -60,13 +151,33 @@ class Args:
             default="stdout",
             choices=("stdout", "file"),
         )
+        headless_parser.add_argument(
+            "--output-file",
+            dest="output_file",
+            help="file to write to, implies --output file (which writes to "
+            f"{DEFAULT_OUTPUT_FILE})",
+            metavar="solutions.txt",
+            required=False,
+            default=None,
+        )
+        headless_parser.add_argument(
+            "--format",
+            dest="format",
+            help="how to write each solution, packed needs a file and 9x9 puzzles, "
+            "diff is just the filled in cells",
+            metavar=f"<{'|'.join(FORMATS)}>",
+            required=False,
+            default=DEFAULT_FORMAT,
+            choices=FORMATS,
+        )
 
         headless_oneliner_parser = subparsers.add_parser(
             "oneliner", help="input puzzle as oneliner on command line"
         )
         headless_oneliner_parser.add_argument(
             "oneliner",
-            help="puzzle onliner in csv format, 0 = unknown",
+            help="puzzle onliner in csv format, 0 = unknown, 81 cells for a 9x9 or "
+            "256/625 for a 16x16/25x25",
             metavar="0,1,9,3,0...",
         )
 
@@ -79,4 +190,393 @@ class Args:
             metavar="puzzle.txt",
         )
 
+        headless_batch_parser = subparsers.add_parser(
+            "batch", help="solve a file of puzzles, one oneliner per line"
+        )
+        headless_batch_parser.add_argument(
+            "batch",
+            help="path to file with one puzzle per line, - or nothing for stdin",
+            metavar="puzzles.txt",
+            nargs="?",
+            default="-",
+        )
+        headless_batch_parser.add_argument(
+            "--start",
+            dest="start",
+            help="skip to puzzle K first, jumps straight there for packed files",
+            metavar="K",
+            required=False,
+            default=0,
+            type=int,
+        )
+        headless_batch_parser.add_argument(
+            "--count",
+            dest="count",
+            help="only solve N puzzles",
+            metavar="N",
+            required=False,
+            default=None,
+            type=int,
+        )
+        headless_batch_parser.add_argument(
+            "-w",
+            "--workers",
+            dest="workers",
+            help="number of processes to solve across, 0 for one per cpu",
+            metavar="N",
+            required=False,
+            default=1,
+            type=int,
+        )
+        headless_batch_parser.add_argument(
+            "--vectorized",
+            dest="vectorized",
+            help="fill in singles for blocks of puzzles at once with numpy",
+            required=False,
+            action="store_true",
+        )
+        headless_batch_parser.add_argument(
+            "--unordered",
+            dest="ordered",
+            help="with workers, output each result as soon as it's done",
+            required=False,
+            action="store_false",
+        )
+
+        headless_stream_parser = subparsers.add_parser(
+            "stream",
+            help="solve JSON-lines requests from stdin, one JSON-lines response each "
+            "on stdout",
+        )
+        headless_stream_parser.set_defaults(stream=True)
+        headless_stream_parser.add_argument(
+            "-e",
+            "--engine",
+            dest="engine",
+            help="solving engine for requests that don't pick one",
+            metavar=f"<{'|'.join(ENGINE_NAMES)}>",
+            required=False,
+            default=DEFAULT_ENGINE,
+            choices=ENGINE_NAMES,
+        )
+        headless_stream_parser.add_argument(
+            "--timeout",
+            dest="timeout",
+            help="seconds for requests that don't give a timeout",
+            metavar="SECONDS",
+            required=False,
+            default=None,
+            type=float,
+        )
+        headless_stream_parser.add_argument(
+            "--max-operations",
+            dest="max_operations",
+            help="operations for requests that don't give max_operations",
+            metavar="N",
+            required=False,
+            default=None,
+            type=int,
+        )
+        headless_stream_parser.add_argument(
+            "--flush-every",
+            dest="flush_every",
+            help="responses written between flushes, 1 flushes every line",
+            metavar="N",
+            required=False,
+            default=1,
+            type=int,
+        )
+
+        headless_convert_parser = subparsers.add_parser(
+            "convert",
+            help="convert oneliners (one per line) to a packed file, or back again",
+        )
+        headless_convert_parser.add_argument(
+            "convert",
+            help="file to convert, packed files are detected from their header",
+            metavar="puzzles.txt",
+        )
+        headless_convert_parser.add_argument(
+            "destination",
+            help="file to write the converted puzzles to",
+            metavar="puzzles.sdkp",
+        )
+
+        headless_generate_parser = subparsers.add_parser(
+            "generate", help="make puzzles that each have exactly one solution"
+        )
+        headless_generate_parser.add_argument(
+            "generate",
+            help="file to write the puzzles to, one oneliner per line, - or nothing "
+            "for stdout",
+            metavar="puzzles.txt",
+            nargs="?",
+            default="-",
+        )
+        headless_generate_parser.add_argument(
+            "-n",
+            "--count",
+            dest="count",
+            help="how many puzzles to make",
+            metavar="N",
+            required=False,
+            default=1,
+            type=int,
+        )
+        headless_generate_parser.add_argument(
+            "--empty",
+            dest="empty",
+            help="fraction of each board to hide, a target as the puzzle has to stay "
+            "unique",
+            metavar="0.5",
+            required=False,
+            default=0.5,
+            type=float,
+        )
+        headless_generate_parser.add_argument(
+            "--seed",
+            dest="seed",
+            help="same seed, same puzzles, whatever the number of workers",
+            metavar="N",
+            required=False,
+            default=None,
+            type=int,
+        )
+        headless_generate_parser.add_argument(
+            "-w",
+            "--workers",
+            dest="workers",
+            help="number of processes to generate across, 0 for one per cpu",
+            metavar="N",
+            required=False,
+            default=1,
+            type=int,
+        )
+        headless_generate_parser.add_argument(
+            "--box-size",
+            dest="box_size",
+            help="3 for 9x9 puzzles, 4 for 16x16",
+            metavar="N",
+            required=False,
+            default=3,
+            type=int,
+        )
+        headless_generate_parser.add_argument(
+            "--packed",
+            dest="packed",
+            help="write a packed file rather than oneliners, 9x9 only",
+            required=False,
+            action="store_true",
+        )
+        headless_generate_parser.add_argument(
+            "--solutions",
+            dest="solutions",
+            help="also write each puzzle's solution to this file, same format",
+            metavar="solutions.txt",
+            required=False,
+            default=None,
+        )
+
+        headless_benchmark_parser = subparsers.add_parser(
+            "benchmark", help="time the engines on generated puzzles of each size"
+        )
+        headless_benchmark_parser.set_defaults(benchmark=True)
+        headless_benchmark_parser.add_argument(
+            "--sizes",
+            dest="box_sizes",
+            help="box sizes, 3 = 9x9, 4 = 16x16, 5 = 25x25 (try --empty 0.45)",
+            metavar="N",
+            required=False,
+            default=DEFAULT_BOX_SIZES,
+            nargs="+",
+            type=int,
+        )
+        headless_benchmark_parser.add_argument(
+            "--engines",
+            dest="engines",
+            help="engines to time, backtrack and dlx can take minutes on a 25x25",
+            metavar="ENGINE",
+            required=False,
+            default=DEFAULT_BENCHMARK_ENGINES,
+            nargs="+",
+            choices=ENGINE_NAMES,
+        )
+        headless_benchmark_parser.add_argument(
+            "--count",
+            dest="count",
+            help="puzzles for each size",
+            metavar="N",
+            required=False,
+            default=5,
+            type=int,
+        )
+        headless_benchmark_parser.add_argument(
+            "--empty",
+            dest="empty",
+            help="fraction of each board to blank out",
+            metavar="0.55",
+            required=False,
+            default=0.55,
+            type=float,
+        )
+        headless_benchmark_parser.add_argument(
+            "--seed",
+            dest="seed",
+            help="same seed, same puzzles",
+            metavar="N",
+            required=False,
+            default=0,
+            type=int,
+        )
+        headless_benchmark_parser.add_argument(
+            "--corpus",
+            dest="corpora",
+            help="run the bundled puzzles (every corpus if none are named) rather "
+            "than generated ones, for latency percentiles and peak memory",
+            metavar=f"<{'|'.join(CORPORA)}>",
+            required=False,
+            default=None,
+            nargs="*",
+            choices=CORPORA,
+        )
+        headless_benchmark_parser.add_argument(
+            "--timeout",
+            dest="timeout",
+            help="with --corpus, give up on a puzzle after this many seconds",
+            metavar="SECONDS",
+            required=False,
+            default=DEFAULT_CORPUS_TIMEOUT,
+            type=float,
+        )
+        headless_benchmark_parser.add_argument(
+            "--no-memory",
+            dest="memory",
+            help="with --corpus, skip the second run that measures peak memory",
+            required=False,
+            action="store_false",
+        )
+        headless_benchmark_parser.add_argument(
+            "--save",
+            dest="save",
+            help="with --corpus, write the results to a JSON baseline",
+            metavar="baseline.json",
+            required=False,
+            default=None,
+        )
+        headless_benchmark_parser.add_argument(
+            "--compare",
+            dest="compare",
+            help="with --corpus, fail if anything is worse than this baseline",
+            metavar="baseline.json",
+            required=False,
+            default=None,
+        )
+        headless_benchmark_parser.add_argument(
+            "--threshold",
+            dest="threshold",
+            help="with --compare, how much worse is a regression, 0.25 = 25%%",
+            metavar="0.25",
+            required=False,
+            default=DEFAULT_THRESHOLD,
+            type=float,
+        )
+        headless_benchmark_parser.add_argument(
+            "--startup",
+            dest="startup",
+            help="time `headless oneliner` from launch to exit instead, with what "
+            "it imports from -X importtime",
+            required=False,
+            action="store_true",
+        )
+        headless_benchmark_parser.add_argument(
+            "--target",
+            dest="target",
+            help="with --startup, fail if the median launch takes longer",
+            metavar="SECONDS",
+            required=False,
+            default=DEFAULT_STARTUP_TARGET,
+            type=float,
+        )
+
+        for engine_parser in (
+            headless_oneliner_parser,
+            headless_file_parser,
+            headless_batch_parser,
+        ):
+            engine_parser.add_argument(
+                "-e",
+                "--engine",
+                dest="engine",
+                help="solving engine to use",
+                metavar=f"<{'|'.join(ENGINE_NAMES)}>",
+                required=False,
+                default=DEFAULT_ENGINE,
+                choices=ENGINE_NAMES,
+            )
+            engine_parser.add_argument(
+                "--cache-size",
+                dest="cache_size",
+                help="cache solutions in memory, up to N puzzles",
+                metavar="N",
+                required=False,
+                default=None,
+                type=int,
+            )
+            engine_parser.add_argument(
+                "--cache-file",
+                dest="cache_file",
+                help="keep the solution cache in a SQLite file between runs",
+                metavar="cache.db",
+                required=False,
+                default=None,
+            )
+            engine_parser.add_argument(
+                "--timeout",
+                dest="timeout",
+                help="give up on a puzzle after this many seconds",
+                metavar="SECONDS",
+                required=False,
+                default=None,
+                type=float,
+            )
+            engine_parser.add_argument(
+                "--max-operations",
+                dest="max_operations",
+                help="give up on a puzzle after this many operations",
+                metavar="N",
+                required=False,
+                default=None,
+                type=int,
+            )
+            engine_parser.add_argument(
+                "--metrics",
+                dest="metrics",
+                help="count nodes, guesses, validations, backtracks and "
+                "propagations, the solve is slower with it on",
+                required=False,
+                action="store_true",
+            )
+            engine_parser.add_argument(
+                "--metrics-json",
+                dest="metrics_json",
+                help="write the metrics to a file as JSON, turns on --metrics",
+                metavar="metrics.json",
+                required=False,
+                default=None,
+            )
+
+        for trace_parser in (
+            gui_parser,
+            headless_oneliner_parser,
+            headless_file_parser,
+        ):
+            trace_parser.add_argument(
+                "--trace",
+                dest="trace",
+                help="save every step of the solve to a file, to replay in the gui",
+                metavar="trace.sdkt",
+                required=False,
+                default=None,
+            )
+
         return parser.parse_args()
@@ -0,0 +1,569 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+from board import Board
+from budget import Budget, BudgetExceeded, solve_within
+from file import FileUtils
+from options import (
+    CORPORA,
+    DEFAULT_BENCHMARK_ENGINES,
+    DEFAULT_BOX_SIZES,
+    DEFAULT_CORPUS_TIMEOUT,
+    DEFAULT_STARTUP_TARGET,
+    DEFAULT_THRESHOLD,
+)
+from run import ENGINES, Run
+
+# Where the `CORPORA` are
+CORPUS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+# Timings a puzzle closer than this many seconds to the baseline are put down to
+# noise, the easy puzzles take well under a millisecond each
+TIMING_NOISE = 0.001
+
+# Result keys compared against a baseline, and whether bigger is better
+COMPARED = {
+    "solved": True,
+    "puzzles_per_second": True,
+    "p50": False,
+    "p99": False,
+    "operations": False,
+    "peak_memory": False,
+}
+
+BASELINE_VERSION = 1
+
+# `main.py` next to this file, what `benchmark_startup()` launches
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+# Launches timed for `benchmark_startup()`, startup is noisy so the median is used
+DEFAULT_STARTUP_RUNS = 10
+
+
+def make_puzzle(box_size, empty_fraction, rng):
+    """Make a puzzle of any size to benchmark with, a pattern solution shuffled
+    (bands, rows in bands, stacks, columns in stacks and digits) with cells blanked
+    at random. It may have more than one solution, which doesn't matter for timing
+
+    Parameters
+    ----------
+    box_size : int
+        3 for a 9x9 board, 4 for 16x16, 5 for 25x25...
+    empty_fraction : float
+        How much of the board to blank out, 0-1
+    rng : random.Random
+
+    Return
+    ------
+    Board
+    """
+    size = box_size * box_size
+
+    bands = rng.sample(range(box_size), box_size)
+    rows = [
+        band * box_size + row
+        for band in bands
+        for row in rng.sample(range(box_size), box_size)
+    ]
+    stacks = rng.sample(range(box_size), box_size)
+    columns = [
+        stack * box_size + column
+        for stack in stacks
+        for column in rng.sample(range(box_size), box_size)
+    ]
+    digits = rng.sample(range(1, size + 1), size)
+
+    cells = [
+        digits[(box_size * (row % box_size) + row // box_size + column) % size]
+        for row in rows
+        for column in columns
+    ]
+    for cell in rng.sample(range(size * size), round(size * size * empty_fraction)):
+        cells[cell] = 0
+
+    return Board(cells, box_size)
+
+
+def benchmark_sizes(
+    engines=DEFAULT_BENCHMARK_ENGINES,
+    box_sizes=DEFAULT_BOX_SIZES,
+    count=5,
+    empty_fraction=0.55,
+    seed=0,
+):
+    """Time each engine on the same puzzles, for each size of board
+
+    Parameters
+    ----------
+    engines : iterable[str], default=('bitmask', 'iterative')
+        Names of the engines in `ENGINES`
+    box_sizes : iterable[int], default=(3, 4)
+        Board sizes to try, 3 for a 9x9, 4 for 16x16, 5 for 25x25...
+    count : int, default=5
+        Puzzles for each size
+    empty_fraction : float, default=0.55
+        How much of each board is blanked out
+    seed : int, default=0
+        Same seed, same puzzles
+
+    Raises
+    ------
+    ValueError
+        If an engine isn't known
+
+    Yield
+    -----
+    dict
+        One per size and engine - size, engine, puzzles, solved, seconds (total
+        wall time), slowest (seconds for the slowest puzzle), puzzles_per_second
+        and operations
+    """
+    for engine in engines:
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown engine [{engine}], choose from [{', '.join(ENGINES)}]"
+            )
+
+    for box_size in box_sizes:
+        rng = random.Random(f"{seed}-{box_size}")
+        puzzles = [make_puzzle(box_size, empty_fraction, rng) for _ in range(count)]
+
+        for engine in engines:
+            solver = ENGINES[engine]()
+            budget = Budget()
+            solved = 0
+            slowest = 0
+            start_time = time.perf_counter()
+
+            for puzzle in puzzles:
+                puzzle_start_time = time.perf_counter()
+                solved += solve_within(solver, puzzle.copy(), budget)
+                slowest = max(slowest, time.perf_counter() - puzzle_start_time)
+
+            seconds = time.perf_counter() - start_time
+
+            yield {
+                "size": box_size * box_size,
+                "engine": engine,
+                "puzzles": count,
+                "solved": solved,
+                "seconds": seconds,
+                "slowest": slowest,
+                "puzzles_per_second": count / seconds if seconds else 0,
+                "operations": budget.operation_count,
+            }
+
+
+def load_corpus(name):
+    """Read one of the bundled corpora
+
+    Parameters
+    ----------
+    name : str
+        One of `CORPORA`
+
+    Raises
+    ------
+    ValueError
+        If the corpus isn't known
+
+    Return
+    ------
+    list[Board]
+    """
+    if name not in CORPORA:
+        raise ValueError(f"Unknown corpus [{name}], choose from [{', '.join(CORPORA)}]")
+
+    file_name = os.path.join(CORPUS_DIRECTORY, f"{name}.txt")
+    return [
+        Run.parse_oneliner(line.strip())
+        for line in FileUtils.read_lines(file_name)
+        if line.strip()
+    ]
+
+
+def percentile(values, fraction):
+    """Nearest rank percentile, the smallest value with at least `fraction` of
+    them at or below it
+
+    Parameters
+    ----------
+    values : list[float]
+        Sorted, smallest first
+    fraction : float
+        0-1, 0.5 for the median
+
+    Return
+    ------
+    float
+        0 if there are no values
+    """
+    if not values:
+        return 0
+
+    rank = max(1, math.ceil(len(values) * fraction))
+    return values[rank - 1]
+
+
+def peak_memory(engine, puzzles, timeout):
+    """Most memory allocated at once while solving every puzzle, measured on a
+    separate run as tracing every allocation slows the solve down a lot
+
+    Parameters
+    ----------
+    engine : str
+        Name of the engine in `ENGINES`
+    puzzles : list[Board]
+    timeout : float
+        Seconds each puzzle can take, None for no limit
+
+    Return
+    ------
+    int
+        Bytes, on top of what was allocated before the run
+    """
+    # Imported here, like json/platform/subprocess below, so `args` can read the
+    # defaults above without loading them on every startup
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        solver = ENGINES[engine]()
+        for puzzle in puzzles:
+            solve_within(solver, puzzle.copy(), Budget(timeout))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_corpora(
+    engines=DEFAULT_BENCHMARK_ENGINES,
+    corpora=CORPORA,
+    timeout=DEFAULT_CORPUS_TIMEOUT,
+    memory=True,
+):
+    """Time each engine on the bundled corpora, puzzle by puzzle
+
+    Parameters
+    ----------
+    engines : iterable[str], default=('bitmask', 'iterative')
+        Names of the engines in `ENGINES`
+    corpora : iterable[str], default=CORPORA
+        Names of the corpora to run
+    timeout : float, default=10
+        Seconds each puzzle can take before it's given up on, None for no limit
+    memory : bool, default=True
+        Also measure the peak memory, it's a second run of the corpus
+
+    Raises
+    ------
+    ValueError
+        If an engine or a corpus isn't known
+
+    Yield
+    -----
+    dict
+        One per corpus and engine - corpus, engine, puzzles, solved,
+        budget_exceeded, seconds (total wall time), puzzles_per_second, p50 and
+        p99 (seconds a puzzle), operations and peak_memory (bytes, None if not
+        measured)
+    """
+    for engine in engines:
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown engine [{engine}], choose from [{', '.join(ENGINES)}]"
+            )
+
+    for corpus in corpora:
+        puzzles = load_corpus(corpus)
+
+        for engine in engines:
+            solver = ENGINES[engine]()
+            budget = Budget(timeout)
+            solved = 0
+            budget_exceeded = 0
+            latencies = []
+
+            for puzzle in puzzles:
+                puzzle_start_time = time.perf_counter()
+                result = solve_within(solver, puzzle.copy(), budget)
+                latencies.append(time.perf_counter() - puzzle_start_time)
+
+                if isinstance(result, BudgetExceeded):
+                    budget_exceeded += 1
+                else:
+                    solved += result
+
+            seconds = sum(latencies)
+            latencies.sort()
+
+            yield {
+                "corpus": corpus,
+                "engine": engine,
+                "puzzles": len(puzzles),
+                "solved": solved,
+                "budget_exceeded": budget_exceeded,
+                "seconds": seconds,
+                "puzzles_per_second": len(puzzles) / seconds if seconds else 0,
+                "p50": percentile(latencies, 0.5),
+                "p99": percentile(latencies, 0.99),
+                "operations": budget.operation_count,
+                "peak_memory": (
+                    peak_memory(engine, puzzles, timeout) if memory else None
+                ),
+            }
+
+
+def save_baseline(rows, file_name):
+    """Write benchmark results out as a JSON baseline to compare later runs with
+
+    Parameters
+    ----------
+    rows : list[dict]
+        From `benchmark_corpora()`
+    file_name : str
+    """
+    import json
+    import platform
+
+    baseline = {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": rows,
+    }
+
+    with open(file_name, "w") as baseline_file:
+        json.dump(baseline, baseline_file, indent=2)
+        baseline_file.write("\n")
+
+
+def load_baseline(file_name):
+    """Read a baseline written by `save_baseline()`
+
+    Parameters
+    ----------
+    file_name : str
+
+    Raises
+    ------
+    ValueError
+        If it isn't a baseline, or is from a newer version
+
+    Return
+    ------
+    list[dict]
+        The results in it
+    """
+    import json
+
+    with open(file_name) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    if not isinstance(baseline, dict) or "results" not in baseline:
+        raise ValueError(f"[{file_name}] isn't a benchmark baseline")
+
+    if baseline.get("version", 0) > BASELINE_VERSION:
+        raise ValueError(
+            f"Baseline [{file_name}] is version [{baseline['version']}], only up to "
+            f"[{BASELINE_VERSION}] can be read"
+        )
+
+    return baseline["results"]
+
+
+def compare_to_baseline(rows, baseline, threshold=DEFAULT_THRESHOLD):
+    """Find every result that is worse than the baseline by more than `threshold`
+
+    Only corpus and engine pairs in both are compared. Timings are noisy, so the
+    threshold wants to be generous and per puzzle differences under `TIMING_NOISE`
+    are ignored, operations and solved counts are exact
+
+    Parameters
+    ----------
+    rows : list[dict]
+        From `benchmark_corpora()`
+    baseline : list[dict]
+        From `load_baseline()`
+    threshold : float, default=0.25
+        0.25 lets a result be up to 25% worse
+
+    Return
+    ------
+    list[dict]
+        One per regression - corpus, engine, metric, baseline, current and change
+        (the fraction it got worse by)
+    """
+    previous = {(row["corpus"], row["engine"]): row for row in baseline}
+    regressions = []
+
+    for row in rows:
+        old = previous.get((row["corpus"], row["engine"]))
+        if old is None:
+            continue
+
+        for metric, bigger_is_better in COMPARED.items():
+            before = old.get(metric)
+            after = row.get(metric)
+            if before is None or after is None:
+                continue
+
+            # Cut off by the timeout, the operations depend on how fast the box is
+            if metric == "operations" and (
+                old.get("budget_exceeded") or row.get("budget_exceeded")
+            ):
+                continue
+
+            if metric in ("p50", "p99") and abs(after - before) < TIMING_NOISE:
+                continue
+
+            if (
+                metric == "puzzles_per_second"
+                and before
+                and after
+                and abs(1 / after - 1 / before) < TIMING_NOISE
+            ):
+                continue
+
+            if bigger_is_better:
+                change = (before - after) / before if before else 0
+            else:
+                change = (after - before) / before if before else 0
+
+            # Any puzzle that isn't solved any more is a regression
+            if change > threshold or (metric == "solved" and after < before):
+                regressions.append(
+                    {
+                        "corpus": row["corpus"],
+                        "engine": row["engine"],
+                        "metric": metric,
+                        "baseline": before,
+                        "current": after,
+                        "change": change,
+                    }
+                )
+
+    return regressions
+
+
+def parse_importtime(output):
+    """Read the `-X importtime` lines python writes to stderr
+
+    Parameters
+    ----------
+    output : str
+        stderr of a `python -X importtime ...` run, other lines are skipped
+
+    Return
+    ------
+    list[dict]
+        One per module in the order they finished importing - module, self and
+        cumulative (both in seconds) and depth, 0 for one imported by the top level
+    """
+    imports = []
+
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        self_time, cumulative, name = line[len("import time:") :].split("|", 2)
+        if not self_time.strip().isdigit():
+            # The header, "self [us] | cumulative | imported package"
+            continue
+
+        module = name.lstrip()
+        imports.append(
+            {
+                "module": module,
+                "self": int(self_time) / 1e6,
+                "cumulative": int(cumulative) / 1e6,
+                "depth": (len(name) - len(module) - 1) // 2,
+            }
+        )
+
+    return imports
+
+
+def benchmark_startup(arguments=None, runs=DEFAULT_STARTUP_RUNS):
+    """Time launching `main.py` to it exiting, the way it's used from a shell or
+    script, and break down what it imports with `-X importtime`
+
+    Everything is run as a new process with the same python as this one. An empty
+    interpreter is timed the same way, that much of the latency can't be helped
+
+    Parameters
+    ----------
+    arguments : list[str], default=None
+        Command line for `main.py`, None for `headless oneliner` on the first
+        easy puzzle
+    runs : int, default=10
+        Launches to time, the median is taken
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        If `main.py` exits with an error
+
+    Return
+    ------
+    dict
+        command, runs, p50 and interpreter (median seconds for the command and for
+        an empty interpreter), imports (from `parse_importtime()`, of the modules
+        the empty interpreter doesn't import anyway)
+    """
+    import subprocess
+
+    if arguments is None:
+        puzzle = load_corpus("easy")[0]
+        arguments = ["headless", "oneliner", Run.format_oneliner(puzzle)]
+
+    command = [sys.executable, MAIN, *arguments]
+    empty = [sys.executable, "-c", "pass"]
+
+    def launch(command, importtime=False):
+        if importtime:
+            command = command[:1] + ["-X", "importtime"] + command[1:]
+
+        start_time = time.perf_counter()
+        process = subprocess.run(command, capture_output=True, text=True, check=True)
+        return time.perf_counter() - start_time, process.stderr
+
+    latencies = [launch(command)[0] for _ in range(runs)]
+    interpreter = [launch(empty)[0] for _ in range(runs)]
+
+    # Once more each with the breakdown, -X importtime slows the imports down a bit
+    preloaded = {row["module"] for row in parse_importtime(launch(empty, True)[1])}
+    imports = [
+        row
+        for row in parse_importtime(launch(command, True)[1])
+        if row["module"] not in preloaded
+    ]
+
+    return {
+        "command": " ".join(["main.py", *arguments]),
+        "runs": runs,
+        "p50": percentile(latencies, 0.5),
+        "interpreter": percentile(interpreter, 0.5),
+        "imports": imports,
+    }
@@ -0,0 +1,347 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+def cell_indexes(box_size):
+    """Flat cell numbers (row * size + column) in each row, column and box of a
+    board made of `box_size` x `box_size` boxes
+
+    Parameters
+    ----------
+    box_size : int
+        3 for a 9x9 board, 4 for 16x16, 5 for 25x25...
+
+    Return
+    ------
+    tuple
+        (rows, columns, boxes) - each a tuple of `size` tuples of cell numbers
+    """
+    if box_size in CELL_INDEXES:
+        return CELL_INDEXES[box_size]
+
+    size = box_size * box_size
+    rows = tuple(
+        tuple(row * size + column for column in range(size)) for row in range(size)
+    )
+    columns = tuple(
+        tuple(row * size + column for row in range(size)) for column in range(size)
+    )
+    boxes = tuple(
+        tuple(
+            (row + (box // box_size) * box_size) * size
+            + column
+            + (box % box_size) * box_size
+            for row in range(box_size)
+            for column in range(box_size)
+        )
+        for box in range(size)
+    )
+
+    CELL_INDEXES[box_size] = (rows, columns, boxes)
+    return CELL_INDEXES[box_size]
+
+
+CELL_INDEXES = {}
+
+# The 9x9 board's rows, columns and boxes
+ROW_CELLS, COLUMN_CELLS, BOX_CELLS = cell_indexes(3)
+
+# Box size for each board cell count, a cell has to fit in a byte so 15 is the most
+BOX_SIZES = {box_size**4: box_size for box_size in range(2, 16)}
+
+# Cell values 10 and up are letters in oneliners, A=10, B=11... G=16 on a 16x16
+SYMBOLS = b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# bytes.translate tables between oneliner characters and cell values, `.` is a 0
+TO_CELLS = bytes.maketrans(
+    SYMBOLS + SYMBOLS[10:].lower() + b".",
+    bytes(range(len(SYMBOLS))) + bytes(range(10, len(SYMBOLS))) + b"\x00",
+)
+TO_DIGITS = bytes.maketrans(bytes(range(len(SYMBOLS))), SYMBOLS)
+
+
+def box_size_for(cell_count):
+    """Box size of a board with `cell_count` cells
+
+    Parameters
+    ----------
+    cell_count : int
+
+    Raises
+    ------
+    ValueError
+        If there's no square board with that many cells
+
+    Return
+    ------
+    int
+    """
+    if cell_count not in BOX_SIZES:
+        raise ValueError(
+            f"A board needs 81 cells (or 256, 625... for bigger boards), "
+            f"not [{cell_count}]"
+        )
+
+    return BOX_SIZES[cell_count]
+
+
+class CellsView:
+    """
+    Live view onto one row, column or box of a `Board`. Reads and writes go
+    straight through to the board, nothing is copied
+    """
+
+    __slots__ = ("cells", "indexes")
+
+    def __init__(self, cells, indexes) -> None:
+        """
+        Parameters
+        ----------
+        cells : bytearray
+            The board's cells
+        indexes : tuple[int]
+            Flat cell numbers this view covers
+        """
+        self.cells = cells
+        self.indexes = indexes
+
+    def __getitem__(self, index):
+        return self.cells[self.indexes[index]]
+
+    def __setitem__(self, index, value):
+        self.cells[self.indexes[index]] = value
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __iter__(self):
+        cells = self.cells
+        return (cells[index] for index in self.indexes)
+
+    def __contains__(self, value):
+        cells = self.cells
+        return any(cells[index] == value for index in self.indexes)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class Board:
+    """
+    Sudoku board held as one byte per cell in reading order, 0's are for unsolved.
+    Much smaller and cheaper to copy than a list of lists
+
+    Boards are 9x9 unless told otherwise, any size made of square boxes works,
+    16x16 (`box_size=4`), 25x25 (`box_size=5`)...
+
+    `board[row][column]` still works, as do iterating the rows and comparing with a
+    list of lists, so it can be used anywhere a list[list[int]] board was
+    """
+
+    __slots__ = ("cells", "box_size", "size")
+
+    def __init__(self, cells=None, box_size=None) -> None:
+        """
+        Parameters
+        ----------
+        cells : bytes-like or iterable[int], default=None
+            Cell values in reading order, None for an empty board
+        box_size : int, default=None
+            Worked out from the number of cells if None, an empty board is 9x9
+
+        Raises
+        ------
+        ValueError
+            If the number of cells isn't right for the board size
+        """
+        if cells is None:
+            self.cells = bytearray((box_size or 3) ** 4)
+        else:
+            self.cells = bytearray(cells)
+
+        if box_size is None:
+            box_size = box_size_for(len(self.cells))
+
+        self.box_size = box_size
+        self.size = box_size * box_size
+
+        if len(self.cells) != self.size * self.size:
+            raise ValueError(
+                f"A {self.size}x{self.size} board needs [{self.size * self.size}] "
+                f"cells, not [{len(self.cells)}]"
+            )
+
+    @classmethod
+    def from_lists(cls, board):
+        """Make a board from the list[list[int]] format
+
+        Parameters
+        ----------
+        board : list[list[int]]
+
+        Raises
+        ------
+        ValueError
+            If the number of cells isn't right for any board size
+
+        Return
+        ------
+        Board
+        """
+        return cls([value for row in board for value in row])
+
+    @classmethod
+    def from_oneliner(cls, oneliner):
+        """Make a board from one character per cell, `.` can be used for unsolved
+        and values from 10 up are letters (A=10)
+
+        Parameters
+        ----------
+        oneliner : str
+
+        Return
+        ------
+        Board
+        """
+        return cls(oneliner.encode("ascii").translate(TO_CELLS))
+
+    def to_lists(self):
+        """Board in the list[list[int]] format
+
+        Return
+        ------
+        list[list[int]]
+        """
+        cells = self.cells
+        size = self.size
+        return [
+            list(cells[start : start + size]) for start in range(0, size * size, size)
+        ]
+
+    def to_oneliner(self):
+        """Board as one character per cell, values from 10 up are letters (A=10)
+
+        Return
+        ------
+        str
+        """
+        return self.cells.translate(TO_DIGITS).decode("ascii")
+
+    def __bytes__(self):
+        return bytes(self.cells)
+
+    def copy(self):
+        """Copy of the board, just the cell bytes
+
+        Return
+        ------
+        Board
+        """
+        return Board(self.cells, self.box_size)
+
+    __copy__ = copy
+
+    def get(self, row, column):
+        """Value of a cell
+
+        Parameters
+        ----------
+        row : int
+        column : int
+
+        Return
+        ------
+        int
+        """
+        return self.cells[row * self.size + column]
+
+    def set(self, row, column, value):
+        """Set the value of a cell
+
+        Parameters
+        ----------
+        row : int
+        column : int
+        value : int
+        """
+        self.cells[row * self.size + column] = value
+
+    def row(self, row):
+        """Live view of a row
+
+        Parameters
+        ----------
+        row : int
+
+        Return
+        ------
+        CellsView
+        """
+        return CellsView(self.cells, cell_indexes(self.box_size)[0][row])
+
+    def column(self, column):
+        """Live view of a column
+
+        Parameters
+        ----------
+        column : int
+
+        Return
+        ------
+        CellsView
+        """
+        return CellsView(self.cells, cell_indexes(self.box_size)[1][column])
+
+    def box(self, box):
+        """Live view of a box, numbered in reading order
+
+        Parameters
+        ----------
+        box : int
+
+        Return
+        ------
+        CellsView
+        """
+        return CellsView(self.cells, cell_indexes(self.box_size)[2][box])
+
+    def __getitem__(self, row):
+        return CellsView(self.cells, cell_indexes(self.box_size)[0][row])
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        cells = self.cells
+        return (CellsView(cells, indexes) for indexes in cell_indexes(self.box_size)[0])
+
+    def __eq__(self, other):
+        if isinstance(other, Board):
+            return self.cells == other.cells
+
+        try:
+            return self.to_lists() == [list(row) for row in other]
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Board('{self.to_oneliner()}')"
@@ -0,0 +1,223 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import time
+
+# Why a budget ran out
+TIMEOUT = "timeout"
+MAX_OPERATIONS = "max_operations"
+CANCELLED = "cancelled"
+
+
+class BudgetExceeded(Exception):
+    """
+    A solve ran out of budget, it's neither solved nor unsolvable
+
+    Raised inside the engines to get out of the search, and handed back by
+    `solve_within()` as the outcome of the solve. It's falsy, so code only asking
+    "was it solved?" still gets the right answer
+    """
+
+    def __init__(self, reason, operation_count) -> None:
+        """
+        Parameters
+        ----------
+        reason : str
+            `TIMEOUT`, `MAX_OPERATIONS` or `CANCELLED`
+        operation_count : int
+            Operations used by the solve before it was stopped
+        """
+        super().__init__(reason, operation_count)
+        self.reason = reason
+        self.operation_count = operation_count
+
+    def __bool__(self):
+        return False
+
+    def __str__(self):
+        return (
+            f"Budget exceeded [{self.reason}] after [{self.operation_count}] "
+            f"operations"
+        )
+
+
+class CancellationToken:
+    """
+    Lets another thread, or a signal handler, stop a solve that's running. The
+    engine notices the next time it checks its budget
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.cancelled = False
+
+    def cancel(self):
+        """Ask for the solve to stop"""
+        self.cancelled = True
+
+    def reset(self):
+        """Clear a cancel, ready for the next solve"""
+        self.cancelled = False
+
+
+class Budget:
+    """
+    Limits on a single solve, any mix of wall clock time, operations and a
+    cancellation token. Engines call `check()` once per node of their search, the
+    clock is only read every `check_every` calls as it's the slow part
+
+    The calls to `check()` are the operations, a solve without a budget isn't
+    counted at all. A `Budget()` with no limits just counts them
+
+    Usage
+    -----
+    solver.budget = Budget(timeout=5)
+    result = solve_within(solver, board, solver.budget)
+    """
+
+    def __init__(
+        self, timeout=None, max_operations=None, token=None, check_every=64
+    ) -> None:
+        """
+        Parameters
+        ----------
+        timeout : float, default=None
+            Seconds each solve can take, None for no limit
+        max_operations : int, default=None
+            Operations (nodes of the search) each solve can use, None for no limit
+        token : CancellationToken, default=None
+            Checked on every call to `check()`
+        check_every : int, default=64
+            How many calls to `check()` between looking at the clock
+        """
+        self.timeout = timeout
+        self.max_operations = max_operations
+        self.token = token
+        self.check_every = check_every
+
+        self.deadline = None
+        self.operation_limit = None
+        self.countdown = check_every
+
+        # Adds up across solves, like the engines' other counters
+        self.operation_count = 0
+        self.start_operation_count = 0
+
+    @property
+    def operations(self):
+        """Operations used by the solve going on, or the last one"""
+        return self.operation_count - self.start_operation_count
+
+    def start(self):
+        """Start the clock and the operation count for a new solve"""
+        operation_count = self.operation_count
+        self.start_operation_count = operation_count
+        self.countdown = self.check_every
+
+        if self.timeout is None:
+            self.deadline = None
+        else:
+            self.deadline = time.perf_counter() + self.timeout
+
+        if self.max_operations is None:
+            self.operation_limit = None
+        else:
+            self.operation_limit = operation_count + self.max_operations
+
+    def check(self):
+        """Count an operation, and stop the solve if it's gone over budget
+
+        Raises
+        ------
+        BudgetExceeded
+            If the solve is out of time or operations, or has been cancelled
+        """
+        self.operation_count += 1
+
+        if (
+            self.operation_limit is not None
+            and self.operation_count > self.operation_limit
+        ):
+            self.exceeded(MAX_OPERATIONS)
+
+        if self.token is not None and self.token.cancelled:
+            self.exceeded(CANCELLED)
+
+        self.countdown -= 1
+        if self.countdown:
+            return
+
+        self.countdown = self.check_every
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            self.exceeded(TIMEOUT)
+
+    def exceeded(self, reason):
+        """Raise `BudgetExceeded` with the operations used since `start()`
+
+        Parameters
+        ----------
+        reason : str
+
+        Raises
+        ------
+        BudgetExceeded
+        """
+        raise BudgetExceeded(reason, self.operations)
+
+
+def solve_within(solver, board, budget, gui=None):
+    """Solve a board with any engine, inside a budget
+
+    Parameters
+    ----------
+    solver : Solver
+        Any engine from `ENGINES`, its `budget` is set for the solve
+    board : Board or list[list[int]]
+        0's are for unsolved, left as given if the budget runs out
+    budget : Budget or None
+        None to solve with no limits, the operations aren't counted then
+    gui : Gui
+
+    Return
+    ------
+    bool or BudgetExceeded
+        True if solved, False if it can't be, or the `BudgetExceeded` if the
+        budget ran out first
+    """
+    if budget is None:
+        return solver.solve(board, gui)
+
+    if hasattr(board, "cells"):
+        given = bytes(board.cells)
+    else:
+        given = [row[:] for row in board]
+
+    solver.budget = budget
+    budget.start()
+
+    try:
+        return solver.solve(board, gui)
+    except BudgetExceeded as exceeded:
+        if hasattr(board, "cells"):
+            board.cells[:] = given
+        else:
+            for row, values in zip(board, given):
+                row[:] = values
+
+        return exceeded
+    finally:
+        solver.budget = None
@@ -0,0 +1,427 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import sqlite3
+from collections import OrderedDict
+from itertools import islice, permutations, product
+
+# Most tie break orderings to try per axis when working out the canonical form
+MAX_ORDERINGS = 6
+
+
+def tied_permutations(items, signature):
+    """Sort `items` by `signature`, every way round that items with the same
+    signature can go
+
+    Parameters
+    ----------
+    items : list
+    signature : callable
+
+    Return
+    ------
+    iterator[tuple]
+        Orderings of `items`
+    """
+    items = sorted(items, key=signature)
+    groups = []
+    for item in items:
+        if groups and signature(groups[-1][0]) == signature(item):
+            groups[-1].append(item)
+        else:
+            groups.append([item])
+
+    return (
+        tuple(item for group in choice for item in group)
+        for choice in product(*[permutations(group) for group in groups])
+    )
+
+
+def axis_orderings(cells):
+    """Work out orderings of the rows that are the same whatever order the bands,
+    rows, stacks or columns of `cells` come in
+
+    Rows are sorted by clue count and the clue count in each stack, bands by the
+    rows in them. Rows that can't be told apart are tried every way round, up to
+    `MAX_ORDERINGS`
+
+    Parameters
+    ----------
+    cells : list[int]
+        81 digits, 0 for unsolved
+
+    Return
+    ------
+    list[tuple]
+        Row orders, each is 9 row numbers
+    """
+    row_signatures = []
+    for row in range(9):
+        stack_counts = [
+            sum(
+                1
+                for column in range(stack * 3, stack * 3 + 3)
+                if cells[row * 9 + column]
+            )
+            for stack in range(3)
+        ]
+        row_signatures.append((sum(stack_counts), tuple(sorted(stack_counts))))
+
+    def band_signature(band):
+        return tuple(sorted(row_signatures[band * 3 : band * 3 + 3]))
+
+    def row_signature(row):
+        return row_signatures[row]
+
+    orderings = (
+        tuple(
+            row
+            for band, band_rows in zip(band_order, rows)
+            for row in band_rows
+        )
+        for band_order in tied_permutations(range(3), band_signature)
+        for rows in product(
+            *[
+                list(tied_permutations(range(band * 3, band * 3 + 3), row_signature))
+                for band in band_order
+            ]
+        )
+    )
+
+    return list(islice(orderings, MAX_ORDERINGS))
+
+
+def canonical_form(board):
+    """Reduce a board to a canonical form, puzzles that are the same up to digit
+    relabelling, band/stack/row/column swaps or transposition mostly end up with the
+    same form. It's best effort, when rows can't be told apart not every ordering
+    is tried, which can only ever mean a cache miss, never a wrong answer
+
+    Parameters
+    ----------
+    board : list[list[int]]
+        Representation of the board in list of lists, 0's are for unsolved
+
+    Return
+    ------
+    tuple
+        (81 digit str, transform) - the canonical puzzle and the transform that
+        gets there, for `to_canonical()` and `from_canonical()`
+    """
+    best_key = None
+    best_transform = None
+
+    cells = [value for row in board for value in row]
+    transposed = [cells[column * 9 + row] for row in range(9) for column in range(9)]
+
+    for transpose, grid, flipped in (
+        (False, cells, transposed),
+        (True, transposed, cells),
+    ):
+        row_orders = axis_orderings(grid)
+        column_orders = axis_orderings(flipped)
+
+        for row_order, column_order in product(row_orders, column_orders):
+            mapping = [0] * 10
+            label = 1
+            key = []
+
+            for row in row_order:
+                base = row * 9
+                for column in column_order:
+                    value = grid[base + column]
+                    if value and not mapping[value]:
+                        mapping[value] = label
+                        label += 1
+                    key.append(mapping[value])
+
+            key = "".join(map(str, key))
+            if best_key is None or key < best_key:
+                best_key = key
+                best_transform = (transpose, row_order, column_order, mapping)
+
+    # Digits that aren't on the board still need a label, so solutions map over
+    transpose, row_order, column_order, mapping = best_transform
+    label = max(mapping) + 1
+    for value in range(1, 10):
+        if not mapping[value]:
+            mapping[value] = label
+            label += 1
+
+    return best_key, best_transform
+
+
+def to_canonical(board, transform):
+    """Move a (solved) board into canonical form
+
+    Parameters
+    ----------
+    board : list[list[int]]
+    transform : tuple
+        From `canonical_form()`
+
+    Return
+    ------
+    str
+        81 digits
+    """
+    transpose, row_order, column_order, mapping = transform
+
+    if transpose:
+        return "".join(
+            str(mapping[board[column][row]])
+            for row in row_order
+            for column in column_order
+        )
+
+    return "".join(
+        str(mapping[board[row][column]])
+        for row in row_order
+        for column in column_order
+    )
+
+
+def from_canonical(solution, transform, board):
+    """Move a canonical (solved) board back through the transform, into `board`
+
+    Parameters
+    ----------
+    solution : str
+        81 digits in canonical form
+    transform : tuple
+        From `canonical_form()`
+    board : list[list[int]]
+        Written into in place
+    """
+    transpose, row_order, column_order, mapping = transform
+
+    inverse = [0] * 10
+    for value in range(1, 10):
+        inverse[mapping[value]] = value
+
+    position = 0
+    for row in row_order:
+        for column in column_order:
+            value = inverse[ord(solution[position]) - 48]
+            position += 1
+
+            if transpose:
+                board[column][row] = value
+            else:
+                board[row][column] = value
+
+
+class SolutionCache:
+    """
+    Bounded store of canonical puzzle => canonical solution, least recently used
+    entries are evicted first. Optionally backed by a SQLite file so it survives
+    restarts, anything found on disk is pulled back into memory
+
+    An unsolvable puzzle is stored with an empty solution
+    """
+
+    def __init__(self, max_size=100000, database=None, commit_every=1000) -> None:
+        """
+        Parameters
+        ----------
+        max_size : int, default=100000
+            Most entries held in memory
+        database : str, default=None
+            Path to a SQLite file for the persistent store, None for memory only
+        commit_every : int, default=1000
+            Writes to batch up before committing to the SQLite file
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+        self.connection = None
+        self.commit_every = commit_every
+        self.uncommitted = 0
+
+        if database is not None:
+            self.connection = sqlite3.connect(database)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions "
+                "(puzzle TEXT PRIMARY KEY, solution TEXT NOT NULL)"
+            )
+
+    def get(self, key):
+        """Look up a canonical puzzle
+
+        Parameters
+        ----------
+        key : str
+            Canonical puzzle from `canonical_form()`
+
+        Return
+        ------
+        str or None
+            Canonical solution, empty if unsolvable, None if it isn't cached
+        """
+        solution = self.entries.get(key)
+
+        if solution is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return solution
+
+        if self.connection is not None:
+            row = self.connection.execute(
+                "SELECT solution FROM solutions WHERE puzzle = ?", (key,)
+            ).fetchone()
+
+            if row is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self.remember(key, row[0])
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    def put(self, key, solution):
+        """Store a canonical solution
+
+        Parameters
+        ----------
+        key : str
+            Canonical puzzle from `canonical_form()`
+        solution : str
+            Canonical solution from `to_canonical()`, empty if unsolvable
+        """
+        self.remember(key, solution)
+
+        if self.connection is not None:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO solutions VALUES (?, ?)", (key, solution)
+            )
+            self.uncommitted += 1
+
+            if self.uncommitted >= self.commit_every:
+                self.commit()
+
+    def remember(self, key, solution):
+        """Put an entry in memory, evicting the least recently used if full
+
+        Parameters
+        ----------
+        key : str
+        solution : str
+        """
+        self.entries[key] = solution
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def commit(self):
+        """Flush pending writes to the SQLite file, if there is one"""
+        if self.connection is not None and self.uncommitted:
+            self.connection.commit()
+            self.uncommitted = 0
+
+    def close(self):
+        """Commit and close the SQLite file, if there is one"""
+        if self.connection is not None:
+            self.commit()
+            self.connection.close()
+            self.connection = None
+
+    def stats(self):
+        """Counters to size the cache with
+
+        Return
+        ------
+        dict
+            size, hits, misses, evictions and disk_hits
+        """
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_hits": self.disk_hits,
+        }
+
+
+class CachedSolver:
+    """
+    Wraps any engine with a `SolutionCache`, puzzles are looked up in canonical
+    form and only solved by the engine on a miss
+
+    Same contract as `Solver.solve()`, the board is mutated in place and a bool
+    is returned
+    """
+
+    def __init__(self, solver, cache) -> None:
+        """
+        Parameters
+        ----------
+        solver : Solver
+            Any engine from `ENGINES`
+        cache : SolutionCache
+        """
+        self.solver = solver
+        self.cache = cache
+
+    @property
+    def budget(self):
+        """`Budget` of the wrapped engine, hits never use any"""
+        return self.solver.budget
+
+    @budget.setter
+    def budget(self, budget):
+        self.solver.budget = budget
+
+    def solve(self, board, gui=None):
+        """Solve the board in place, from the cache if it's there, bigger boards
+        always go to the engine
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+            0's are for unsolved
+        gui : Gui
+            Passed on to the engine on a miss
+
+        Return
+        ------
+        bool
+            True if the board has been solved, False if it can't be
+        """
+        # The canonical form is only worked out for 9x9 boards
+        if len(board) != 9:
+            return self.solver.solve(board, gui)
+
+        key, transform = canonical_form(board)
+        solution = self.cache.get(key)
+
+        if solution is not None:
+            if not solution:
+                return False
+
+            from_canonical(solution, transform, board)
+            return True
+
+        result = self.solver.solve(board, gui)
+        self.cache.put(key, to_canonical(board, transform) if result else "")
+        return result
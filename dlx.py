@@ -0,0 +1,330 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from math import isqrt
+
+from budget import BudgetExceeded
+
+# Exact cover has four kinds of constraint, each with 81 columns on a 9x9 board:
+#   cell - every cell has a digit
+#   row - every row has every digit
+#   column - every column has every digit
+#   box - every box has every digit
+CONSTRAINT_KINDS = 4
+
+
+class DlxSolver:
+    """
+    Solves sudoku as an exact cover problem using Knuth's Algorithm X with
+    Dancing Links
+
+    Each of the 729 candidate placements (cell, digit) is a row in the matrix
+    covering one cell, one row, one column and one box constraint. Bigger boards
+    work the same way, the matrix is rebuilt when the size of board changes. The linked
+    lists are held in flat int lists rather than node objects, and are put back
+    exactly as they were after every solve so one instance can solve many boards
+
+    Same contract as `Solver.solve()`, the board is mutated in place and a bool
+    is returned
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.build_matrix(3)
+
+        # `Budget` checked as the search goes, set by `solve_within()`
+        self.budget = None
+
+    def build_matrix(self, box_size):
+        """Build the doubly linked exact cover matrix
+
+        Node 0 is the root, nodes 1-324 are the column headers (on a 9x9 board) and
+        every node after that belongs to a placement row, four per row
+
+        Parameters
+        ----------
+        box_size : int
+            3 for a 9x9 board, 4 for 16x16, 5 for 25x25...
+        """
+        board_size = box_size * box_size
+        cell_count = board_size * board_size
+        header_count = CONSTRAINT_KINDS * cell_count + 1
+
+        self.box_size = box_size
+        self.board_size = board_size
+
+        self.left = [(node - 1) % header_count for node in range(header_count)]
+        self.right = [(node + 1) % header_count for node in range(header_count)]
+        self.up = list(range(header_count))
+        self.down = list(range(header_count))
+        self.column = list(range(header_count))
+        self.placement = [-1] * header_count
+        self.size = [0] * header_count
+
+        # First node of each placement row, used to cover the givens
+        self.placement_node = []
+
+        for row in range(board_size):
+            for column in range(board_size):
+                box = (row // box_size) * box_size + (column // box_size)
+
+                for digit in range(board_size):
+                    placement = (row * board_size + column) * board_size + digit
+                    columns = (
+                        1 + row * board_size + column,
+                        1 + cell_count + row * board_size + digit,
+                        1 + 2 * cell_count + column * board_size + digit,
+                        1 + 3 * cell_count + box * board_size + digit,
+                    )
+
+                    first = len(self.column)
+                    self.placement_node.append(first)
+
+                    for offset, header in enumerate(columns):
+                        node = first + offset
+
+                        # Link into the row, circular across the four nodes
+                        self.left.append(first + (offset - 1) % 4)
+                        self.right.append(first + (offset + 1) % 4)
+
+                        # Link into the bottom of the column
+                        self.up.append(self.up[header])
+                        self.down.append(header)
+                        self.down[self.up[header]] = node
+                        self.up[header] = node
+
+                        self.column.append(header)
+                        self.placement.append(placement)
+                        self.size[header] += 1
+
+    def cover(self, header):
+        """Remove a column header and every row that has a node in the column
+
+        Parameters
+        ----------
+        header : int
+            Node number of the column header
+        """
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+
+        row_node = down[header]
+        while row_node != header:
+            node = right[row_node]
+            while node != row_node:
+                down[up[node]] = down[node]
+                up[down[node]] = up[node]
+                size[column[node]] -= 1
+                node = right[node]
+            row_node = down[row_node]
+
+    def uncover(self, header):
+        """Put back a column removed by `cover()`, in exactly the reverse order
+
+        Parameters
+        ----------
+        header : int
+            Node number of the column header
+        """
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+
+        row_node = up[header]
+        while row_node != header:
+            node = left[row_node]
+            while node != row_node:
+                size[column[node]] += 1
+                down[up[node]] = node
+                up[down[node]] = node
+                node = left[node]
+            row_node = up[row_node]
+
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def cover_givens(self, board):
+        """Cover the columns of every digit already on the board
+
+        Parameters
+        ----------
+        board : list[list[int]]
+            Representation of the board in list of lists, 0's are for unsolved
+
+        Return
+        ------
+        list[int] or None
+            Headers covered, in order, so they can be uncovered afterwards. None if
+            two givens clash, in which case nothing is left covered
+        """
+        board_size = self.board_size
+        covered = []
+        covered_set = set()
+
+        for row in range(board_size):
+            for column in range(board_size):
+                value = board[row][column]
+                if value == 0:
+                    continue
+
+                first = self.placement_node[
+                    (row * board_size + column) * board_size + value - 1
+                ]
+                headers = [self.column[first + offset] for offset in range(4)]
+
+                if covered_set.intersection(headers):
+                    self.uncover_all(covered)
+                    return None
+
+                for header in headers:
+                    self.cover(header)
+                    covered.append(header)
+                    covered_set.add(header)
+
+        return covered
+
+    def uncover_all(self, headers):
+        """Uncover `headers` in reverse order
+
+        Parameters
+        ----------
+        headers : list[int]
+        """
+        for header in reversed(headers):
+            self.uncover(header)
+
+    def solve(self, board, gui=None):
+        """Solve the board in place, see `Solver.solve()`
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+            0's are for unsolved
+        gui : Gui
+            If not None, it will call back and update the value in real time in the gui
+
+        Raises
+        ------
+        BudgetExceeded
+            If `budget` is set and runs out, see `Solver.solve()`
+
+        Return
+        ------
+        bool
+            True if the board has been solved, False if it can't be
+        """
+        if len(board) != self.board_size:
+            self.build_matrix(isqrt(len(board)))
+
+        covered = self.cover_givens(board)
+        if covered is None:
+            return False
+
+        solution = []
+        try:
+            result = self.search(solution, gui)
+        except BudgetExceeded:
+            # Stopped part way, the covers can't be unwound so start afresh
+            self.build_matrix(self.box_size)
+            raise
+
+        self.uncover_all(covered)
+
+        if result:
+            board_size = self.board_size
+            for placement in solution:
+                cell, digit = divmod(placement, board_size)
+                board[cell // board_size][cell % board_size] = digit + 1
+
+        return result
+
+    def search(self, solution, gui=None):
+        """Algorithm X, always branching on the column with the fewest rows left
+
+        The matrix is always put back the way it was, solved or not
+
+        Parameters
+        ----------
+        solution : list[int]
+            Placements chosen so far, added to as the search goes
+        gui : Gui
+
+        Return
+        ------
+        bool
+            True if every column has been covered
+        """
+        right, down, size = self.right, self.down, self.size
+        board_size = self.board_size
+
+        if right[0] == 0:
+            return True
+
+        if self.budget is not None:
+            self.budget.check()
+
+        # Smallest column first, stop looking at a forced (or dead) column
+        header = right[0]
+        best = header
+        best_size = size[header]
+        while header != 0 and best_size > 1:
+            if size[header] < best_size:
+                best, best_size = header, size[header]
+            header = right[header]
+
+        if best_size == 0:
+            return False
+
+        self.cover(best)
+        found = False
+
+        row_node = down[best]
+        while row_node != best:
+            placement = self.placement[row_node]
+            solution.append(placement)
+
+            node = right[row_node]
+            while node != row_node:
+                self.cover(self.column[node])
+                node = right[node]
+
+            if gui is not None:
+                cell, digit = divmod(placement, board_size)
+                gui.set_board_value(cell // board_size, cell % board_size, digit + 1)
+
+            found = self.search(solution, gui)
+
+            node = self.left[row_node]
+            while node != row_node:
+                self.uncover(self.column[node])
+                node = self.left[node]
+
+            if found:
+                break
+
+            solution.pop()
+
+            if gui is not None:
+                cell, digit = divmod(placement, board_size)
+                gui.set_board_value(cell // board_size, cell % board_size, 0)
+
+            row_node = down[row_node]
+
+        self.uncover(best)
+        return found
@@ -0,0 +1,243 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import struct
+from array import array
+
+# What happened to a cell
+ASSIGN = 0
+UNASSIGN = 1
+BACKTRACK = 2
+
+# Each event is one int - cell << 8 | value << 2 | kind, room for boards up to
+# 36x36 (values up to 63, cells up to 2**22)
+VALUE_BITS = 6
+KIND_BITS = 2
+
+# File starts with a header, then the base board one byte a cell, then the events
+# oldest first as 4 byte ints
+#   magic - b"SDKT"
+#   version - 1
+#   size - 9 for a normal 9x9 board
+#   reserved - 0
+#   dropped - events that were folded into the base board
+#   count - events that follow
+HEADER = struct.Struct("<4sBBHQQ")
+MAGIC = b"SDKT"
+VERSION = 1
+
+DEFAULT_CAPACITY = 1 << 20
+
+
+class EventTrace:
+    """
+    Records every cell a solve fills in, empties or gives up on, into a
+    preallocated ring buffer of packed ints. It's handed to any engine in place of
+    the `gui`, so recording costs one method call per event however slow drawing
+    it would be, and the solve can be replayed later at any speed
+
+    Once full the oldest events are folded into `base`, the board as it was just
+    before the oldest event kept, so what is kept can always be replayed
+
+    Usage
+    -----
+    trace = EventTrace(board)
+    solver.solve(board, trace)
+    for kind, row, column, value in trace.events():
+        ...
+    """
+
+    def __init__(self, board, capacity=DEFAULT_CAPACITY) -> None:
+        """
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+            Board about to be solved, as given
+        capacity : int, default=1048576
+            Most events kept, 4 bytes each
+        """
+        self.size = len(board)
+        self.base = bytearray(value for row in board for value in row)
+        self.buffer = array("I", bytes(4 * capacity))
+        self.capacity = capacity
+        self.count = 0
+
+        # Events folded into `base` before this trace was saved and loaded back
+        self.folded_count = 0
+
+    def __len__(self):
+        """Number of events kept"""
+        return min(self.count, self.capacity)
+
+    @property
+    def dropped(self):
+        """Number of events folded into `base` to make room"""
+        return self.folded_count + self.count - len(self)
+
+    def record(self, kind, cell, value):
+        """Add an event, folding the oldest into `base` if the buffer is full
+
+        Parameters
+        ----------
+        kind : int
+            `ASSIGN`, `UNASSIGN` or `BACKTRACK`
+        cell : int
+            Cell in reading order
+        value : int
+            Value assigned, 0 for the others
+        """
+        index = self.count % self.capacity
+
+        if self.count >= self.capacity:
+            self.apply(self.base, self.buffer[index])
+
+        self.buffer[index] = (cell << 8) | (value << KIND_BITS) | kind
+        self.count += 1
+
+    def set_board_value(self, row, column, value):
+        """Same as `Gui.set_board_value()`, a 0 is an `UNASSIGN`"""
+        self.record(ASSIGN if value else UNASSIGN, row * self.size + column, value)
+
+    def set_progress_bar_value(self, value):
+        """Same as `Gui.set_progress_bar_value()`, progress isn't recorded"""
+
+    def backtrack(self, row, column):
+        """Same as `Gui.backtrack()`, the search has run out of guesses for a cell"""
+        self.record(BACKTRACK, row * self.size + column, 0)
+
+    @staticmethod
+    def unpack(event):
+        """Split an event back up
+
+        @staticmethod
+
+        Parameters
+        ----------
+        event : int
+
+        Return
+        ------
+        tuple
+            (kind, cell, value)
+        """
+        return (
+            event & ((1 << KIND_BITS) - 1),
+            event >> 8,
+            (event >> KIND_BITS) & ((1 << VALUE_BITS) - 1),
+        )
+
+    @staticmethod
+    def apply(cells, event):
+        """Play an event onto a board's cells, backtracks don't change anything
+
+        @staticmethod
+
+        Parameters
+        ----------
+        cells : bytearray
+            Cells in reading order, updated in place
+        event : int
+        """
+        kind, cell, value = EventTrace.unpack(event)
+
+        if kind != BACKTRACK:
+            cells[cell] = value
+
+    def raw_events(self):
+        """The packed events kept, oldest first
+
+        Return
+        ------
+        array
+        """
+        if self.count <= self.capacity:
+            return self.buffer[: self.count]
+
+        index = self.count % self.capacity
+        return self.buffer[index:] + self.buffer[:index]
+
+    def events(self):
+        """Lazily unpack the events kept, oldest first
+
+        Yield
+        -----
+        tuple
+            (kind, row, column, value)
+        """
+        for event in self.raw_events():
+            kind, cell, value = self.unpack(event)
+            row, column = divmod(cell, self.size)
+            yield kind, row, column, value
+
+    def save(self, file_name):
+        """Write the base board and the events kept to a file
+
+        Parameters
+        ----------
+        file_name : str
+        """
+        events = self.raw_events()
+
+        with open(file_name, "wb") as file:
+            file.write(
+                HEADER.pack(MAGIC, VERSION, self.size, 0, self.dropped, len(events))
+            )
+            file.write(self.base)
+            file.write(events.tobytes())
+
+    @classmethod
+    def load(cls, file_name):
+        """Read a trace written by `save()`, it holds just the events that were
+        saved
+
+        @classmethod
+
+        Parameters
+        ----------
+        file_name : str
+
+        Return
+        ------
+        EventTrace
+
+        Raises
+        ------
+        RuntimeError
+            If the file isn't a trace this can read
+        """
+        with open(file_name, "rb") as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise RuntimeError(f"File [{file_name}] is too short to be a trace")
+
+            magic, version, size, _, dropped, count = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise RuntimeError(f"File [{file_name}] isn't a trace I can read")
+
+            base = file.read(size * size)
+            events = array("I")
+            events.frombytes(file.read(4 * count))
+
+        if len(base) != size * size or len(events) != count:
+            raise RuntimeError(f"File [{file_name}] is cut short")
+
+        trace = cls([[0] * size] * size, max(count, 1))
+        trace.base[:] = base
+        trace.buffer[:count] = events
+        trace.count = count
+        trace.folded_count = dropped
+        return trace
@@ -79,3 +79,36 @@ class FileUtils:
         except FileNotFoundError as error:
             print(f"Dude, where the f is the file [{file_name}]?")
             raise
+
+    @staticmethod
+    def read_lines(file_name):
+        """Lazily yield the lines of file_name, one at a time, so big files are never
+        held in memory. A file_name of `-` reads from stdin
+
+        Parameters
+        ----------
+        file_name : str
+          Relative path and name of file to read, or `-` for stdin
+
+        Yield
+        -----
+        str
+          Each line, including the line ending
+
+        Raises
+        ------
+        FileNotFoundError
+          If file cant not be found or opened
+        """
+        if file_name == "-":
+            yield from sys.stdin
+            return
+
+        try:
+            file = open(file_name, "r")
+        except FileNotFoundError as error:
+            print(f"Dude, where the f is the file [{file_name}]?")
+            raise
+
+        with file:
+            yield from file
@@ -0,0 +1,272 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board, cell_indexes
+from solver import BitmaskSolver, order_values_ascending
+
+
+class Generator:
+    """
+    Makes puzzles that have exactly one solution
+
+    A random full grid is made first, the boxes on the diagonal don't share a row
+    or column so they're filled with random digits straight off, then the rest is
+    solved with the digits tried in a random order. Clues are then taken away in a
+    random order, any clue that would let the puzzle have a second solution is put
+    back, so the puzzle is unique at every step. Rather than counting solutions
+    each time, a clue can go if no other digit in its place can be solved, which
+    is the same thing but usually ends after a step or two of propagation
+
+    The same seed always gives the same puzzles
+    """
+
+    def __init__(self, seed=None, box_size=3) -> None:
+        """
+        Parameters
+        ----------
+        seed : int or str, default=None
+            Seed for the random numbers, None for a different run every time
+        box_size : int, default=3
+            3 for a 9x9 board, 4 for 16x16...
+        """
+        self.random = random.Random(seed)
+        self.box_size = box_size
+        self.size = box_size * box_size
+
+        # One solver fills grids with random digits, the other checks uniqueness
+        self.filler = BitmaskSolver(value_ordering=self.order_values_random)
+        self.checker = BitmaskSolver()
+
+    def order_values_random(self, solver, cells, row, column, candidates):
+        """Value ordering - try the candidate digits in a random order, same
+        signature as `order_values_ascending()`
+
+        Return
+        ------
+        list[int]
+            Digits in the order they should be guessed
+        """
+        values = order_values_ascending(solver, cells, row, column, candidates)
+        self.random.shuffle(values)
+        return values
+
+    def generate_solution(self):
+        """Make a random full grid
+
+        Return
+        ------
+        Board
+        """
+        board = Board(box_size=self.box_size)
+        boxes = cell_indexes(self.box_size)[2]
+
+        for box in range(0, self.size, self.box_size + 1):
+            digits = self.random.sample(range(1, self.size + 1), self.size)
+            for cell, digit in zip(boxes[box], digits):
+                board.cells[cell] = digit
+
+        self.filler.solve(board)
+        return board
+
+    def is_removable(self, puzzle, cell, value):
+        """Check a clue can be taken away without a second solution
+
+        Parameters
+        ----------
+        puzzle : Board
+            Unique puzzle with the clue already emptied out
+        cell : int
+            Flat cell number of the clue
+        value : int
+            What the clue was
+
+        Return
+        ------
+        bool
+            True if `value` is the only digit the cell can take and still be solved
+        """
+        checker = self.checker
+        checker.load_masks(puzzle)
+        candidates = checker.get_cell_candidates(cell) & ~(1 << value)
+
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+
+            attempt = puzzle.copy()
+            attempt.cells[cell] = bit.bit_length() - 1
+            if checker.solve(attempt):
+                return False
+
+        return True
+
+    def remove_clues(self, solution, empty_fraction=0.5):
+        """Take clues away from a full grid, keeping the solution unique
+
+        Parameters
+        ----------
+        solution : Board
+            Full grid, it isn't changed
+        empty_fraction : float, default=0.5
+            How much of the board to hide, 0-1. It's a target, if no more clues can
+            be taken away without a second solution the puzzle has fewer holes
+
+        Return
+        ------
+        Board
+            The puzzle
+        """
+        puzzle = solution.copy()
+        cells = puzzle.cells
+        wanted = round(len(cells) * empty_fraction)
+        removed = 0
+
+        for cell in self.random.sample(range(len(cells)), len(cells)):
+            if removed >= wanted:
+                break
+
+            value = cells[cell]
+            cells[cell] = 0
+
+            if self.is_removable(puzzle, cell, value):
+                removed += 1
+            else:
+                cells[cell] = value
+
+        return puzzle
+
+    def generate(self, empty_fraction=0.5):
+        """Make a puzzle with one solution
+
+        Parameters
+        ----------
+        empty_fraction : float, default=0.5
+            How much of the board to hide, see `remove_clues()`
+
+        Return
+        ------
+        tuple
+            (puzzle, solution) - both `Board`s
+        """
+        solution = self.generate_solution()
+        return self.remove_clues(solution, empty_fraction), solution
+
+
+def generate_chunk(seed, start, count, empty_fraction, box_size):
+    """Worker side, make `count` puzzles starting from puzzle number `start`
+
+    Every puzzle gets its own seed from `seed` and its number, so the puzzles are
+    the same however they're split between workers
+
+    Parameters
+    ----------
+    seed : int or str
+    start : int
+    count : int
+    empty_fraction : float
+    box_size : int
+
+    Return
+    ------
+    list[tuple]
+        (puzzle, solution) oneliners for each puzzle
+    """
+    puzzles = []
+    for number in range(start, start + count):
+        puzzle, solution = Generator(f"{seed}-{number}", box_size).generate(
+            empty_fraction
+        )
+        puzzles.append((puzzle.to_oneliner(), solution.to_oneliner()))
+
+    return puzzles
+
+
+def generate_many(
+    count, empty_fraction=0.5, seed=None, workers=1, box_size=3, chunk_size=16
+):
+    """Make lots of unique puzzles, lazily and in order, across a pool of worker
+    processes if asked
+
+    Parameters
+    ----------
+    count : int
+        How many puzzles
+    empty_fraction : float, default=0.5
+        How much of each board to hide, see `Generator.remove_clues()`
+    seed : int or str, default=None
+        Same seed, same puzzles whatever the number of workers. None for a random
+        seed
+    workers : int, default=1
+        Number of worker processes, 1 to make them in this process, 0 or None for
+        one per cpu
+    box_size : int, default=3
+        3 for a 9x9 board, 4 for 16x16...
+    chunk_size : int, default=16
+        Puzzles sent to a worker at a time
+
+    Yield
+    -----
+    tuple
+        (puzzle, solution) oneliners
+    """
+    if seed is None:
+        seed = random.randrange(2**32)
+
+    starts = range(0, count, chunk_size)
+
+    if workers == 1:
+        for start in starts:
+            yield from generate_chunk(
+                seed, start, min(chunk_size, count - start), empty_fraction, box_size
+            )
+        return
+
+    workers = workers or os.cpu_count() or 1
+    pending = deque()
+    starts = iter(starts)
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            # Keep every worker busy without queueing up the whole run
+            while len(pending) < workers * 4:
+                start = next(starts, None)
+                if start is None:
+                    break
+
+                pending.append(
+                    executor.submit(
+                        generate_chunk,
+                        seed,
+                        start,
+                        min(chunk_size, count - start),
+                        empty_fraction,
+                        box_size,
+                    )
+                )
+
+            if not pending:
+                break
+
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -17,14 +17,108 @@
 
 import sys
 import time
-from functools import partial
 
 from PySide6 import QtWidgets, QtCore
 from PySide6.QtUiTools import QUiLoader
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import QFile, QIODevice, QSize
 
+from budget import Budget, BudgetExceeded, CancellationToken, solve_within
+from events import EventTrace
+from metrics import instrument
 from solver import Solver
+from generator import Generator
+from validate import find_conflicts, format_conflict
+
+# How often the board is redrawn while a solve runs, about 30 frames a second
+FRAME_INTERVAL_MS = 33
+
+# Cells with conflicting givens, marked when a board is refused as invalid
+CONFLICT_STYLE = "background-color: #f4b6b6;"
+
+
+class SolveRecorder:
+    """
+    Stands in for the `Gui` on the solver's thread. Updates from the solver only
+    go into a buffer, the UI thread draws from it at its own pace so however many
+    times a cell changes between frames only the latest value is drawn. Every
+    update also goes to an `EventTrace`, to replay the solve step by step after
+    """
+
+    def __init__(self, board) -> None:
+        """
+        Parameters
+        ----------
+        board : list[list[int]]
+            Board being solved, as given
+        """
+        self.size = len(board)
+        self.cells = bytearray(value for row in board for value in row)
+        self.progress = 0
+        self.trace = EventTrace(board)
+
+    def set_board_value(self, row, column, value):
+        """Same as `Gui.set_board_value()`, only recorded"""
+        self.cells[row * self.size + column] = value
+        self.trace.set_board_value(row, column, value)
+
+    def backtrack(self, row, column):
+        """Same as `Gui.backtrack()`, only recorded"""
+        self.trace.backtrack(row, column)
+
+    def set_progress_bar_value(self, value):
+        """Same as `Gui.set_progress_bar_value()`, only recorded"""
+        self.progress = value
+
+    def snapshot(self):
+        """Latest state of the solve
+
+        Return
+        ------
+        tuple
+            (bytes, int) - every cell in reading order and the progress
+        """
+        return bytes(self.cells), self.progress
+
+
+class SolveThread(QtCore.QThread):
+    """
+    Solves a board off the UI thread, reporting to a `SolveRecorder`. Times are
+    of the solve alone, not of drawing it
+    """
+
+    def __init__(self, board, token) -> None:
+        """
+        Parameters
+        ----------
+        board : list[list[int]]
+            0's are for unsolved, solved in place
+        token : CancellationToken
+            Cancelling it stops the solve, the board is left as given
+        """
+        super().__init__()
+        self.board = board
+        self.token = token
+        self.recorder = SolveRecorder(board)
+        self.solver = Solver()
+        self.metrics = instrument(self.solver)
+
+        # Counts the operations too
+        self.budget = Budget(token=token)
+
+        self.result = False
+        self.cpu_time = 0
+        self.wall_time = 0
+
+    def run(self):
+        """Thread side, solve the board"""
+        cpu_start_time = time.thread_time()
+        wall_start_time = time.perf_counter()
+
+        self.result = solve_within(self.solver, self.board, self.budget, self.recorder)
+
+        self.cpu_time = time.thread_time() - cpu_start_time
+        self.wall_time = time.perf_counter() - wall_start_time
 
 
 class Gui:
@@ -32,7 +126,7 @@ class Gui:
     All wrapper and GUI related functionality
     """
 
-    def __init__(self, ui_file_name="qt_gui.ui", args=[]):
+    def __init__(self, ui_file_name="qt_gui.ui", args=[], trace_file_name=None):
         """ "
         Parameters
         ----------
@@ -40,6 +134,8 @@ class Gui:
             Name of the Qt ui file to load and execute
         args: list, default=[]
             Arguments to pass into the Qt application object
+        trace_file_name : str, default=None
+            If not None, the trace of every solve is saved here
 
         Raises
         ------
@@ -52,6 +148,23 @@ class Gui:
         self.loader = QUiLoader()
         self.app = QApplication(args)
 
+        # The solve running in the background, if any, and what's drawn of it
+        self.solve_thread = None
+        self.solve_timer = None
+        self.token = CancellationToken()
+        self.shown_cells = b""
+
+        # Trace of the last solve (or one loaded) and how far a replay of it is
+        self.trace = None
+        self.trace_file_name = trace_file_name
+        self.replay_timer = None
+        self.replay_cells = bytearray()
+        self.replay_events = None
+        self.replay_position = 0
+
+        # Cell boxes marked by the last invalid board, unmarked on the next status
+        self.marked_boxes = []
+
         if not self.ui_file.open(QIODevice.ReadOnly):
             raise RuntimeException(
                 f"Issue opening file [{self.ui_file_name}], with error [{self.ui_file.errorString()}]"
@@ -169,12 +282,12 @@ class Gui:
             or None
         )
 
-    def load(self, window_size=(640, 580)):
+    def load(self, window_size=(640, 600)):
         """Method to load the UI file and process 'precursor' setup such as binding buttons
 
         Parameters
         ----------
-        window_size : tuple, default=(640, 470)
+        window_size : tuple, default=(640, 600)
             Size of the window to generate when calling `self.run()`. Would advise not changing
             this, I didn't put much effort into anchors on the GUI design
 
@@ -192,40 +305,96 @@ class Gui:
                 f"Window failed to instantiate with error [{self.loader.errorString()}]"
             )
 
+        self.index_widgets()
+
         # Centre all QLineEdit boxes - dumb i know but gui editor is poop for it
-        for box in self.get_all_widgets_by_type(QtWidgets.QLineEdit):
-            box.setAlignment(QtCore.Qt.AlignCenter)
-            box.setText(str(0))
-
-        self.get_widget_by_type_and_name(
-            "difficultySelectBox", QtWidgets.QComboBox
-        ).addItem("Easy", 0.35)
-        self.get_widget_by_type_and_name(
-            "difficultySelectBox", QtWidgets.QComboBox
-        ).addItem("Medium", 0.45)
-        self.get_widget_by_type_and_name(
-            "difficultySelectBox", QtWidgets.QComboBox
-        ).addItem("Hard", 0.60)
-        self.get_widget_by_type_and_name(
-            "difficultySelectBox", QtWidgets.QComboBox
-        ).addItem("Expert", 0.70)
+        for row in self.cell_boxes:
+            for box in row:
+                box.setAlignment(QtCore.Qt.AlignCenter)
+                box.setText(str(0))
+
+        self.difficulty_select_box.addItem("Easy", 0.35)
+        self.difficulty_select_box.addItem("Medium", 0.45)
+        self.difficulty_select_box.addItem("Hard", 0.60)
+        self.difficulty_select_box.addItem("Expert", 0.70)
+
+        # Events replayed a second
+        self.replay_speed_select_box.addItem("100/s", 100)
+        self.replay_speed_select_box.addItem("1k/s", 1000)
+        self.replay_speed_select_box.addItem("10k/s", 10000)
+        self.replay_speed_select_box.addItem("100k/s", 100000)
+        self.replay_speed_select_box.setCurrentIndex(1)
 
         self.set_progress_bar_value(0)
 
-        self.get_widget_by_type_and_name(
-            "clearButton", QtWidgets.QPushButton
-        ).clicked.connect(self.clear_board)
-        self.get_widget_by_type_and_name(
-            "newButton", QtWidgets.QPushButton
-        ).clicked.connect(
-            partial(self.generate_new_board, 0.5)  # TODO - add in game ease on gen
+        self.clear_button.clicked.connect(self.clear_board)
+        self.new_button.clicked.connect(lambda: self.generate_new_board())
+        self.solve_button.clicked.connect(self.solve_board)
+        self.input_button.clicked.connect(self.handle_input_toggle)
+        self.replay_button.clicked.connect(self.replay_trace)
+        self.cancel_button.clicked.connect(self.cancel_solve)
+
+        self.solve_timer = QtCore.QTimer()
+        self.solve_timer.setInterval(FRAME_INTERVAL_MS)
+        self.solve_timer.timeout.connect(self.draw_solve)
+
+        self.replay_timer = QtCore.QTimer()
+        self.replay_timer.setInterval(FRAME_INTERVAL_MS)
+        self.replay_timer.timeout.connect(self.draw_replay)
+
+        # Closing the window mid solve has to stop the thread first
+        self.app.aboutToQuit.connect(self.stop_solve)
+
+    def index_widgets(self):
+        """Look up every widget that gets used once, after loading, so reading and
+        drawing the board is straight attribute and list access rather than a
+        search of the widget tree each time
+
+        Raises
+        ------
+        RuntimeError
+            If a widget is missing from the UI file
+        """
+
+        def find(widget_type, name):
+            widget = self.window.findChild(widget_type, name)
+            if widget is None:
+                raise RuntimeError(f"No [{name}] in UI file [{self.ui_file_name}]")
+            return widget
+
+        # [row][column] of the cells, `txtRow{row}Col{column}`
+        self.cell_boxes = [
+            [
+                find(QtWidgets.QLineEdit, f"txtRow{row}Col{column}")
+                for column in range(9)
+            ]
+            for row in range(9)
+        ]
+
+        self.status_label = find(QtWidgets.QLabel, "statusLabel")
+        self.time_label = find(QtWidgets.QLabel, "timeLabel")
+        self.operations_label = find(QtWidgets.QLabel, "operationsLabel")
+        self.metrics_label = find(QtWidgets.QLabel, "metricsLabel")
+        self.progress_bar = find(QtWidgets.QProgressBar, "progressBar")
+        self.difficulty_select_box = find(QtWidgets.QComboBox, "difficultySelectBox")
+        self.replay_speed_select_box = find(
+            QtWidgets.QComboBox, "replaySpeedSelectBox"
         )
-        self.get_widget_by_type_and_name(
-            "solveButton", QtWidgets.QPushButton
-        ).clicked.connect(self.solve_board)
-        self.get_widget_by_type_and_name(
-            "inputButton", QtWidgets.QPushButton
-        ).clicked.connect(self.handle_input_toggle)
+
+        self.new_button = find(QtWidgets.QPushButton, "newButton")
+        self.solve_button = find(QtWidgets.QPushButton, "solveButton")
+        self.clear_button = find(QtWidgets.QPushButton, "clearButton")
+        self.input_button = find(QtWidgets.QPushButton, "inputButton")
+        self.replay_button = find(QtWidgets.QPushButton, "replayButton")
+        self.cancel_button = find(QtWidgets.QPushButton, "cancelButton")
+        self.buttons = [
+            self.new_button,
+            self.solve_button,
+            self.clear_button,
+            self.input_button,
+            self.replay_button,
+            self.cancel_button,
+        ]
 
     def handle_input_toggle(self):
         """Bound to the input button, handles updates to GUI to switch between `INPUT`
@@ -235,9 +404,7 @@ class Gui:
         `GUIDED` - locks all cels and application will gen/input values to be solved
         """
         print("InputButton - Clicked")
-        button_value = self.get_widget_by_type_and_name(
-            "inputButton", QtWidgets.QPushButton
-        ).text()
+        button_value = self.input_button.text()
 
         read_only_value = False
 
@@ -249,82 +416,239 @@ class Gui:
             button_value = "INPUT"
 
         # Now set all text boxes to input enabled
-        self.get_widget_by_type_and_name("inputButton", QtWidgets.QPushButton).setText(
-            button_value
-        )
+        self.input_button.setText(button_value)
 
-        board_squares = self.get_all_widgets_by_type_and_name_starting_with(
-            name="txt", widget_type=QtWidgets.QLineEdit
+        for row in self.cell_boxes:
+            for box in row:
+                box.setReadOnly(read_only_value)
+
+    def set_labels(self, status, time_taken, operations, metrics=None, conflicts=None):
+        """Set the status, time, operations and metrics labels in one go
+
+        Parameters
+        ----------
+        status : str
+        time_taken : str
+        operations : str
+        metrics : Metrics, default=None
+            Breakdown of the solve, the full thing with the depths is in the
+            tooltip. None to clear it
+        conflicts : list[dict], default=None
+            From `find_conflicts()`, see `mark_conflicts()`. None to clear them
+        """
+        self.status_label.setText(status)
+        self.time_label.setText(time_taken)
+        self.operations_label.setText(operations)
+        self.mark_conflicts(conflicts or [])
+
+        if metrics is None:
+            self.metrics_label.setText("-")
+            self.metrics_label.setToolTip("")
+            return
+
+        self.metrics_label.setText(
+            f"Nodes={metrics.nodes}, Guesses={metrics.guesses}, "
+            f"Backtracks={metrics.backtracks}, MaxDepth={metrics.max_depth}"
+        )
+        self.metrics_label.setToolTip(
+            f"{metrics}\nDepths - {metrics.format_histogram()}"
         )
 
-        for square in board_squares:
-            square.setReadOnly(read_only_value)
+    def mark_conflicts(self, conflicts):
+        """Mark the cells in each conflict and list the conflicts in the status
+        tooltip, unmarking whatever was marked before
+
+        Parameters
+        ----------
+        conflicts : list[dict]
+            From `find_conflicts()`, cells are named like r1c3
+        """
+        for box in self.marked_boxes:
+            box.setStyleSheet("")
+        self.marked_boxes = []
+
+        for conflict in conflicts:
+            for name in conflict["cells"]:
+                row, column = map(int, name[1:].split("c"))
+                box = self.cell_boxes[row - 1][column - 1]
+                box.setStyleSheet(CONFLICT_STYLE)
+                self.marked_boxes.append(box)
+
+        self.status_label.setToolTip("\n".join(map(format_conflict, conflicts)))
 
     def solve_board(self):
         """Bound to the `solve` button and does what it says on the tin
 
-        Calls into the solver class and processes
+        The solve runs on a `SolveThread`, the board is redrawn from it by
+        `draw_solve()` about 30 times a second until it's done
         """
         print("SolveButton - Clicked")
-        cpu_start_time = time.process_time()
-        wall_start_time = time.time()
 
-        self.get_widget_by_type_and_name("statusLabel", QtWidgets.QLabel).setText(
-            "Solving..."
-        )
-        self.get_widget_by_type_and_name("timeLabel", QtWidgets.QLabel).setText(
-            "Capturing..."
-        )
-        self.get_widget_by_type_and_name("operationsLabel", QtWidgets.QLabel).setText(
-            "Adding..."
-        )
-        for button in self.get_all_widgets_by_type(QtWidgets.QPushButton):
-            button.setEnabled(False)
-
-        board = []
-        board_valid = True
-        for i in range(9):
-            row = []
-            for j in range(9):
-                try:
-                    row.append(int(self.get_board_value(i, j)))
-                except ValueError:
-                    board_valid = False
-                    continue
-            board.append(row)
-
-        result = False
-        solver = Solver()
-        if board_valid:
-            result = solver.solve(board, self)
-
-        wall_end_time = time.time()
-        cpu_end_time = time.process_time()
-
-        cpu_time = cpu_end_time - cpu_start_time
-        wall_time = wall_end_time - wall_start_time
-
-        self.get_widget_by_type_and_name("timeLabel", QtWidgets.QLabel).setText(
-            f"CPU={round(cpu_time, 2)}, Wall={round(wall_time, 2)}"
-        )
+        try:
+            board = self.read_board()
+        except ValueError:
+            self.set_labels("Invalid Board", "0", "0")
+            return
+
+        # Clashing givens would have the plain backtracking search every
+        # possibility before giving up, they're refused straight away instead
+        conflicts = find_conflicts(board)
+        if conflicts:
+            self.set_labels("Invalid Board", "0", "0", conflicts=conflicts)
+            return
+
+        self.set_labels("Solving...", "Capturing...", "Adding...")
+
+        for button in self.buttons:
+            button.setEnabled(button is self.cancel_button)
+
+        self.token.reset()
+        self.solve_thread = SolveThread(board, self.token)
+        self.shown_cells = self.solve_thread.recorder.snapshot()[0]
+        self.solve_thread.start()
+        self.solve_timer.start()
+
+    def draw_solve(self):
+        """Bound to the solve timer, draw the latest state of the solve and finish
+        up once the thread is done"""
+        cells, progress = self.solve_thread.recorder.snapshot()
+        self.draw_cells(cells)
+        self.progress_bar.setValue(progress)
+
+        if self.solve_thread.isFinished():
+            self.finish_solve()
+
+    def draw_cells(self, cells):
+        """Set only the cells that have changed since the last draw
+
+        Parameters
+        ----------
+        cells : bytes
+            Every cell in reading order
+        """
+        shown_cells = self.shown_cells
+
+        for index, value in enumerate(cells):
+            if value != shown_cells[index]:
+                self.cell_boxes[index // 9][index % 9].setText(str(value))
+
+        self.shown_cells = cells
+
+    def finish_solve(self):
+        """Draw the board as the solve left it and show how it went"""
+        self.solve_timer.stop()
+        thread = self.solve_thread
+
+        # A cancelled board is put back as given without telling the recorder
+        self.draw_cells(bytes(value for row in thread.board for value in row))
 
         label_value = "Not Solvable"
-        if result and board_valid:
+        if isinstance(thread.result, BudgetExceeded):
+            label_value = "Cancelled"
+        elif thread.result:
             label_value = "Solved"
-        elif not board_valid:
-            label_value = "Invalid Board"
 
-        self.get_widget_by_type_and_name("statusLabel", QtWidgets.QLabel).setText(
-            label_value
+        self.set_labels(
+            label_value,
+            f"CPU={round(thread.cpu_time, 2)}, Wall={round(thread.wall_time, 2)}",
+            str(thread.budget.operations),
+            thread.metrics,
         )
-        self.get_widget_by_type_and_name("operationsLabel", QtWidgets.QLabel).setText(
-            str(solver.operation_count)
+
+        self.set_trace(thread.recorder.trace)
+        if self.trace_file_name is not None:
+            self.trace.save(self.trace_file_name)
+
+        self.enable_buttons()
+        self.solve_thread = None
+
+    def enable_buttons(self):
+        """Back to waiting for a click, `cancel` is only for while something runs
+        and `replay` needs a trace"""
+        for button in self.buttons:
+            button.setEnabled(button is not self.cancel_button)
+
+        self.replay_button.setEnabled(self.trace is not None)
+
+    def set_trace(self, trace):
+        """Make `trace` the one the `replay` button plays
+
+        Parameters
+        ----------
+        trace : EventTrace
+
+        Raises
+        ------
+        ValueError
+            If the trace isn't of a 9x9 board
+        """
+        if trace.size != 9:
+            raise ValueError(
+                f"The GUI can only replay 9x9 traces, not [{trace.size}x{trace.size}]"
+            )
+
+        self.trace = trace
+        self.replay_button.setEnabled(True)
+
+    def replay_trace(self):
+        """Bound to the `replay` button, play the trace back from the board it
+        started on, at the speed picked in the replay select box"""
+        print("ReplayButton - Clicked")
+        trace = self.trace
+
+        self.replay_cells = bytearray(trace.base)
+        self.replay_events = trace.raw_events()
+        self.replay_position = 0
+
+        self.write_board([trace.base[row * 9 : row * 9 + 9] for row in range(9)])
+        self.shown_cells = bytes(trace.base)
+        self.set_labels("Replaying...", f"Dropped={trace.dropped}", "0")
+        self.set_progress_bar_value(0)
+
+        for button in self.buttons:
+            button.setEnabled(button is self.cancel_button)
+
+        self.token.reset()
+        self.replay_timer.start()
+
+    def draw_replay(self):
+        """Bound to the replay timer, play as many events as the speed allows in
+        one frame and draw the cells that changed"""
+        events = self.replay_events
+        speed = self.replay_speed_select_box.currentData()
+        stop = min(
+            len(events),
+            self.replay_position + max(1, speed * FRAME_INTERVAL_MS // 1000),
         )
 
-        for button in self.get_all_widgets_by_type(QtWidgets.QPushButton):
-            button.setEnabled(True)
+        for event in events[self.replay_position : stop]:
+            EventTrace.apply(self.replay_cells, event)
+        self.replay_position = stop
 
-    def generate_new_board(self, game_ease=0.5):
+        self.draw_cells(bytes(self.replay_cells))
+        self.progress_bar.setValue(stop * 100 // max(1, len(events)))
+        self.operations_label.setText(f"{stop}/{len(events)}")
+
+        if self.token.cancelled or stop == len(events):
+            self.replay_timer.stop()
+            self.status_label.setText(
+                "Cancelled" if self.token.cancelled else "Replayed"
+            )
+            self.enable_buttons()
+
+    def cancel_solve(self):
+        """Bound to the `cancel` button, stop the solve or replay, it finishes up on
+        the next frame"""
+        print("CancelButton - Clicked")
+        self.token.cancel()
+
+    def stop_solve(self):
+        """Cancel the solve, if there is one, and wait for its thread to end"""
+        if self.solve_thread is not None:
+            self.token.cancel()
+            self.solve_thread.wait()
+
+    def generate_new_board(self, game_ease=None):
         """Bound to the `generate` button and does what it says on the tin
 
         Will clear the cells, and generate a new puzzle with `game_ease` setting
@@ -332,22 +656,20 @@ class Gui:
 
         Parameters
         ----------
-        game_ease : float
-            How much of the generated board to hide, i.e. difficulty
+        game_ease : float, default=None
+            How much of the generated board to hide, i.e. difficulty. None to use
+            what's picked in the difficulty select box
 
         """
         print("NewButton - Clicked")
-        # TODO - add
-        self.set_board_values("0")
-        self.get_widget_by_type_and_name("operationsLabel", QtWidgets.QLabel).setText(
-            "0"
-        )
+        if game_ease is None:
+            game_ease = self.difficulty_select_box.currentData()
 
-        self.get_widget_by_type_and_name("statusLabel", QtWidgets.QLabel).setText(
-            "Ready"
-        )
+        puzzle, _ = Generator().generate(game_ease)
+        self.write_board(puzzle)
+
+        self.set_labels("Ready", "0", "0")
         self.set_progress_bar_value(0)
-        self.get_widget_by_type_and_name("timeLabel", QtWidgets.QLabel).setText("0")
 
     def run(self):
         """Brains of the operation, post load, this is executed to actually
@@ -366,12 +688,17 @@ class Gui:
         value : int
             Value between 0 to 100
         """
-        self.get_widget_by_type_and_name(
-            "progressBar", QtWidgets.QProgressBar
-        ).setValue(value)
+        self.progress_bar.setValue(value)
 
-        # Dirty hack to process gui updates
-        self.app.processEvents()
+    def backtrack(self, row, column):
+        """The solver has run out of guesses for a cell, it's already been emptied
+        by `set_board_value()` so there's nothing to draw
+
+        Parameters
+        ----------
+        row : int
+        column : int
+        """
 
     def set_board_value(self, row, column, value):
         """For given `row`, `column` set it to the value `value`
@@ -384,12 +711,7 @@ class Gui:
         column : int
         value : int
         """
-        self.get_widget_by_type_and_name(
-            f"txtRow{row}Col{column}", QtWidgets.QLineEdit
-        ).setText(str(value))
-
-        # Dirty hack to process gui updates
-        self.app.processEvents()
+        self.cell_boxes[row][column].setText(str(value))
 
     def get_board_value(self, row, column):
         """For given `row` and `column` get it's value
@@ -406,9 +728,37 @@ class Gui:
         str
             Value of the cell, not always an int hence str
         """
-        return self.get_widget_by_type_and_name(
-            f"txtRow{row}Col{column}", QtWidgets.QLineEdit
-        ).text()
+        return self.cell_boxes[row][column].text()
+
+    def read_board(self):
+        """Every cell as a board
+
+        Return
+        ------
+        list[list[int]]
+
+        Raises
+        ------
+        ValueError
+            If a cell isn't a number from 0 to 9
+        """
+        board = [[int(box.text()) for box in row] for row in self.cell_boxes]
+
+        if any(not 0 <= value <= 9 for row in board for value in row):
+            raise ValueError("Cells go from 0 to 9")
+
+        return board
+
+    def write_board(self, board):
+        """Set every cell from a board
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+        """
+        for boxes, values in zip(self.cell_boxes, board):
+            for box, value in zip(boxes, values):
+                box.setText(str(value))
 
     def set_board_values(self, value="0"):
         """Utility function to set all of the cells to a given `value`
@@ -418,21 +768,12 @@ class Gui:
         value : str
             What to set the cell value to
         """
-        board_squares = self.get_all_widgets_by_type_and_name_starting_with(
-            name="txt", widget_type=QtWidgets.QLineEdit
-        )
-
-        for square in board_squares:
-            square.setText(value)
+        for row in self.cell_boxes:
+            for box in row:
+                box.setText(value)
 
     def clear_board(self):
         """Bound to the `clear` button, will set all of the cells to be blank"""
         self.set_board_values("")
-        self.get_widget_by_type_and_name("statusLabel", QtWidgets.QLabel).setText(
-            "Ready"
-        )
+        self.set_labels("Ready", "0", "0")
         self.set_progress_bar_value(0)
-        self.get_widget_by_type_and_name("timeLabel", QtWidgets.QLabel).setText("0")
-        self.get_widget_by_type_and_name("operationsLabel", QtWidgets.QLabel).setText(
-            "0"
-        )
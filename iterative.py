@@ -0,0 +1,322 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from math import isqrt
+
+from board import Board
+from solver import BitmaskSolver
+
+# Where an `IterativeSolver` is up to
+RUNNING = "running"
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"
+
+
+class IterativeSolver(BitmaskSolver):
+    """
+    Non-recursive version of `BitmaskSolver`, the search state lives in an explicit
+    stack rather than Python frames so a solve can be advanced a bounded number of
+    steps at a time, snapshotted, and picked back up later
+
+    Every filled cell (guessed or propagated) goes on one trail in the order it was
+    filled, and each stack frame is a guessed cell, the candidates left to try
+    for it and the trail length before the guess. Candidates are always tried
+    lowest digit first
+
+    Usage
+    -----
+    solver.start(board)
+    while solver.step(1000) == RUNNING:
+        ... do something else ...
+    """
+
+    def __init__(self, cell_selection="mrv", use_propagation=True) -> None:
+        """
+        Parameters
+        ----------
+        cell_selection : str, default='mrv'
+            See `BitmaskSolver`
+        use_propagation : bool, default=True
+            See `BitmaskSolver`
+        """
+        super().__init__(
+            cell_selection=cell_selection, use_propagation=use_propagation
+        )
+        self.gui = None
+        self.status = None
+        self.descending = True
+
+        # The stack, one entry per guess in each
+        self.stack_cells = []
+        self.stack_candidates = []
+        self.stack_marks = []
+
+    def start(self, board, gui=None):
+        """Load a board ready for `step()`, the board is mutated in place as the
+        search goes
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+            0's are for unsolved. A list[list[int]] board is brought up to date each
+            time `step()` hands back
+        gui : Gui
+            If not None, it will call back and update the value in real time in the gui
+
+        Return
+        ------
+        str
+            Status after loading, `UNSOLVABLE` straight away if the givens clash or
+            propagation hits a contradiction
+        """
+        self.gui = gui
+        self.trail = []
+        self.propagated_count = 0
+        self.searched_count = 0
+        self.solved_by_propagation = False
+        self.stack_cells = []
+        self.stack_candidates = []
+        self.stack_marks = []
+        self.descending = True
+        self.status = RUNNING
+
+        if not self.load_masks(board):
+            self.status = UNSOLVABLE
+            return self.status
+
+        if self.use_propagation and not self.propagate(gui):
+            self.finish(UNSOLVABLE)
+            return self.status
+
+        if self.empty_count == 0:
+            self.solved_by_propagation = self.use_propagation
+            self.status = SOLVED
+
+        self.write_back()
+        return self.status
+
+    def finish(self, status):
+        """Stop the search, an unsolvable board is put back how it was given
+
+        Parameters
+        ----------
+        status : str
+        """
+        if status == UNSOLVABLE:
+            # Every guess has been undone by now, what's left on the trail was
+            # propagated before the first guess
+            self.undo_propagation(0, self.gui)
+
+        self.status = status
+        self.write_back()
+
+    def undo_to(self, mark):
+        """Empty every cell filled since the trail was `mark` long, the cell at
+        `mark` is a guess (if the trail is that long) and the rest are propagated
+
+        Parameters
+        ----------
+        mark : int
+            Length of the trail to go back to
+        """
+        if len(self.trail) <= mark:
+            return
+
+        self.undo_propagation(mark + 1, self.gui)
+
+        cell = self.trail.pop()
+        self.unassign(cell, self.cells[cell])
+        self.restore_empty_cell()
+        self.searched_count -= 1
+
+        if self.gui is not None:
+            self.gui.set_board_value(self.cell_row[cell], self.cell_column[cell], 0)
+
+    def step(self, max_steps=None):
+        """Advance the search, each step is either picking a new cell or trying the
+        next guess for the current one
+
+        Parameters
+        ----------
+        max_steps : int, default=None
+            Most steps to take before handing back, None to run until finished
+
+        Return
+        ------
+        str
+            `RUNNING` if there is more to do, `SOLVED` or `UNSOLVABLE` when done
+        """
+        gui = self.gui
+        stack_cells = self.stack_cells
+        stack_candidates = self.stack_candidates
+        stack_marks = self.stack_marks
+        steps = 0
+
+        while self.status == RUNNING:
+            if max_steps is not None and steps >= max_steps:
+                break
+            steps += 1
+
+            if self.budget is not None:
+                self.budget.check()
+
+            if self.descending:
+                if self.empty_count == 0:
+                    self.finish(SOLVED)
+                    break
+
+                cell, candidates = self.select_cell()
+
+                if candidates:
+                    stack_cells.append(cell)
+                    stack_candidates.append(candidates)
+                    stack_marks.append(len(self.trail))
+                elif gui is not None:
+                    gui.backtrack(self.cell_row[cell], self.cell_column[cell])
+
+                self.descending = False
+                continue
+
+            # Backtracking, try the next candidate of the top frame
+            if not stack_cells:
+                self.finish(UNSOLVABLE)
+                break
+
+            self.undo_to(stack_marks[-1])
+            candidates = stack_candidates[-1]
+
+            if not candidates:
+                cell = stack_cells.pop()
+                stack_candidates.pop()
+                stack_marks.pop()
+
+                if gui is not None:
+                    gui.backtrack(self.cell_row[cell], self.cell_column[cell])
+                continue
+
+            bit = candidates & -candidates
+            stack_candidates[-1] = candidates ^ bit
+            cell = stack_cells[-1]
+            row = self.cell_row[cell]
+            column = self.cell_column[cell]
+            guess = bit.bit_length() - 1
+
+            self.assign(cell, guess)
+            self.remove_empty_cell(cell)
+            self.trail.append(cell)
+            self.searched_count += 1
+
+            if gui is not None:
+                gui.set_board_value(row, column, guess)
+                gui.set_progress_bar_value((((row + 1) * 10) + column + 2))
+
+            self.descending = not self.use_propagation or self.propagate(gui)
+
+        if self.status == RUNNING:
+            self.write_back()
+
+        return self.status
+
+    def solve(self, board, gui=None):
+        """Solve the board in place, see `Solver.solve()`
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+            0's are for unsolved
+        gui : Gui
+            If not None, it will call back and update the value in real time in the gui
+
+        Return
+        ------
+        bool
+            True if the board has been solved, False if it can't be
+        """
+        self.start(board, gui)
+        return self.step() == SOLVED
+
+    def snapshot(self):
+        """Capture where the search is up to as plain lists and ints, so it can be
+        pickled or dumped to json as a checkpoint
+
+        Return
+        ------
+        dict
+            Everything `restore()` needs to carry on
+        """
+        return {
+            "board": list(self.cells),
+            "trail": list(self.trail),
+            "empty_cells": list(self.empty_cells),
+            "empty_count": self.empty_count,
+            "stack_cells": list(self.stack_cells),
+            "stack_candidates": list(self.stack_candidates),
+            "stack_marks": list(self.stack_marks),
+            "descending": self.descending,
+            "status": self.status,
+            "propagated_count": self.propagated_count,
+            "searched_count": self.searched_count,
+            "solved_by_propagation": self.solved_by_propagation,
+        }
+
+    def restore(self, snapshot, board=None, gui=None):
+        """Carry on from a `snapshot()`, on this or any other `IterativeSolver`
+
+        Parameters
+        ----------
+        snapshot : dict
+            As returned by `snapshot()`
+        board : Board or list[list[int]], default=None
+            Board to solve into, it is overwritten with the snapshot's cells. A new
+            `Board` is made if None
+        gui : Gui
+
+        Return
+        ------
+        Board or list[list[int]]
+            The board being solved into
+        """
+        cells = snapshot["board"]
+        if board is None:
+            board = Board(cells)
+        elif isinstance(board, Board):
+            board.cells[:] = bytes(cells)
+        else:
+            size = isqrt(len(cells))
+            for row in range(size):
+                board[row][:] = cells[row * size : row * size + size]
+
+        self.gui = gui
+        self.load_masks(board)
+
+        # The index order matters, it's what lets cells be restored in reverse
+        self.trail = list(snapshot["trail"])
+        self.empty_cells = list(snapshot["empty_cells"])
+        self.empty_count = snapshot["empty_count"]
+        for position, cell in enumerate(self.empty_cells):
+            self.empty_positions[cell] = position
+
+        self.stack_cells = list(snapshot["stack_cells"])
+        self.stack_candidates = list(snapshot["stack_candidates"])
+        self.stack_marks = list(snapshot["stack_marks"])
+        self.descending = snapshot["descending"]
+        self.status = snapshot["status"]
+        self.propagated_count = snapshot["propagated_count"]
+        self.searched_count = snapshot["searched_count"]
+        self.solved_by_propagation = snapshot["solved_by_propagation"]
+
+        return board
@@ -15,65 +15,709 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
-import signal
+import sys
 import time
-from pprint import pprint
+from itertools import islice
 
-from args import Args
-from run import Run
-from file import FileUtils
+# Everything else is imported by the mode that needs it, so starting one mode
+# doesn't pay for the others (`headless benchmark --startup` keeps an eye on it)
 
 
-args = Args.process()
+def create_cache(args):
+    """Make the solution cache asked for on the command line, if any
 
-if __name__ == "__main__":
-    # Nasty but when ctrl+c on cmdline then kill the whole thing
-    signal.signal(signal.SIGINT, signal.SIG_DFL)
-    
-    if hasattr(args, "gui"):
-        print(f"GUI - [{args.gui}]")
-        from gui import Gui
+    Parameters
+    ----------
+    args : Namespace
+        Processed arguments from `Args.process()`
+
+    Return
+    ------
+    SolutionCache or None
+    """
+    if args.cache_size is None and args.cache_file is None:
+        return None
+
+    from cache import SolutionCache
+
+    return SolutionCache(max_size=args.cache_size or 100000, database=args.cache_file)
+
+
+def create_budget(args, token=None):
+    """Make the per-puzzle budget asked for on the command line, if any
+
+    Parameters
+    ----------
+    args : Namespace
+        Processed arguments from `Args.process()`
+    token : CancellationToken, default=None
+        If not None, solves can be cancelled with it even without a limit
+
+    Return
+    ------
+    Budget or None
+    """
+    if args.timeout is None and args.max_operations is None and token is None:
+        return None
+
+    from budget import Budget
+
+    return Budget(args.timeout, args.max_operations, token)
+
+
+def create_writer(args):
+    """Make the writer for the solutions, to stdout or the output file in the
+    format asked for on the command line. Exits if they can't go together
+
+    Parameters
+    ----------
+    args : Namespace
+        Processed arguments from `Args.process()`
+
+    Return
+    ------
+    ResultWriter
+    """
+    from writer import ResultWriter, DEFAULT_OUTPUT_FILE
+
+    file_name = args.output_file
+    if file_name is None and args.output == "file":
+        file_name = DEFAULT_OUTPUT_FILE
+
+    try:
+        return ResultWriter(file_name, args.format)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+
+
+def report_metrics(metrics, json_file_name=None, file=None):
+    """Print the breakdown of the work done, and write it out as JSON if asked
+
+    Parameters
+    ----------
+    metrics : Metrics
+    json_file_name : str, default=None
+        If not None, where to write `Metrics.to_json()`
+    file : file, default=None
+        Where to print, None for stdout
+    """
+    print(f"Metrics - {metrics}", file=file)
+    print(f"Depths - {metrics.format_histogram()}", file=file)
+
+    if json_file_name is not None:
+        with open(json_file_name, "w") as json_file:
+            json_file.write(metrics.to_json())
+            json_file.write("\n")
+        print(f"Metrics written to file [{json_file_name}]", file=file)
+
+
+def cancel_on_interrupt(token):
+    """The first ctrl+c cancels the solve that's running rather than killing the
+    whole thing, so a batch still writes what it's done and prints its totals. A
+    second ctrl+c kills it like before
+
+    Parameters
+    ----------
+    token : CancellationToken
+    """
+    import signal
+
+    def interrupt(signal_number, frame):
+        token.cancel()
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    signal.signal(signal.SIGINT, interrupt)
+
+
+def remember_puzzles(lines, puzzles):
+    """Pass the puzzles through, keeping each one by its index in the batch until
+    it's taken out, for writers that write the puzzle with its solution
+
+    Parameters
+    ----------
+    lines : iterable[str]
+    puzzles : dict
+        Filled in with index: puzzle, blank lines don't count like in the runners
+
+    Yield
+    -----
+    str
+        Each puzzle, stripped
+    """
+    index = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        puzzles[index] = line
+        index += 1
+        yield line
 
-        gui = Gui(ui_file_name="qt_gui.ui")
 
-        gui.load()
-        gui.run()
+def process_batch(args, token=None):
+    """Stream a batch of puzzles through one `Run`, handing each result to the
+    writer as soon as it's solved. Solutions go to stdout (or the output file) in
+    `--format`, the progress and totals go to stderr so they don't get mixed in
+    with them
+
+    Parameters
+    ----------
+    args : Namespace
+        Processed arguments from `Args.process()`
+    token : CancellationToken, default=None
+        Once cancelled the batch stops after the puzzle it's on, puzzles already
+        handed to `--workers` are finished first
+    """
+    from budget import BudgetExceeded, CANCELLED
+    from file import FileUtils
+    from packed import PackedReader, is_packed
+    from run import Run
+    from validate import InvalidPuzzle
+
+    cpu_start_time = time.process_time()
+    wall_start_time = time.time()
+
+    writer = create_writer(args)
+
+    print(
+        f"Batch=[{args.batch}], Output=[{writer.file_name or 'stdout'}], "
+        f"Format=[{writer.format}], Engine=[{args.engine}], Workers=[{args.workers}]",
+        file=sys.stderr,
+    )
+
+    stop = None if args.count is None else args.start + args.count
+    reader = None
+
+    if is_packed(args.batch):
+        reader = PackedReader(args.batch)
+        lines = reader.oneliners(args.start, stop)
+    else:
+        lines = islice(FileUtils.read_lines(args.batch), args.start, stop)
+
+    # Kept from being read until written, the runners only hand back solutions
+    puzzles = {}
+    if writer.needs_puzzle:
+        lines = remember_puzzles(lines, puzzles)
+
+    cache = create_cache(args)
+    budget = create_budget(args, token)
+    metrics = args.metrics or args.metrics_json is not None
+
+    if cache is not None and (args.vectorized or args.workers != 1):
+        print(
+            "Solution cache is only used without --workers/--vectorized",
+            file=sys.stderr,
+        )
+
+    if args.vectorized:
+        from vectorized import VectorizedBatchSolver
+
+        runner = VectorizedBatchSolver(args.engine, budget=budget, metrics=metrics)
+        results = runner.process(lines)
+    elif args.workers == 1:
+        runner = Run(args.engine, cache, budget, metrics=metrics)
+        results = (
+            (index, result, board and Run.format_oneliner(board))
+            for index, (result, board) in enumerate(runner.process_batch(lines))
+        )
     else:
-        cpu_start_time = time.process_time()
-        wall_start_time = time.time()
+        from parallel import ParallelRunner
+
+        runner = ParallelRunner(
+            args.workers,
+            args.engine,
+            args.ordered,
+            timeout=args.timeout,
+            max_operations=args.max_operations,
+            metrics=metrics,
+        )
+        results = runner.process(lines)
+
+    counts = {"solved": 0, "unsolvable": 0, "invalid": 0, "budget_exceeded": 0}
+
+    try:
+        for index, result, solution in results:
+            puzzle = puzzles.pop(index, None)
+
+            # Everything after the first cancelled puzzle is cancelled too
+            if isinstance(result, BudgetExceeded) and result.reason == CANCELLED:
+                print(f"Cancelled, stopping at [{index + 1}]", file=sys.stderr)
+                break
 
-        result = False
-        final_board = []
-        output = args.output
-        run = Run()
+            if result is None or isinstance(result, InvalidPuzzle):
+                # Conflicting givens are reported with the cells they're in
+                counts["invalid"] += 1
+                reason = "Invalid puzzle" if result is None else result
+                print(f"{reason}, skipping [{index + 1}]", file=sys.stderr)
+                continue
 
+            if isinstance(result, BudgetExceeded):
+                # Left out like an invalid puzzle, reported with the puzzle itself
+                # so the slow ones can be picked out and run again on their own
+                counts["budget_exceeded"] += 1
+                print(
+                    f"{result}, skipping [{index + 1}] [{solution}]", file=sys.stderr
+                )
+                continue
+
+            counts["solved" if result else "unsolvable"] += 1
+            writer.write(solution, puzzle, index)
+    finally:
+        writer.close()
+        if reader is not None:
+            reader.close()
+
+    wall_time = time.time() - wall_start_time
+    cpu_time = time.process_time() - cpu_start_time
+    total = sum(counts.values())
+    throughput = round(total / wall_time, 2) if wall_time else total
+
+    print(
+        f"Puzzles - Total=[{total}], Solved=[{counts['solved']}], "
+        f"Unsolvable=[{counts['unsolvable']}], Invalid=[{counts['invalid']}], "
+        f"BudgetExceeded=[{counts['budget_exceeded']}]",
+        file=sys.stderr,
+    )
+    print(
+        f"Time - CPU=[{round(cpu_time, 2)}]seconds, Wall=[{round(wall_time, 2)}]seconds",
+        file=sys.stderr,
+    )
+    print(f"Throughput - [{throughput}]puzzles/sec", file=sys.stderr)
+
+    # Counted by the budget, the workers always have one of their own
+    if args.workers != 1 and not args.vectorized:
+        print(f"Operations - {runner.operation_count}", file=sys.stderr)
+    elif budget is not None:
+        print(f"Operations - {budget.operation_count}", file=sys.stderr)
+
+    if metrics:
+        report_metrics(runner.metrics, args.metrics_json, sys.stderr)
+
+    if cache is not None:
+        print(f"Cache - {cache.stats()}", file=sys.stderr)
+        cache.close()
+
+    if writer.file_name is not None:
+        print(
+            f"Output - [{writer.count}]solutions written to file [{writer.file_name}]",
+            file=sys.stderr,
+        )
+
+
+def process_generate(args):
+    """Make unique puzzles and write them out as they come, one oneliner per line
+    or as a packed file. Progress and totals go to stderr
+
+    Parameters
+    ----------
+    args : Namespace
+        Processed arguments from `Args.process()`
+    """
+    from generator import generate_many
+    from packed import PackedWriter
+
+    wall_start_time = time.time()
+
+    print(
+        f"Generate=[{args.generate}], Count=[{args.count}], Empty=[{args.empty}], "
+        f"Seed=[{args.seed}], Workers=[{args.workers}]",
+        file=sys.stderr,
+    )
+
+    if args.packed and (args.generate == "-" or args.box_size != 3):
+        print("Packed output needs a file name and 9x9 puzzles", file=sys.stderr)
+        sys.exit(1)
+
+    writers = []
+    for file_name, solutions in ((args.generate, False), (args.solutions, True)):
+        if file_name is None:
+            writers.append(None)
+        elif args.packed:
+            writers.append(PackedWriter(file_name, solutions))
+        elif file_name == "-":
+            writers.append(sys.stdout)
+        else:
+            writers.append(open(file_name, "w"))
+
+    count = 0
+    try:
+        for oneliners in generate_many(
+            args.count, args.empty, args.seed, args.workers, args.box_size
+        ):
+            for writer, oneliner in zip(writers, oneliners):
+                if writer is None:
+                    continue
+
+                if args.packed:
+                    writer.write_oneliner(oneliner)
+                else:
+                    writer.write(oneliner)
+                    writer.write("\n")
+            count += 1
+    finally:
+        for writer in writers:
+            if writer is not None and writer is not sys.stdout:
+                writer.close()
+
+    wall_time = time.time() - wall_start_time
+    throughput = round(count / wall_time, 2) if wall_time else count
+
+    print(f"Generated - [{count}]puzzles", file=sys.stderr)
+    print(f"Time - Wall=[{round(wall_time, 2)}]seconds", file=sys.stderr)
+    print(f"Throughput - [{throughput}]puzzles/sec", file=sys.stderr)
+
+
+def process_benchmark(args):
+    """Time the engines, on generated puzzles of each size or on the bundled
+    corpora. Corpus results can be saved as a baseline, or compared against one
+    which exits with 1 if anything has regressed. Or time starting up, which exits
+    with 1 if it's slower than the target
+
+    Parameters
+    ----------
+    args : Namespace
+        Processed arguments from `Args.process()`
+    """
+    from benchmark import (
+        CORPORA,
+        benchmark_corpora,
+        benchmark_sizes,
+        benchmark_startup,
+        compare_to_baseline,
+        load_baseline,
+        save_baseline,
+    )
+
+    if args.startup:
+        result = benchmark_startup()
+        print(f"Startup - Command=[{result['command']}], Runs=[{result['runs']}]")
+
+        # The slowest of what `main.py` imports itself, the rest come in with them
+        imports = sorted(
+            (row for row in result["imports"] if row["depth"] == 0),
+            key=lambda row: row["cumulative"],
+            reverse=True,
+        )
+        print(
+            f"Imports - [{len(result['imports'])}]modules, "
+            + ", ".join(
+                f"{row['module']}=[{round(row['cumulative'] * 1000, 1)}]ms"
+                for row in imports[:5]
+            )
+        )
+        print(
+            f"Latency - P50=[{round(result['p50'] * 1000, 1)}]ms, "
+            f"Interpreter=[{round(result['interpreter'] * 1000, 1)}]ms, "
+            f"Target=[{round(args.target * 1000, 1)}]ms"
+        )
+        if result["p50"] > args.target:
+            print("Slower than the target")
+            sys.exit(1)
+        return
+
+    if args.corpora is None:
+        print(
+            f"Benchmark - Sizes=[{', '.join(map(str, args.box_sizes))}], "
+            f"Engines=[{', '.join(args.engines)}], Count=[{args.count}], "
+            f"Empty=[{args.empty}], Seed=[{args.seed}]"
+        )
+
+        for row in benchmark_sizes(
+            args.engines, args.box_sizes, args.count, args.empty, args.seed
+        ):
+            print(
+                f"{row['size']}x{row['size']} {row['engine']} - "
+                f"Solved=[{row['solved']}/{row['puzzles']}], "
+                f"Time=[{round(row['seconds'], 3)}]seconds, "
+                f"Slowest=[{round(row['slowest'], 3)}]seconds, "
+                f"Throughput=[{round(row['puzzles_per_second'], 2)}]puzzles/sec, "
+                f"Operations=[{row['operations']}]"
+            )
+        return
+
+    corpora = args.corpora or CORPORA
+    print(
+        f"Benchmark - Corpora=[{', '.join(corpora)}], "
+        f"Engines=[{', '.join(args.engines)}], Timeout=[{args.timeout}]seconds"
+    )
+
+    rows = []
+    for row in benchmark_corpora(args.engines, corpora, args.timeout, args.memory):
+        rows.append(row)
+        memory = "-" if row["peak_memory"] is None else row["peak_memory"] // 1024
+        print(
+            f"{row['corpus']} {row['engine']} - "
+            f"Solved=[{row['solved']}/{row['puzzles']}], "
+            f"BudgetExceeded=[{row['budget_exceeded']}], "
+            f"Throughput=[{round(row['puzzles_per_second'], 2)}]puzzles/sec, "
+            f"P50=[{round(row['p50'] * 1000, 3)}]ms, "
+            f"P99=[{round(row['p99'] * 1000, 3)}]ms, "
+            f"Operations=[{row['operations']}], PeakMemory=[{memory}]KiB"
+        )
+
+    if args.save is not None:
+        save_baseline(rows, args.save)
+        print(f"Baseline written to file [{args.save}]")
+
+    if args.compare is not None:
+        regressions = compare_to_baseline(
+            rows, load_baseline(args.compare), args.threshold
+        )
+
+        for regression in regressions:
+            print(
+                f"Regression - {regression['corpus']} {regression['engine']} "
+                f"{regression['metric']}, Baseline=[{regression['baseline']}], "
+                f"Current=[{regression['current']}], "
+                f"Worse=[{round(regression['change'] * 100, 1)}]%"
+            )
+
+        print(
+            f"Compared to [{args.compare}] - [{len(regressions)}]regressions, "
+            f"Threshold=[{args.threshold}]"
+        )
+        if regressions:
+            sys.exit(1)
+
+
+def process_solve(args, token=None):
+    """Solve the one puzzle given as a oneliner or in a file, writing the solution
+    to stdout or the output file in `--format`
+
+    Parameters
+    ----------
+    args : Namespace
+        Processed arguments from `Args.process()`
+    token : CancellationToken, default=None
+        Cancels the solve, see `create_budget()`
+    """
+    from run import Run, INVALID
+    from validate import InvalidPuzzle
+
+    writer = create_writer(args)
+    output = writer.file_name or "stdout"
+
+    cpu_start_time = time.process_time()
+    wall_start_time = time.time()
+
+    cache = create_cache(args)
+    run = Run(
+        args.engine,
+        cache=cache,
+        budget=create_budget(args, token),
+        record_trace=args.trace is not None,
+        metrics=args.metrics or args.metrics_json is not None,
+    )
+
+    try:
         if hasattr(args, "oneliner"):
-            print(f"OneLiner=[{args.oneliner}], Output=[{output}]")
-            result, final_board = run.process_oneliner(args.oneliner)
+            print(
+                f"OneLiner=[{args.oneliner}], Output=[{output}], Engine=[{args.engine}]"
+            )
+            board = Run.parse_oneliner(args.oneliner)
 
         elif hasattr(args, "file"):
-            print(f"File=[{args.file}], Output=[{output}]")
-            result, final_board = run.process_file(args.file)
+            print(f"File=[{args.file}], Output=[{output}], Engine=[{args.engine}]")
+            board = Run.parse_file(args.file)
+    except (RuntimeError, ValueError) as error:
+        writer.close()
+        print(f"Solved? - {error}")
+        print(f"Status - {INVALID}")
+        sys.exit(1)
 
-        wall_end_time = time.time()
-        cpu_end_time = time.process_time()
+    # Kept before solving fills it in, some formats write it with the solution
+    puzzle = Run.format_oneliner(board)
+    result = run.solve(board)
 
-        cpu_time = cpu_end_time - cpu_start_time
-        wall_time = wall_end_time - wall_start_time
+    wall_end_time = time.time()
+    cpu_end_time = time.process_time()
 
-        print(f"Solved? - {result}")
-        print(f"Time - CPU=[{round(cpu_time, 2)}]seconds, Wall=[{round(wall_time, 2)}]seconds")
-        print(f"Operations - {run.solver.operation_count}")
+    cpu_time = cpu_end_time - cpu_start_time
+    wall_time = wall_end_time - wall_start_time
 
-        if output == "file":
-            file_contents = []
-            file = "output.txt"
+    # A budget overrun reads "Budget exceeded [reason] after [N] operations", and
+    # conflicting givens "Invalid puzzle, duplicate 5 in row 1 [r1c2 r1c7]"
+    print(f"Solved? - {result}")
+    print(f"Status - {Run.status(result)}")
+    print(f"Time - CPU=[{round(cpu_time, 2)}]seconds, Wall=[{round(wall_time, 2)}]seconds")
+    if run.budget is not None:
+        print(f"Operations - {run.budget.operations}")
+    if hasattr(run.solver, "propagated_count"):
+        print(
+            f"Filled - Propagation=[{run.solver.propagated_count}], "
+            f"Search=[{run.solver.searched_count}], "
+            f"PropagationOnly=[{run.solver.solved_by_propagation}]"
+        )
+    if run.metrics is not None:
+        report_metrics(run.metrics, args.metrics_json)
+    if args.trace is not None:
+        run.trace.save(args.trace)
+        print(
+            f"Trace - [{len(run.trace)}]events, Dropped=[{run.trace.dropped}], "
+            f"written to [{args.trace}]"
+        )
 
-            for board_row in final_board:
-                file_contents.append(",".join(map(str, board_row)))
-                file_contents.append("\n")
+    if cache is not None:
+        print(f"Cache - {cache.stats()}")
+        cache.close()
 
-            FileUtils.write_file(file, file_contents)
-            print(f"Output written to file [{file}]")
-        else:
-            pprint(final_board)
+    if isinstance(result, InvalidPuzzle):
+        writer.close()
+        sys.exit(1)
+
+    with writer:
+        writer.write(Run.format_oneliner(board), puzzle, 0)
+
+    if writer.file_name is not None:
+        print(f"Output written to file [{writer.file_name}]")
+
+
+def process_stream(args, token=None):
+    """Answer JSON-lines requests on stdin with JSON-lines responses on stdout, the
+    totals go to stderr
+
+    Parameters
+    ----------
+    args : Namespace
+        Processed arguments from `Args.process()`
+    token : CancellationToken, default=None
+        Once cancelled the stream stops after the request it's on
+    """
+    import stream
+
+    print(
+        f"Stream - Engine=[{args.engine}], FlushEvery=[{args.flush_every}]",
+        file=sys.stderr,
+    )
+    counts = stream.process_stream(
+        sys.stdin.buffer,
+        sys.stdout.buffer,
+        args.engine,
+        args.timeout,
+        args.max_operations,
+        args.flush_every,
+        token,
+    )
+    print(
+        f"Requests - Total=[{sum(counts.values())}], "
+        + ", ".join(f"{status}=[{count}]" for status, count in counts.items()),
+        file=sys.stderr,
+    )
+
+
+def process_convert(args):
+    """Convert a file of oneliners to a packed file, or a packed file back
+
+    Parameters
+    ----------
+    args : Namespace
+        Processed arguments from `Args.process()`
+    """
+    from file import FileUtils
+    from packed import is_packed, oneliners_to_packed, packed_to_oneliners
+
+    if is_packed(args.convert):
+        count = 0
+        with open(args.destination, "w") as destination:
+            for oneliner in packed_to_oneliners(args.convert):
+                destination.write(oneliner)
+                destination.write("\n")
+                count += 1
+    else:
+        count = oneliners_to_packed(
+            FileUtils.read_lines(args.convert), args.destination
+        )
+
+    print(f"Converted [{count}] puzzles from [{args.convert}] to [{args.destination}]")
+
+
+def process_gui(args):
+    """Open the GUI, loading a trace to replay if one was given
+
+    Parameters
+    ----------
+    args : Namespace
+        Processed arguments from `Args.process()`
+    """
+    from gui import Gui
+
+    print(f"GUI - [{args.gui}]")
+    gui = Gui(ui_file_name="qt_gui.ui", trace_file_name=args.trace)
+
+    gui.load()
+    if args.replay is not None:
+        from events import EventTrace
+
+        gui.set_trace(EventTrace.load(args.replay))
+    gui.run()
+
+
+def process_serve(args):
+    """Serve HTTP/JSON solving until ctrl+c
+
+    Parameters
+    ----------
+    args : Namespace
+        Processed arguments from `Args.process()`
+    """
+    import asyncio
+
+    from server import serve
+
+    try:
+        asyncio.run(
+            serve(
+                host=args.host,
+                port=args.port,
+                workers=args.workers,
+                engine=args.engine,
+                timeout=args.timeout,
+                queue_size=args.queue_size,
+                max_batch=args.max_batch,
+            )
+        )
+    except KeyboardInterrupt:
+        print("Stopped")
+
+
+def main():
+    """Process the command line and run the mode it asks for"""
+    import signal
+
+    from args import Args
+    from budget import CancellationToken
+
+    args = Args.process()
+    token = CancellationToken()
+
+    if hasattr(args, "gui"):
+        # Qt holds on to ctrl+c, so on the cmdline it just kills the whole thing
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+    elif hasattr(args, "serve"):
+        # Stops the server, even if started from something that ignores ctrl+c
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    else:
+        cancel_on_interrupt(token)
+
+    if hasattr(args, "gui"):
+        process_gui(args)
+    elif hasattr(args, "serve"):
+        process_serve(args)
+    elif hasattr(args, "batch"):
+        process_batch(args, token)
+    elif hasattr(args, "stream"):
+        process_stream(args, token)
+    elif hasattr(args, "generate"):
+        process_generate(args)
+    elif hasattr(args, "benchmark"):
+        process_benchmark(args)
+    elif hasattr(args, "convert"):
+        process_convert(args)
+    else:
+        process_solve(args, token)
+
+
+if __name__ == "__main__":
+    main()
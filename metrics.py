@@ -0,0 +1,313 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+
+from solver import BitmaskSolver
+from dlx import DlxSolver
+
+# Counters kept for every engine, in the order they're shown
+COUNTERS = ("nodes", "guesses", "validations", "backtracks", "propagations")
+
+
+class Metrics:
+    """
+    Breakdown of the work done by a solver, counted by the wrappers `instrument()`
+    puts on it. A solver that hasn't been instrumented has nothing added to it at
+    all, so with metrics off the engines run exactly as they always have
+
+    nodes - times the search picked a cell (a column for dlx) to branch on
+    guesses - values tried in a cell by the search
+    validations - a guess checked against the rules, or a cell's candidates worked
+        out, dlx has none as the matrix rules out clashes up front
+    backtracks - guesses taken back because they led to a dead end
+    propagations - cells filled in by propagation rather than a guess
+    max_depth - most guesses on the go at once
+    depth_histogram - nodes at each depth, index 0 is the board as given
+
+    Usage
+    -----
+    metrics = instrument(solver)
+    solver.solve(board)
+    print(metrics)
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.reset()
+
+    def reset(self):
+        """Zero every counter, ready for another puzzle"""
+        self.nodes = 0
+        self.guesses = 0
+        self.validations = 0
+        self.backtracks = 0
+        self.propagations = 0
+        self.max_depth = 0
+        self.depth_histogram = []
+
+    def node(self, depth):
+        """Count a node
+
+        Parameters
+        ----------
+        depth : int
+            Guesses on the go when the node was reached
+        """
+        self.nodes += 1
+        histogram = self.depth_histogram
+
+        if depth >= len(histogram):
+            histogram.extend([0] * (depth + 1 - len(histogram)))
+            self.max_depth = depth
+
+        histogram[depth] += 1
+
+    def as_dict(self):
+        """Every counter, ready for JSON or to pass between processes
+
+        Return
+        ------
+        dict
+            Keyed by the names in `COUNTERS`, plus `max_depth` and
+            `depth_histogram`
+        """
+        counts = {name: getattr(self, name) for name in COUNTERS}
+        counts["max_depth"] = self.max_depth
+        counts["depth_histogram"] = list(self.depth_histogram)
+        return counts
+
+    def add(self, counts):
+        """Add on counters from another solver, e.g. one in a worker process
+
+        Parameters
+        ----------
+        counts : dict
+            From `as_dict()`
+        """
+        for name in COUNTERS:
+            setattr(self, name, getattr(self, name) + counts[name])
+
+        histogram = self.depth_histogram
+        other = counts["depth_histogram"]
+        if len(other) > len(histogram):
+            histogram.extend([0] * (len(other) - len(histogram)))
+
+        for depth, count in enumerate(other):
+            histogram[depth] += count
+        self.max_depth = max(self.max_depth, counts["max_depth"])
+
+    def to_json(self):
+        """Same as `as_dict()` as a JSON string
+
+        Return
+        ------
+        str
+        """
+        return json.dumps(self.as_dict())
+
+    def format_histogram(self):
+        """Nodes at each depth on one line, e.g. "0:[1], 1:[4], 2:[9]"
+
+        Return
+        ------
+        str
+        """
+        return ", ".join(
+            f"{depth}:[{count}]" for depth, count in enumerate(self.depth_histogram)
+        )
+
+    def __str__(self):
+        return (
+            f"Nodes=[{self.nodes}], Guesses=[{self.guesses}], "
+            f"Validations=[{self.validations}], Backtracks=[{self.backtracks}], "
+            f"Propagations=[{self.propagations}], MaxDepth=[{self.max_depth}]"
+        )
+
+
+def instrument(solver, metrics=None):
+    """Wrap the methods `solver` calls as it searches so they count into `metrics`
+
+    Only this one solver is changed, the wrappers are set on the instance and the
+    engine classes are left alone. Instrumenting a solver twice keeps the first
+    `Metrics`
+
+    Parameters
+    ----------
+    solver : Solver, BitmaskSolver, IterativeSolver, DlxSolver or CachedSolver
+        A `CachedSolver` has the engine it wraps instrumented, cache hits aren't
+        counted
+    metrics : Metrics, default=None
+        Counters to add to, None for new ones
+
+    Return
+    ------
+    Metrics
+        The counters, they keep adding up across solves until `reset()`
+    """
+    # Engines wrapped by another (`CachedSolver`) are kept in `solver`
+    while hasattr(solver, "solver"):
+        solver = solver.solver
+
+    if "metrics" in vars(solver):
+        return solver.metrics
+
+    if metrics is None:
+        metrics = Metrics()
+
+    if isinstance(solver, DlxSolver):
+        instrument_dlx(solver, metrics)
+    elif isinstance(solver, BitmaskSolver):
+        instrument_bitmask(solver, metrics)
+    else:
+        instrument_backtrack(solver, metrics)
+
+    solver.metrics = metrics
+    return metrics
+
+
+def instrument_backtrack(solver, metrics):
+    """`instrument()` for the classic `Solver`, each call to `solve()` is a level
+    deeper
+
+    Parameters
+    ----------
+    solver : Solver
+    metrics : Metrics
+    """
+    solve = solver.solve
+    find_next_cell_to_solve = solver.find_next_cell_to_solve
+    check_guess_is_valid = solver.check_guess_is_valid
+    depth = 0
+
+    def counted_solve(board, gui=None):
+        nonlocal depth
+        depth += 1
+        try:
+            solved = solve(board, gui)
+        finally:
+            depth -= 1
+
+        # Anything below the top is a guess that gets taken back
+        if not solved and depth:
+            metrics.backtracks += 1
+        return solved
+
+    def counted_find_next_cell_to_solve(board):
+        row, column = find_next_cell_to_solve(board)
+        if row is not None:
+            metrics.node(depth - 1)
+        return row, column
+
+    def counted_check_guess_is_valid(board, row, column, guess):
+        metrics.validations += 1
+        valid = check_guess_is_valid(board, row, column, guess)
+        if valid:
+            metrics.guesses += 1
+        return valid
+
+    solver.solve = counted_solve
+    solver.find_next_cell_to_solve = counted_find_next_cell_to_solve
+    solver.check_guess_is_valid = counted_check_guess_is_valid
+
+
+def instrument_bitmask(solver, metrics):
+    """`instrument()` for `BitmaskSolver` and `IterativeSolver`, both branch on
+    `select_cell()` and change the board through `assign()`/`unassign()`
+
+    Parameters
+    ----------
+    solver : BitmaskSolver
+    metrics : Metrics
+    """
+    select_cell = solver.select_cell
+    get_cell_candidates = solver.get_cell_candidates
+    assign = solver.assign
+    unassign = solver.unassign
+    fill_cell = solver.fill_cell
+    undo_propagation = solver.undo_propagation
+
+    def counted_select_cell():
+        cell, candidates = select_cell()
+        metrics.node(solver.searched_count)
+
+        # "first" gets its candidates from `get_cell_candidates()`, mrv works them
+        # out inline and stops scanning at a forced (or dead) cell
+        if solver.cell_selection != "first":
+            if candidates.bit_count() <= 1:
+                metrics.validations += solver.empty_positions[cell] + 1
+            else:
+                metrics.validations += solver.empty_count
+        return cell, candidates
+
+    def counted_get_cell_candidates(cell):
+        metrics.validations += 1
+        return get_cell_candidates(cell)
+
+    def counted_assign(cell, value):
+        metrics.guesses += 1
+        assign(cell, value)
+
+    def counted_unassign(cell, value):
+        metrics.backtracks += 1
+        unassign(cell, value)
+
+    def counted_fill_cell(cell, value, gui=None):
+        # Filled through `assign()`, which isn't a guess here
+        metrics.guesses -= 1
+        metrics.propagations += 1
+        fill_cell(cell, value, gui)
+
+    def counted_undo_propagation(mark, gui=None):
+        # Emptied through `unassign()`, propagated cells aren't backtracks
+        metrics.backtracks -= max(0, len(solver.trail) - mark)
+        undo_propagation(mark, gui)
+
+    solver.select_cell = counted_select_cell
+    solver.get_cell_candidates = counted_get_cell_candidates
+    solver.assign = counted_assign
+    solver.unassign = counted_unassign
+    solver.fill_cell = counted_fill_cell
+    solver.undo_propagation = counted_undo_propagation
+
+
+def instrument_dlx(solver, metrics):
+    """`instrument()` for `DlxSolver`, each call to `search()` below the top is
+    one row of the matrix (a guess) being tried
+
+    Parameters
+    ----------
+    solver : DlxSolver
+    metrics : Metrics
+    """
+    search = solver.search
+
+    def counted_search(solution, gui=None):
+        depth = len(solution)
+        if depth:
+            metrics.guesses += 1
+
+        # Every column covered is a solution rather than a node
+        if solver.right[0] != 0:
+            metrics.node(depth)
+
+        found = search(solution, gui)
+        if not found and depth:
+            metrics.backtracks += 1
+        return found
+
+    solver.search = counted_search
@@ -0,0 +1,62 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# Names and defaults the command line offers, kept apart from the modules that use
+# them so `args.py` can build its parsers without loading any of those. Nothing
+# is imported here, keep it that way
+
+# Engines in `run.ENGINES`, in the same order
+ENGINE_NAMES = ("backtrack", "bitmask", "dlx", "iterative")
+DEFAULT_ENGINE = "bitmask"
+
+# What a solution can be written as, see `writer.ResultWriter`
+#   oneliner - the solution, one character per cell on one line
+#   csv - puzzle,solution rows under a header, both as oneliners
+#   jsonl - a JSON object a line with the index, puzzle and solution
+#   packed - 41 byte records, see `packed.py`, 9x9 only and never to stdout
+#   diff - only the cells that were filled in, e.g. r1c3=4 r1c5=7...
+FORMATS = ("oneliner", "csv", "jsonl", "packed", "diff")
+DEFAULT_FORMAT = "oneliner"
+
+# Where `--output file` writes to if no file name is given
+DEFAULT_OUTPUT_FILE = "output.txt"
+
+# Engines that fill in singles as they go, the others can take minutes on a 25x25
+DEFAULT_BENCHMARK_ENGINES = ("bitmask", "iterative")
+
+# 9x9 and 16x16, randomly blanked 25x25 puzzles get very hard past about 45% empty
+DEFAULT_BOX_SIZES = (3, 4)
+
+# Bundled 9x9 puzzles, one oneliner per line in `corpus/`, every one has exactly one
+# solution
+#   easy - generated, filled in by propagation alone
+#   hard - well known hard puzzles, AI Escargot, Easter Monster, Golden Nugget...
+#   17-clue - minimal puzzles, from Gordon Royle's collection
+#   adversarial - digits relabelled so plain backtracking tries the right value
+#     last in the first cells it fills, the worst case for trying 1-9 in order
+CORPORA = ("easy", "hard", "17-clue", "adversarial")
+
+# Seconds a puzzle can take before it's counted as over budget, plain backtracking
+# takes far longer than this on the adversarial puzzles
+DEFAULT_CORPUS_TIMEOUT = 10
+
+# How much worse a result can be than the baseline before it's a regression
+DEFAULT_THRESHOLD = 0.25
+
+# Seconds from launching `headless oneliner` on an easy puzzle to it exiting, an
+# empty interpreter takes about 20ms of that on its own
+DEFAULT_STARTUP_TARGET = 0.1
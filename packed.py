@@ -0,0 +1,416 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import mmap
+import struct
+
+from run import Run
+
+# File starts with a header, then fixed size records one after another
+#   magic - b"SDKP"
+#   version - 1
+#   flags - bit 0 set if the records are solutions rather than puzzles
+#   box size - 3 for a normal 9x9 board
+#   reserved - 0
+HEADER = struct.Struct("<4sBBBB")
+MAGIC = b"SDKP"
+VERSION = 1
+FLAG_SOLUTIONS = 1
+
+# 4 bits a cell, 81 cells round up to 41 bytes
+RECORD_SIZE = 41
+
+
+def encode(oneliner):
+    """Pack a puzzle into a record
+
+    Two cells per byte, high nibble first, which means the hex of a record is the
+    81 digit oneliner (plus a padding 0) so no per-cell work is needed either way
+
+    Parameters
+    ----------
+    oneliner : str
+        81 digits, 0 for unsolved, see `Run.format_oneliner()`
+
+    Return
+    ------
+    bytes
+        41 byte record
+    """
+    return bytes.fromhex(oneliner + "0")
+
+
+def decode(record):
+    """Unpack a record back to a oneliner
+
+    Parameters
+    ----------
+    record : bytes or memoryview
+        41 byte record
+
+    Return
+    ------
+    str
+        81 digits
+    """
+    return record.hex()[:81]
+
+
+def is_packed(file_name):
+    """Check if a file starts with the packed header
+
+    Parameters
+    ----------
+    file_name : str
+
+    Return
+    ------
+    bool
+    """
+    try:
+        with open(file_name, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except (FileNotFoundError, IsADirectoryError):
+        return False
+
+
+class PackedWriter:
+    """
+    Writes puzzles or solutions to a packed file, one 41 byte record each
+
+    Usage
+    -----
+    with PackedWriter("puzzles.sdkp") as writer:
+        writer.write(board)
+    """
+
+    def __init__(self, file_name, solutions=False) -> None:
+        """
+        Parameters
+        ----------
+        file_name : str
+            Relative path and name of file to write to
+        solutions : bool, default=False
+            Mark the records as solutions in the header
+        """
+        self.file_name = file_name
+        self.file = open(file_name, "wb")
+        self.file.write(
+            HEADER.pack(MAGIC, VERSION, FLAG_SOLUTIONS if solutions else 0, 3, 0)
+        )
+        self.count = 0
+
+    def write(self, board):
+        """Add a board as the next record
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+
+        Raises
+        ------
+        ValueError
+            If the board isn't 9x9, a cell has to fit in 4 bits
+        """
+        if len(board) != 9:
+            raise ValueError(
+                f"Packed files only hold 9x9 boards, not [{len(board)}x{len(board)}]"
+            )
+
+        self.write_oneliner(Run.format_oneliner(board))
+
+    def write_oneliner(self, oneliner):
+        """Add an 81 digit oneliner as the next record
+
+        Parameters
+        ----------
+        oneliner : str
+        """
+        self.file.write(encode(oneliner))
+        self.count += 1
+
+    def close(self):
+        """Flush and close the file"""
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PackedReader:
+    """
+    Memory maps a packed file, records are only decoded when they're asked for so
+    any record can be jumped to straight away without reading the rest
+
+    Usage
+    -----
+    with PackedReader("puzzles.sdkp") as reader:
+        board = reader[1000]
+    """
+
+    def __init__(self, file_name) -> None:
+        """
+        Parameters
+        ----------
+        file_name : str
+            Relative path and name of file to read
+
+        Raises
+        ------
+        FileNotFoundError
+            If file cant not be found or opened
+        RuntimeError
+            If the file isn't a packed file this can read
+        """
+        self.file_name = file_name
+        self.file = open(file_name, "rb")
+
+        header = self.file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            self.file.close()
+            raise RuntimeError(f"File [{file_name}] is too short to be a packed file")
+
+        magic, version, flags, box_size, _ = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or box_size != 3:
+            self.file.close()
+            raise RuntimeError(f"File [{file_name}] isn't a packed file I can read")
+
+        self.solutions = bool(flags & FLAG_SOLUTIONS)
+        size = self.file.seek(0, 2)
+        self.count = (size - HEADER.size) // RECORD_SIZE
+
+        # An empty mapping isn't allowed, nothing to map with no records anyway
+        self.map = None
+        self.view = memoryview(b"")
+        if self.count:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.view = memoryview(self.map)[HEADER.size :]
+
+    def __len__(self):
+        return self.count
+
+    def record(self, index):
+        """The raw record at `index`, no copy is made
+
+        Parameters
+        ----------
+        index : int
+
+        Return
+        ------
+        memoryview
+            41 bytes
+
+        Raises
+        ------
+        IndexError
+            If there is no such record
+        """
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f"No record [{index}], there are [{self.count}]")
+
+        start = index * RECORD_SIZE
+        return self.view[start : start + RECORD_SIZE]
+
+    def records(self, start=0, stop=None):
+        """The raw records from `start` up to `stop`, no copy is made
+
+        Parameters
+        ----------
+        start : int, default=0
+        stop : int, default=None
+            None for the end of the file
+
+        Return
+        ------
+        memoryview
+            41 bytes per record
+        """
+        start, stop, _ = slice(start, stop).indices(self.count)
+        return self.view[start * RECORD_SIZE : max(start, stop) * RECORD_SIZE]
+
+    def oneliner(self, index):
+        """Record at `index` as an 81 digit oneliner
+
+        Parameters
+        ----------
+        index : int
+
+        Return
+        ------
+        str
+        """
+        return decode(self.record(index))
+
+    def oneliners(self, start=0, stop=None):
+        """Lazily decode records from `start` up to `stop` as oneliners
+
+        Parameters
+        ----------
+        start : int, default=0
+        stop : int, default=None
+            None for the end of the file
+
+        Yield
+        -----
+        str
+            81 digits
+        """
+        records = self.records(start, stop)
+        for offset in range(0, len(records), RECORD_SIZE):
+            yield decode(records[offset : offset + RECORD_SIZE])
+
+    def __getitem__(self, index):
+        """Board at `index`, decoded from its record
+
+        Parameters
+        ----------
+        index : int
+
+        Return
+        ------
+        Board
+        """
+        return Run.parse_oneliner(self.oneliner(index))
+
+    def __iter__(self):
+        for oneliner in self.oneliners():
+            yield Run.parse_oneliner(oneliner)
+
+    def close(self):
+        """Release the mapping and close the file
+
+        Records handed out (and a part run `oneliners()`) are views straight onto
+        the mapping, while any of them are still about the mapping is left to be
+        unmapped once the last one is garbage collected
+        """
+        self.view.release()
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                pass
+            self.map = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def oneliners_to_packed(lines, file_name, solutions=False):
+    """Convert oneliners, either format, to a packed file
+
+    Parameters
+    ----------
+    lines : iterable[str]
+        One puzzle per line, blank lines are skipped
+    file_name : str
+        Packed file to write
+    solutions : bool, default=False
+        Mark the records as solutions
+
+    Return
+    ------
+    int
+        Number of records written
+
+    Raises
+    ------
+    RuntimeError
+        If a line is not a valid puzzle
+    """
+    with PackedWriter(file_name, solutions) as writer:
+        for line in lines:
+            oneliner = line.strip().replace(",", "").replace(".", "0")
+            if not oneliner:
+                continue
+
+            # Straight from text to record, no need to go via a board
+            if len(oneliner) != 81 or not (oneliner.isascii() and oneliner.isdigit()):
+                raise RuntimeError(f"Not a valid oneliner [{line.strip()}]")
+
+            writer.write_oneliner(oneliner)
+
+        return writer.count
+
+
+def csv_to_packed(puzzle_files, file_name, solutions=False):
+    """Convert puzzle files, 9 comma seperated lines each, to one packed file
+
+    Parameters
+    ----------
+    puzzle_files : iterable[str]
+        Puzzle file names, see `Run.parse_file()`
+    file_name : str
+        Packed file to write
+    solutions : bool, default=False
+        Mark the records as solutions
+
+    Return
+    ------
+    int
+        Number of records written
+    """
+    with PackedWriter(file_name, solutions) as writer:
+        for puzzle_file in puzzle_files:
+            writer.write(Run.parse_file(puzzle_file))
+
+        return writer.count
+
+
+def packed_to_oneliners(file_name, start=0, stop=None):
+    """Lazily convert a packed file, or part of one, back to 81 digit oneliners
+
+    Parameters
+    ----------
+    file_name : str
+    start : int, default=0
+    stop : int, default=None
+
+    Yield
+    -----
+    str
+    """
+    with PackedReader(file_name) as reader:
+        yield from reader.oneliners(start, stop)
+
+
+def packed_to_csv(file_name, index):
+    """Convert one record of a packed file to the 9 line puzzle file format
+
+    Parameters
+    ----------
+    file_name : str
+    index : int
+
+    Return
+    ------
+    list[str]
+        Lines ready for `FileUtils.write_file()`
+    """
+    with PackedReader(file_name) as reader:
+        board = reader[index]
+
+    return [",".join(map(str, row)) + "\n" for row in board]
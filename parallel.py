@@ -0,0 +1,278 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+from budget import Budget, CancellationToken
+from metrics import Metrics
+from run import Run, DEFAULT_ENGINE
+
+# One `Run` per engine (with or without metrics) in each worker process, kept warm
+# between chunks
+worker_runs = {}
+
+# Cancelled by ctrl+c in a worker process, every solve left in it stops
+worker_token = CancellationToken()
+
+
+def cancel_on_interrupt():
+    """Worker side, ctrl+c goes to the whole process group, rather than the worker
+    dying it cancels its solves and hands back what it has. The main process
+    decides whether to stop"""
+
+    def interrupt(signal_number, frame):
+        worker_token.cancel()
+
+    signal.signal(signal.SIGINT, interrupt)
+
+
+def solve_chunk(engine, chunk, timeout=None, max_operations=None, metrics=False):
+    """Worker side, solve a chunk of puzzles sent as one newline joined string
+
+    Parameters
+    ----------
+    engine : str
+        Name of the engine in `ENGINES`
+    chunk : str
+        Puzzles in oneliner format, one per line
+    timeout : float, default=None
+        Seconds each puzzle can take, None for no limit
+    max_operations : int, default=None
+        Operations each puzzle can use, None for no limit
+    metrics : bool, default=False
+        Count the work done on the chunk, see `Metrics`
+
+    Return
+    ------
+    tuple
+        (seconds taken, operations used, list[tuple], metrics) - the list has a
+        (True/False, 81 digit solution) per puzzle, (BudgetExceeded, the puzzle
+        as given) if it ran out of budget, or (None, None) if the puzzle wasn't
+        valid. metrics is `Metrics.as_dict()` for the chunk, None if not asked for
+    """
+    start_time = time.perf_counter()
+
+    if (engine, metrics) not in worker_runs:
+        worker_runs[engine, metrics] = Run(engine, metrics=metrics)
+    run = worker_runs[engine, metrics]
+
+    run.budget = Budget(timeout, max_operations, worker_token)
+    if run.metrics is not None:
+        run.metrics.reset()
+
+    results = []
+    for puzzle in chunk.split("\n"):
+        try:
+            board = Run.parse_oneliner(puzzle)
+        except (RuntimeError, ValueError):
+            results.append((None, None))
+            continue
+
+        results.append((run.solve(board), Run.format_oneliner(board)))
+
+    return (
+        time.perf_counter() - start_time,
+        run.budget.operation_count,
+        results,
+        None if run.metrics is None else run.metrics.as_dict(),
+    )
+
+
+class ParallelRunner:
+    """
+    Spread a batch of puzzles over a pool of worker processes
+
+    Puzzles go over to the workers in chunks, as one string per chunk, and come
+    back as 81 digit strings so there's no pickling of boards. The chunk size
+    adapts to how long puzzles are taking, easy puzzles get big chunks so they
+    aren't swamped by the cost of passing them about, hard ones get small chunks
+    so the load stays even
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        engine=DEFAULT_ENGINE,
+        ordered=True,
+        chunk_size=16,
+        target_chunk_seconds=0.05,
+        max_chunk_size=4096,
+        timeout=None,
+        max_operations=None,
+        metrics=False,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        workers : int, default=None
+            Number of worker processes, None or 0 for one per cpu
+        engine : str, default='bitmask'
+            Name of the engine in `ENGINES`
+        ordered : bool, default=True
+            True to get results back in the order the puzzles went in, False to
+            get them as soon as they are done
+        chunk_size : int, default=16
+            Size of the first chunks, before any timings have come back
+        target_chunk_seconds : float, default=0.05
+            How long each chunk should take a worker, chunk size is tuned to this
+        max_chunk_size : int, default=4096
+            Upper limit for the chunk size
+        timeout : float, default=None
+            Seconds each puzzle can take, None for no limit
+        max_operations : int, default=None
+            Operations each puzzle can use, None for no limit
+        metrics : bool, default=False
+            Count the work done by every worker into `metrics`
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self.ordered = ordered
+        self.chunk_size = chunk_size
+        self.target_chunk_seconds = target_chunk_seconds
+        self.max_chunk_size = max_chunk_size
+        self.timeout = timeout
+        self.max_operations = max_operations
+        self.operation_count = 0
+        self.metrics = Metrics() if metrics else None
+
+        # Chunks allowed to be out at once (in flight or waiting to be put in
+        # order), this keeps memory flat however big the batch
+        self.max_outstanding = self.workers * 4
+
+    def adapt_chunk_size(self, seconds, count):
+        """Move the chunk size towards what would take `target_chunk_seconds`
+
+        Parameters
+        ----------
+        seconds : float
+            How long the last chunk took
+        count : int
+            How many puzzles were in it
+        """
+        if count == 0:
+            return
+
+        per_puzzle = max(seconds / count, 1e-6)
+        wanted = self.target_chunk_seconds / per_puzzle
+
+        # Halfway between old and new, so one odd chunk doesn't swing it
+        chunk_size = int((self.chunk_size + wanted) / 2)
+        self.chunk_size = max(1, min(self.max_chunk_size, chunk_size))
+
+    def process(self, lines):
+        """Solve every puzzle in `lines` across the pool, lazily
+
+        Parameters
+        ----------
+        lines : iterable[str]
+            Puzzles, one per line in either oneliner format, blank lines are skipped
+
+        Yield
+        -----
+        tuple
+            (index, True/False, 81 digit solution) - index counts the puzzles from 0,
+            result and solution are None for a puzzle that isn't valid, result is a
+            `BudgetExceeded` for one that ran out of budget
+        """
+        puzzles = (line.strip() for line in lines)
+        puzzles = (puzzle for puzzle in puzzles if puzzle)
+
+        pending = {}
+        finished = {}
+        next_index = 0
+        next_to_yield = 0
+        exhausted = False
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=cancel_on_interrupt
+        )
+        try:
+            while True:
+                while (
+                    not exhausted
+                    and len(pending) + len(finished) < self.max_outstanding
+                ):
+                    chunk = list(islice(puzzles, self.chunk_size))
+                    if not chunk:
+                        exhausted = True
+                        break
+
+                    future = executor.submit(
+                        solve_chunk,
+                        self.engine,
+                        "\n".join(chunk),
+                        self.timeout,
+                        self.max_operations,
+                        self.metrics is not None,
+                    )
+                    pending[future] = next_index
+                    next_index += len(chunk)
+
+                if not pending and not finished:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    start = pending.pop(future)
+                    seconds, operations, results, metrics = future.result()
+                    self.operation_count += operations
+                    if metrics is not None:
+                        self.metrics.add(metrics)
+                    self.adapt_chunk_size(seconds, len(results))
+
+                    if self.ordered:
+                        finished[start] = results
+                        continue
+
+                    for offset, (result, solution) in enumerate(results):
+                        yield start + offset, result, solution
+
+                # Reorder buffer, hand back every chunk that is next in line
+                while next_to_yield in finished:
+                    results = finished.pop(next_to_yield)
+                    for offset, (result, solution) in enumerate(results):
+                        yield next_to_yield + offset, result, solution
+                    next_to_yield += len(results)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def solve_many(iterable, workers=None, engine=DEFAULT_ENGINE, ordered=True):
+    """Solve lots of puzzles across all the cores, see `ParallelRunner`
+
+    Parameters
+    ----------
+    iterable : iterable[str]
+        Puzzles in oneliner format
+    workers : int, default=None
+        Number of worker processes, None for one per cpu
+    engine : str, default='bitmask'
+        Name of the engine in `ENGINES`
+    ordered : bool, default=True
+        True for results in input order, False for as they complete
+
+    Yield
+    -----
+    tuple
+        (index, True/False, 81 digit solution)
+    """
+    yield from ParallelRunner(workers, engine, ordered).process(iterable)
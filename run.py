@@ -15,8 +15,35 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
-from solver import Solver
+import time
+
+from board import Board, BOX_SIZES
+from budget import BudgetExceeded, solve_within
+from solver import Solver, BitmaskSolver
+from dlx import DlxSolver
+from iterative import IterativeSolver, SOLVED, UNSOLVABLE
 from file import FileUtils
+from options import DEFAULT_ENGINE
+from validate import InvalidPuzzle, explain_unsolvable, find_conflicts
+
+# Solving engines that can be picked by name, all share the `solve(board)` contract.
+# The names are `options.ENGINE_NAMES` too, for the command line
+ENGINES = {
+    "backtrack": Solver,
+    "bitmask": BitmaskSolver,
+    "dlx": DlxSolver,
+    "iterative": IterativeSolver,
+}
+
+# Engines that only find out clashing givens by searching every possibility, the
+# givens are checked before they start. The rest notice straight away on loading
+# the board or propagating, so only what they can't solve is checked
+UNCHECKED_ENGINES = ("backtrack",)
+
+# How a puzzle came out, alongside `SOLVED` and `UNSOLVABLE`, for reporting it to
+# something other than a person
+BUDGET_EXCEEDED = "budget_exceeded"
+INVALID = "invalid"
 
 
 class Run:
@@ -26,58 +53,421 @@ class Run:
     integration tests across classes
     """
 
-    def __init__(self) -> None:
-        """"""
-        self.solver = Solver()
+    def __init__(
+        self,
+        engine=DEFAULT_ENGINE,
+        cache=None,
+        budget=None,
+        record_trace=False,
+        metrics=False,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        engine : str, default='bitmask'
+            Name of the engine in `ENGINES` to solve with
+        cache : SolutionCache, default=None
+            If not None, puzzles are looked up in here before being solved
+        budget : Budget, default=None
+            If not None, every solve is limited by it, see `solve()`
+        record_trace : bool, default=False
+            Keep an `EventTrace` of each solve in `trace`
+        metrics : bool, default=False
+            Count the work done by the solver into `metrics`, left off the solver
+            isn't instrumented at all
 
-    def process_oneliner(self, input):
+        Raises
+        ------
+        ValueError
+            If the engine isn't known
         """
-        Take the input from the oneliner, format into the list[list[int]] format
-        required for the board
+        self.engine = None
+        self.solver = None
+        self.cache = cache
+        self.budget = budget
+        self.record_trace = record_trace
+        self.trace = None
+        self.metrics = None
+        if metrics:
+            # Imported here, like the cache and the trace, so the modes that never
+            # use them don't pay for sqlite3/json at startup
+            from metrics import Metrics
+
+            self.metrics = Metrics()
+        self.set_engine(engine)
+
+    def set_engine(self, engine):
+        """Switch the solver to `engine`, keeps the current solver if it's the same
+
+        Parameters
+        ----------
+        engine : str
+            Name of the engine in `ENGINES`
+
+        Raises
+        ------
+        ValueError
+            If the engine isn't known
+        """
+        if engine == self.engine:
+            return
+
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown engine [{engine}], choose from [{', '.join(ENGINES)}]"
+            )
+
+        self.engine = engine
+        self.solver = ENGINES[engine]()
+
+        if self.cache is not None:
+            from cache import CachedSolver
+
+            self.solver = CachedSolver(self.solver, self.cache)
+
+        if self.metrics is not None:
+            from metrics import instrument
+
+            instrument(self.solver, self.metrics)
+
+    def solve(self, board):
+        """Solve a board with the current engine, inside the budget if there is one,
+        recording it to `trace` if asked to
+
+        Parameters
+        ----------
+        board : Board
+            0's are for unsolved
+
+        Return
+        ------
+        bool or BudgetExceeded
+            True/False from the solve, or the `BudgetExceeded` (which is falsy) if
+            the budget ran out, the board is left as given then. An
+            `InvalidPuzzle` (also falsy) if the givens clash, or leave a cell or
+            value with nowhere to go, with the conflicting cells
+        """
+        gui = None
+        if self.record_trace:
+            from events import EventTrace
+
+            gui = self.trace = EventTrace(board)
+
+        if self.engine in UNCHECKED_ENGINES:
+            conflicts = find_conflicts(board)
+            if conflicts:
+                return InvalidPuzzle.from_conflicts(conflicts)
+
+        result = solve_within(self.solver, board, self.budget, gui)
+        if result is False:
+            return explain_unsolvable(board)
+
+        return result
+
+    @staticmethod
+    def status(result):
+        """Name the outcome of a solve
+
+        @staticmethod
+
+        Parameters
+        ----------
+        result : bool, BudgetExceeded, InvalidPuzzle or None
+            From `solve()`, None for a puzzle that couldn't be read
+
+        Return
+        ------
+        str
+            `SOLVED`, `UNSOLVABLE`, `BUDGET_EXCEEDED` or `INVALID`
+        """
+        if result is None or isinstance(result, InvalidPuzzle):
+            return INVALID
+
+        if isinstance(result, BudgetExceeded):
+            return BUDGET_EXCEEDED
+
+        return SOLVED if result else UNSOLVABLE
+
+    @staticmethod
+    def parse_oneliner(input):
+        """
+        Take a oneliner, either comma seperated or one character per cell squished
+        together, and format into a `Board`. A `.` can be used instead of a 0 for
+        unknowns
+
+        The size of board comes from the number of cells, 81 for a 9x9, 256 for a
+        16x16 and 625 for a 25x25. Squished together, values from 10 up are letters
+        (A=10... G=16), comma seperated they can be written as numbers, e.g. 16
+
+        @staticmethod
 
         Parameters
         ----------
         input : str
-          One lone comma seperated string of the puzzle to be solved
+          One lone string of the puzzle
 
         Raises
         ------
         RuntimeError
           If the input is not valid
+        ValueError
+          If the input has something other than digits (or letters) in it, or a
+          value too big for the size of board
 
         Return
         ------
-        tuple
-          (True/False, list[list[int]]) - Result from solve and where the board
-          processing ended (would be complete if solveable)
+        Board
+          The board
         """
-        input = input.replace(",", "")
-        row_length = 9
-        board = []
-
-        for i in range(0, len(input), row_length):
-            row_squished = input[i : i + row_length]
+        if "," in input:
+            # Comma seperated cells can be more than one character each
+            tokens = input.replace(".", "0").split(",")
+            if not all(token.isascii() and token.isdigit() for token in tokens):
+                raise ValueError(
+                    f"Your oneliner input is not valid, [{input}] isn't digits"
+                )
+            cell_count = len(tokens)
+        else:
+            input = input.replace(".", "0")
+            if not (input.isascii() and input.isalnum()):
+                raise ValueError(
+                    f"Your oneliner input is not valid, [{input}] isn't digits"
+                )
+            cell_count = len(input)
 
-            temp_row = []
-            for digit in row_squished:
-                temp_row.append(int(digit))
+        # Closest board size to the number of cells, 9x9 at the least
+        box_size = max(3, round(cell_count**0.25))
+        row_length = box_size * box_size
 
-            board.append(temp_row)
+        # Rows are cut every `row_length` cells, so on a 9x9 anything short of 73 or
+        # over 81 digits doesn't give 9 rows
+        if (cell_count + row_length - 1) // row_length != row_length:
+            raise RuntimeError(
+                f"Your oneliner input is not valid, you don't have {row_length} rows!"
+            )
 
-        if len(board) != 9:
+        if cell_count != row_length * row_length:
             raise RuntimeError(
-                "Your oneliner input is not valid, you don't have 9 rows!"
+                f"Your oneliner input is not valid, a row doesn't have {row_length} "
+                f"digits!"
             )
 
-        for row in board:
-            if len(row) != 9:
-                raise RuntimeError(
-                    "Your oneliner input is not valid, a row doesn't have 9 digits!"
+        if "," in input:
+            board = Board([int(token) for token in tokens], box_size)
+        else:
+            board = Board.from_oneliner(input)
+
+        if max(board.cells) > row_length:
+            raise ValueError(
+                f"Your oneliner input is not valid, [{input}] has values bigger "
+                f"than {row_length}"
+            )
+
+        return board
+
+    @staticmethod
+    def parse_file(file_name):
+        """
+        Read a puzzle file, 9 lines of comma seperated digits, into a `Board`. Bigger
+        boards have more lines, 16 lines of 16 numbers for a 16x16
+
+        @staticmethod
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the file that contains the puzzle
+
+        Raises
+        ------
+        InvalidPuzzle
+            If the number of rows isn't a board size, a row has the wrong number of
+            values, or a value isn't a number from 0 to the size of the board
+
+        Return
+        ------
+        Board
+            The board
+        """
+        file_contents = FileUtils.read_file(file_name)
+
+        # Blank lines, like one left at the end of the file, aren't rows
+        lines = [line.strip() for line in file_contents if line.strip()]
+        size = len(lines)
+
+        if size * size not in BOX_SIZES:
+            raise InvalidPuzzle(
+                f"Your puzzle file is not valid, it has {size} rows rather than 9 "
+                f"(or 16, 25... for bigger boards)"
+            )
+
+        board = []
+        for row, line in enumerate(lines):
+            tokens = line.split(",")
+            if len(tokens) != size:
+                raise InvalidPuzzle(
+                    f"Your puzzle file is not valid, row {row + 1} has "
+                    f"{len(tokens)} values rather than {size}"
                 )
 
-        return self.solver.solve(board), board
+            try:
+                values = [int(token) for token in tokens]
+            except ValueError:
+                raise InvalidPuzzle(
+                    f"Your puzzle file is not valid, row {row + 1} [{line}] isn't "
+                    f"comma seperated numbers"
+                ) from None
+
+            for column, value in enumerate(values):
+                if not 0 <= value <= size:
+                    raise InvalidPuzzle(
+                        f"Your puzzle file is not valid, r{row + 1}c{column + 1} is "
+                        f"[{value}], values go from 0 to {size}"
+                    )
+
+            board.append(values)
+
+        return Board.from_lists(board)
+
+    @staticmethod
+    def format_oneliner(board):
+        """
+        Squish a board back down to one character per cell on one line, 81 digits
+        for a 9x9
+
+        @staticmethod
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+
+        Return
+        ------
+        str
+        """
+        if isinstance(board, Board):
+            return board.to_oneliner()
+
+        return Board.from_lists(board).to_oneliner()
+
+    def process_oneliner(self, input, engine=None):
+        """
+        Take the input from the oneliner, format into the `Board` required
+        for solving
+
+        Parameters
+        ----------
+        input : str
+          One lone comma seperated string of the puzzle to be solved
+        engine : str, default=None
+          Name of the engine in `ENGINES`, None keeps the current one
+
+        Raises
+        ------
+        RuntimeError
+          If the input is not valid
+
+        Return
+        ------
+        tuple
+          (True/False, Board) - Result from solve and where the board
+          processing ended (would be complete if solveable). The result is a
+          `BudgetExceeded` or `InvalidPuzzle` instead if the budget ran out or
+          the givens conflict
+        """
+        board = self.parse_oneliner(input)
+
+        if engine is not None:
+            self.set_engine(engine)
+
+        return self.solve(board), board
 
-    def process_file(self, file_name):
+    def report_oneliner(self, input):
+        """
+        Solve a oneliner and describe how it went, for handing back to another
+        program rather than a person
+
+        Parameters
+        ----------
+        input : str
+          One lone string of the puzzle, see `parse_oneliner()`
+
+        Return
+        ------
+        dict
+          status (see `status()`), solution (oneliner, None unless solved),
+          operations (None without a `budget` to count them) and seconds.
+          `BUDGET_EXCEEDED` adds the reason, `INVALID`
+          only has the error, and the conflicts (see `find_conflicts()`) if it
+          could be read
+        """
+        start_time = time.perf_counter()
+
+        try:
+            board = self.parse_oneliner(input)
+        except (RuntimeError, ValueError) as error:
+            return {"status": INVALID, "error": str(error)}
+
+        result = self.solve(board)
+
+        if isinstance(result, InvalidPuzzle):
+            return {
+                "status": INVALID,
+                "error": str(result),
+                "conflicts": result.conflicts,
+            }
+
+        report = {
+            "status": self.status(result),
+            "solution": board.to_oneliner() if result else None,
+            "operations": None if self.budget is None else self.budget.operations,
+            "seconds": time.perf_counter() - start_time,
+        }
+        if isinstance(result, BudgetExceeded):
+            report["reason"] = result.reason
+
+        return report
+
+    def process_batch(self, lines, engine=None):
+        """
+        Solve one puzzle per line, lazily, so any number of puzzles can be streamed
+        through in constant memory. The same solver is reused for every puzzle and
+        the budget's `operation_count` keeps adding up across the batch
+
+        Lines can be in either oneliner format, blank lines are skipped
+
+        Parameters
+        ----------
+        lines : iterable[str]
+          Puzzles, one per line, e.g. an open file or `sys.stdin`
+        engine : str, default=None
+          Name of the engine in `ENGINES`, None keeps the current one
+
+        Yield
+        -----
+        tuple
+          (True/False, Board) - same as `process_oneliner()`. A line that
+          can't be read gives (None, None), one that runs out of budget gives
+          (BudgetExceeded, Board) and one with conflicting givens gives
+          (InvalidPuzzle, Board) rather than stopping the batch
+        """
+        if engine is not None:
+            self.set_engine(engine)
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                board = self.parse_oneliner(line)
+            except (RuntimeError, ValueError):
+                yield None, None
+                continue
+
+            yield self.solve(board), board
+
+    def process_file(self, file_name, engine=None):
         """
         Read the file supplied by user, process the contents into the required format
         for the `solve()` function
@@ -86,18 +476,25 @@ class Run:
         ----------
         file_name : str
             Name of the file that contains the puzzle
+        engine : str, default=None
+            Name of the engine in `ENGINES`, None keeps the current one
+
+        Raises
+        ------
+        InvalidPuzzle
+            If the file isn't a valid puzzle, see `parse_file()`
 
         Return
         ------
         tuple
-            (True/False, list[list[int]]) - Result from solve and where the board
-            processing ended (would be complete if solveable)
+            (True/False, Board) - Result from solve and where the board
+            processing ended (would be complete if solveable). The result is a
+            `BudgetExceeded` or `InvalidPuzzle` instead if the budget ran out or
+            the givens conflict
         """
-        file_contents = FileUtils.read_file(file_name)
-        board = []
+        board = self.parse_file(file_name)
 
-        for line in file_contents:
-            line = line.replace("\n", "")
-            board.append(list(map(int, line.split(","))))
+        if engine is not None:
+            self.set_engine(engine)
 
-        return self.solver.solve(board), board
+        return self.solve(board), board
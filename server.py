@@ -0,0 +1,755 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from http import HTTPStatus
+
+from benchmark import percentile
+from budget import Budget, BudgetExceeded
+from parallel import cancel_on_interrupt, worker_runs, worker_token
+from run import Run, ENGINES, DEFAULT_ENGINE, BUDGET_EXCEEDED, INVALID
+from validate import InvalidPuzzle, find_conflicts
+
+# Only reachable from this machine unless asked otherwise
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# Seconds a request can take, queueing included, before it's given up on
+DEFAULT_TIMEOUT = 10
+
+# Requests waiting for (or being solved by) a worker, past this they're turned
+# away with a 503 rather than piling up
+DEFAULT_QUEUE_SIZE = 256
+
+# Most puzzles in one /batch request
+DEFAULT_MAX_BATCH = 1000
+
+# Biggest request body, and most header lines, taken
+MAX_BODY = 1 << 20
+MAX_HEADERS = 64
+
+# Seconds an idle keep-alive connection is held open
+KEEP_ALIVE_TIMEOUT = 30
+
+# Extra seconds waited on a worker past the request timeout, the worker's own
+# budget should have stopped it by then
+TIMEOUT_GRACE = 1
+
+# Latencies kept for the percentiles on /metrics
+LATENCY_WINDOW = 1024
+
+# Validate responses, how many solutions a puzzle has decides it
+VALID = "valid"
+
+
+class HttpError(Exception):
+    """
+    A request that can't be served, turned into a JSON error response with the
+    status code
+    """
+
+    def __init__(self, status, message) -> None:
+        """
+        Parameters
+        ----------
+        status : HTTPStatus
+        message : str
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def get_run(engine):
+    """Worker side, the warm `Run` for an engine, shared with `ParallelRunner`
+
+    Parameters
+    ----------
+    engine : str
+        Name of the engine in `ENGINES`
+
+    Return
+    ------
+    Run
+    """
+    if (engine, False) not in worker_runs:
+        worker_runs[engine, False] = Run(engine)
+    return worker_runs[engine, False]
+
+
+def warm_up(engine):
+    """Worker side, make the engine's `Run` before the first request needs it
+
+    Parameters
+    ----------
+    engine : str
+        Name of the engine in `ENGINES`
+
+    Return
+    ------
+    int
+        Process id of the worker
+    """
+    get_run(engine)
+    return os.getpid()
+
+
+def solve_puzzles(engine, puzzles, timeout=None, max_operations=None):
+    """Worker side, solve puzzles one after another
+
+    Parameters
+    ----------
+    engine : str
+        Name of the engine in `ENGINES`
+    puzzles : list[str]
+        Oneliners
+    timeout : float, default=None
+        Seconds for all of the puzzles together, None for no limit
+    max_operations : int, default=None
+        Operations each puzzle can use, None for no limit
+
+    Return
+    ------
+    list[dict]
+        One per puzzle, see `Run.report_oneliner()`
+    """
+    run = get_run(engine)
+    end_time = None if timeout is None else time.perf_counter() + timeout
+    responses = []
+
+    for puzzle in puzzles:
+        remaining = None
+        if end_time is not None:
+            remaining = max(0, end_time - time.perf_counter())
+
+        run.budget = Budget(remaining, max_operations, worker_token)
+        responses.append(run.report_oneliner(puzzle))
+
+    return responses
+
+
+def validate_puzzle(puzzle, timeout=None):
+    """Worker side, check a puzzle reads and has exactly one solution
+
+    Parameters
+    ----------
+    puzzle : str
+        Oneliner
+    timeout : float, default=None
+        Seconds the check can take, None for no limit
+
+    Return
+    ------
+    dict
+        status (`VALID`, `INVALID` or `BUDGET_EXCEEDED`), solutions (0, 1 or 2 for
+        two or more) and seconds. `INVALID` adds an error if the puzzle couldn't
+        be read or its givens conflict, with the conflicts for the latter,
+        `BUDGET_EXCEEDED` the reason
+    """
+    start_time = time.perf_counter()
+
+    try:
+        board = Run.parse_oneliner(puzzle)
+    except (RuntimeError, ValueError) as error:
+        return {"status": INVALID, "solutions": 0, "error": str(error)}
+
+    # No point counting solutions when the givens already show there aren't any
+    conflicts = find_conflicts(board)
+    if conflicts:
+        return {
+            "status": INVALID,
+            "solutions": 0,
+            "error": str(InvalidPuzzle.from_conflicts(conflicts)),
+            "conflicts": conflicts,
+            "seconds": time.perf_counter() - start_time,
+        }
+
+    solver = get_run(DEFAULT_ENGINE).solver
+    solver.budget = Budget(timeout, None, worker_token)
+    solver.budget.start()
+
+    try:
+        solutions = solver.count_solutions(board)
+    except BudgetExceeded as exceeded:
+        return {
+            "status": BUDGET_EXCEEDED,
+            "reason": exceeded.reason,
+            "seconds": time.perf_counter() - start_time,
+        }
+    finally:
+        solver.budget = None
+
+    return {
+        "status": VALID if solutions == 1 else INVALID,
+        "solutions": solutions,
+        "seconds": time.perf_counter() - start_time,
+    }
+
+
+class SolveServer:
+    """
+    Solves puzzles over HTTP/JSON on localhost, so a caller pays for a request
+    rather than for starting Python. An asyncio event loop takes the requests and
+    hands the solving to a pool of worker processes, kept warm between requests
+
+    Endpoints, all JSON
+        POST /solve - {"puzzle": oneliner, "engine", "timeout", "max_operations"},
+            the last three optional, gives back `solve_puzzles()` for the puzzle
+        POST /batch - same with "puzzles", a list, gives back {"results": [...]}
+        POST /validate - {"puzzle": oneliner, "timeout"}, see `validate_puzzle()`
+        GET /health - up and how busy
+        GET /metrics - request, outcome and latency counts since starting
+
+    Requests over `queue_size` get a 503 straight away, and ones that go past their
+    timeout a 504. Connections are kept alive so a client can skip reconnecting
+
+    Usage
+    -----
+    server = SolveServer(port=8080)
+    await server.start()
+    await server.serve_forever()
+    """
+
+    def __init__(
+        self,
+        host=DEFAULT_HOST,
+        port=DEFAULT_PORT,
+        workers=None,
+        engine=DEFAULT_ENGINE,
+        timeout=DEFAULT_TIMEOUT,
+        queue_size=DEFAULT_QUEUE_SIZE,
+        max_batch=DEFAULT_MAX_BATCH,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        host : str, default='127.0.0.1'
+        port : int, default=8080
+            0 for any free port, `port` is set to it once started
+        workers : int, default=None
+            Number of worker processes, None or 0 for one per cpu
+        engine : str, default='bitmask'
+            Name of the engine in `ENGINES` used when a request doesn't say
+        timeout : float, default=10
+            Most seconds a request can take, a request can ask for less
+        queue_size : int, default=256
+            Most requests waiting for or being solved by a worker at once
+        max_batch : int, default=1000
+            Most puzzles in one /batch request
+
+        Raises
+        ------
+        ValueError
+            If the engine isn't known
+        """
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown engine [{engine}], choose from [{', '.join(ENGINES)}]"
+            )
+
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self.timeout = timeout
+        self.queue_size = queue_size
+        self.max_batch = max_batch
+
+        self.executor = None
+        self.server = None
+        self.connections = {}
+        self.slots = None
+        self.pending = 0
+        self.start_time = None
+
+        # For /metrics
+        self.requests = Counter()
+        self.responses = Counter()
+        self.outcomes = Counter()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    async def start(self):
+        """Start the worker pool, warm every worker up and start listening"""
+        loop = asyncio.get_running_loop()
+
+        self.executor = self.create_executor()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self.executor, warm_up, self.engine)
+                for _ in range(self.workers)
+            )
+        )
+
+        # Two requests a worker, one solving and one ready to go straight after
+        self.slots = asyncio.Semaphore(self.workers * 2)
+
+        self.server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.start_time = time.monotonic()
+
+    def create_executor(self):
+        """A pool of `workers` processes, ctrl+c is left to this one
+
+        Return
+        ------
+        ProcessPoolExecutor
+        """
+        return ProcessPoolExecutor(
+            max_workers=self.workers, initializer=cancel_on_interrupt
+        )
+
+    async def serve_forever(self):
+        """Serve until cancelled"""
+        await self.server.serve_forever()
+
+    async def close(self):
+        """Stop listening and shut the worker pool down"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+        # Closing the server leaves the connections it made open, closing them
+        # lets their handlers see the end and finish
+        for writer in self.connections.values():
+            writer.close()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until it's closed
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+        writer : asyncio.StreamWriter
+        """
+        task = asyncio.current_task()
+        self.connections[task] = writer
+
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except HttpError as error:
+                    self.write_response(
+                        writer, error.status, {"error": error.message}, False
+                    )
+                    await writer.drain()
+                    break
+
+                if request is None:
+                    break
+
+                method, path, body, keep_alive = request
+                start_time = time.perf_counter()
+                status, payload, headers = await self.route(method, path, body)
+
+                self.requests[path] += 1
+                self.responses[int(status)] += 1
+                self.latencies.append(time.perf_counter() - start_time)
+
+                self.write_response(writer, status, payload, keep_alive, headers)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections.pop(task, None)
+            writer.close()
+
+    async def read_request(self, reader):
+        """Read one HTTP/1.x request
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+
+        Raises
+        ------
+        HttpError
+            If the request is malformed or too big
+
+        Return
+        ------
+        tuple or None
+            (method, path, body, keep alive), None once the client has gone or
+            has been idle for `KEEP_ALIVE_TIMEOUT`
+        """
+        try:
+            line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+        except asyncio.TimeoutError:
+            return None
+
+        if not line:
+            return None
+
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        method, target, version = parts
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+
+            if len(headers) >= MAX_HEADERS:
+                raise HttpError(
+                    HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers"
+                )
+
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "transfer-encoding" in headers:
+            raise HttpError(HTTPStatus.LENGTH_REQUIRED, "Send a Content-Length")
+
+        length = headers.get("content-length", "0")
+        if not length.isdigit():
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed Content-Length")
+
+        if int(length) > MAX_BODY:
+            raise HttpError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Body over [{MAX_BODY}] bytes"
+            )
+
+        body = await reader.readexactly(int(length))
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = connection == "keep-alive"
+        else:
+            keep_alive = connection != "close"
+
+        return method, target.split("?", 1)[0], body, keep_alive
+
+    @staticmethod
+    def write_response(writer, status, payload, keep_alive, headers=None):
+        """Write a JSON response
+
+        @staticmethod
+
+        Parameters
+        ----------
+        writer : asyncio.StreamWriter
+        status : HTTPStatus
+        payload : dict
+        keep_alive : bool
+        headers : dict, default=None
+            Any extra headers
+        """
+        body = json.dumps(payload).encode()
+        lines = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def route(self, method, path, body):
+        """Hand a request to its endpoint
+
+        Parameters
+        ----------
+        method : str
+        path : str
+        body : bytes
+
+        Return
+        ------
+        tuple
+            (HTTPStatus, dict payload, dict of extra headers), anything that goes
+            wrong in a handler is a 500 so every request gets a response
+        """
+        handlers = {
+            "/solve": ("POST", self.handle_solve),
+            "/batch": ("POST", self.handle_batch),
+            "/validate": ("POST", self.handle_validate),
+            "/health": ("GET", self.handle_health),
+            "/metrics": ("GET", self.handle_metrics),
+        }
+
+        try:
+            if path not in handlers:
+                raise HttpError(HTTPStatus.NOT_FOUND, f"No endpoint [{path}]")
+
+            allowed, handler = handlers[path]
+            if method != allowed:
+                raise HttpError(
+                    HTTPStatus.METHOD_NOT_ALLOWED, f"[{path}] only takes {allowed}"
+                )
+
+            if allowed == "GET":
+                return HTTPStatus.OK, handler(), {}
+
+            try:
+                request = json.loads(body)
+            except (UnicodeDecodeError, ValueError):
+                raise HttpError(HTTPStatus.BAD_REQUEST, "Body isn't JSON")
+
+            if not isinstance(request, dict):
+                raise HttpError(HTTPStatus.BAD_REQUEST, "Body isn't a JSON object")
+
+            return HTTPStatus.OK, await handler(request), {}
+        except HttpError as error:
+            headers = {}
+            if error.status == HTTPStatus.SERVICE_UNAVAILABLE:
+                headers["Retry-After"] = "1"
+            return error.status, {"error": error.message}, headers
+        except Exception as error:
+            self.outcomes["error"] += 1
+            return (
+                HTTPStatus.INTERNAL_SERVER_ERROR,
+                {"error": f"Internal error [{type(error).__name__}]"},
+                {},
+            )
+
+    def read_limits(self, request):
+        """Engine and budget a request asks for, within what the server allows
+
+        Parameters
+        ----------
+        request : dict
+
+        Raises
+        ------
+        HttpError
+            If any of them aren't valid
+
+        Return
+        ------
+        tuple
+            (engine, timeout, max_operations)
+        """
+        engine = request.get("engine", self.engine)
+        if not isinstance(engine, str) or engine not in ENGINES:
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST,
+                f"Unknown engine [{engine}], choose from [{', '.join(ENGINES)}]",
+            )
+
+        timeout = request.get("timeout", self.timeout)
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "timeout has to be above 0")
+
+        max_operations = request.get("max_operations")
+        if max_operations is not None and (
+            not isinstance(max_operations, int) or max_operations < 0
+        ):
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST, "max_operations has to be a whole number"
+            )
+
+        return engine, min(timeout, self.timeout), max_operations
+
+    @staticmethod
+    def read_puzzle(value):
+        """Check a puzzle in a request is a string, reading it is left to the
+        worker so a bad puzzle gets an `INVALID` result like in a batch
+
+        @staticmethod
+
+        Parameters
+        ----------
+        value : object
+
+        Raises
+        ------
+        HttpError
+            If it isn't a string, or is more than one line
+
+        Return
+        ------
+        str
+        """
+        if not isinstance(value, str) or "\n" in value:
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST, "puzzle has to be a oneliner string"
+            )
+        return value.strip()
+
+    async def submit(self, timeout, function, *args, **keywords):
+        """Run `function(*args, **keywords, timeout=seconds left)` on a worker, once
+        there's room
+
+        Parameters
+        ----------
+        timeout : float
+            Seconds for the whole request, waiting for a worker included
+        function : callable
+            Module level, so it can be sent to the worker
+        args, keywords
+            Passed to `function`, along with the seconds left of `timeout`
+
+        Raises
+        ------
+        HttpError
+            503 if the queue is full, 504 if it takes too long
+        BrokenProcessPool
+            If a worker died, the pool is replaced for the requests after
+
+        Return
+        ------
+        object
+            What `function` gave back
+        """
+        if self.pending >= self.queue_size:
+            self.outcomes["rejected"] += 1
+            raise HttpError(
+                HTTPStatus.SERVICE_UNAVAILABLE, "Too many requests queued, try again"
+            )
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        self.pending += 1
+
+        try:
+            await asyncio.wait_for(self.slots.acquire(), timeout)
+
+            try:
+                remaining = deadline - loop.time()
+                call = partial(function, *args, **keywords, timeout=remaining)
+                executor = self.executor
+                future = loop.run_in_executor(executor, call)
+                return await asyncio.wait_for(future, remaining + TIMEOUT_GRACE)
+            except BrokenProcessPool:
+                # The rest of the pool goes down with a worker, without a new one
+                # every request after would fail too. Only the first request to
+                # notice replaces it
+                if self.executor is executor:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self.executor = self.create_executor()
+                raise
+            finally:
+                self.slots.release()
+        except asyncio.TimeoutError:
+            self.outcomes["timed_out"] += 1
+            raise HttpError(
+                HTTPStatus.GATEWAY_TIMEOUT, f"Not done within [{timeout}] seconds"
+            )
+        finally:
+            self.pending -= 1
+
+    async def handle_solve(self, request):
+        """POST /solve, see `solve_puzzles()`"""
+        puzzle = self.read_puzzle(request.get("puzzle"))
+        engine, timeout, max_operations = self.read_limits(request)
+
+        responses = await self.submit(
+            timeout, solve_puzzles, engine, [puzzle], max_operations=max_operations
+        )
+        self.outcomes[responses[0]["status"]] += 1
+        return responses[0]
+
+    async def handle_batch(self, request):
+        """POST /batch, see `solve_puzzles()`, the timeout covers the whole batch"""
+        puzzles = request.get("puzzles")
+        if not isinstance(puzzles, list):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "puzzles has to be a list")
+
+        if len(puzzles) > self.max_batch:
+            raise HttpError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Batches are up to [{self.max_batch}] puzzles",
+            )
+
+        puzzles = [self.read_puzzle(puzzle) for puzzle in puzzles]
+        engine, timeout, max_operations = self.read_limits(request)
+
+        responses = await self.submit(
+            timeout, solve_puzzles, engine, puzzles, max_operations=max_operations
+        )
+        self.outcomes.update(response["status"] for response in responses)
+        return {"results": responses}
+
+    async def handle_validate(self, request):
+        """POST /validate, see `validate_puzzle()`"""
+        puzzle = self.read_puzzle(request.get("puzzle"))
+        _, timeout, _ = self.read_limits(request)
+
+        response = await self.submit(timeout, validate_puzzle, puzzle)
+        self.outcomes[response["status"]] += 1
+        return response
+
+    def handle_health(self):
+        """GET /health"""
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "pending": self.pending,
+            "queue_size": self.queue_size,
+        }
+
+    def handle_metrics(self):
+        """GET /metrics, counts since the server started and the latency of the
+        last `LATENCY_WINDOW` requests"""
+        latencies = sorted(self.latencies)
+        return {
+            "uptime": time.monotonic() - self.start_time,
+            "pending": self.pending,
+            "requests": dict(self.requests),
+            "responses": {
+                str(status): count for status, count in self.responses.items()
+            },
+            "outcomes": dict(self.outcomes),
+            "latency": {
+                "count": len(latencies),
+                "p50": percentile(latencies, 0.5),
+                "p99": percentile(latencies, 0.99),
+            },
+        }
+
+
+async def serve(**options):
+    """Run a `SolveServer` until cancelled, ctrl+c
+
+    Parameters
+    ----------
+    options
+        Passed to `SolveServer`
+    """
+    server = SolveServer(**options)
+    await server.start()
+
+    print(
+        f"Serving - http://{server.host}:{server.port}, Workers=[{server.workers}], "
+        f"Engine=[{server.engine}], Timeout=[{server.timeout}]seconds, "
+        f"QueueSize=[{server.queue_size}]",
+        flush=True,
+    )
+
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
@@ -15,6 +15,10 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+from math import isqrt
+
+from board import Board, cell_indexes
+
 
 class Solver:
     """
@@ -24,15 +28,9 @@ class Solver:
 
     def __init__(self) -> None:
         """"""
-        self.operation_count = 0
-
-    def reset_operation_count(self):
-        """Reset the operation count
-
-        We don't always instantiate a new solver class each time, need a 
-        mechanism to reset when we want to solve another puzzle
-        """
-        self.operation_count = 0
+        # `Budget` checked as the search goes, set by `solve_within()`. It counts
+        # the operations, nodes of the search, `instrument()` breaks them down
+        self.budget = None
 
     def find_next_cell_to_solve(self, board):
         """Method to find the next cell in the board to solve
@@ -45,11 +43,12 @@ class Solver:
         Return
         ------
         tuple
-            ([0-8], [0-8]) or (None, None) if no cells that are empty
+            (row, column) or (None, None) if no cells that are empty
         """
-        for row in range(0, 9):
-            for column in range(0, 9):
-                self.operation_count += 1
+        size = len(board)
+
+        for row in range(0, size):
+            for column in range(0, size):
                 if board[row][column] == 0:
                     return (row, column)
 
@@ -69,27 +68,34 @@ class Solver:
         gui : Gui
             If not None, it will call back and update the value in real time in the gui
 
+        Raises
+        ------
+        BudgetExceeded
+            If `budget` is set and runs out, the board is left part way through,
+            `solve_within()` puts it back
+
         Return
         ------
         bool
             True/False based on what that guess results in or if the board
             has been solved
         """
+        if self.budget is not None:
+            self.budget.check()
+
         row, column = self.find_next_cell_to_solve(board)
 
         if row is None or column is None:
             # There is no more cells, it's complete?!
             return True
 
-        # We have found a spot to put a guess, now make a guess between valid sudoku values 1-9
-        for guess in range(1, 10):
-            self.operation_count += 1
-
+        # We have found a spot to put a guess, now make a guess between valid sudoku
+        # values, 1-9 on a 9x9 board
+        for guess in range(1, len(board) + 1):
             # If the guess is a valid value and doesn't break the rules, set it and continue
             if self.check_guess_is_valid(board, row, column, guess):
 
                 board[row][column] = guess
-                self.operation_count += 1
 
                 if gui is not None:
                     gui.set_board_value(row, column, guess)
@@ -98,31 +104,32 @@ class Solver:
 
                 # Recursively call solve() until it's solved
                 if self.solve(board, gui):
-                    self.operation_count += 1
                     return True
 
             # This guess wasn't the one, set back to default value, and backtrack
             board[row][column] = 0
-            self.operation_count += 1
 
             if gui is not None:
                 gui.set_board_value(row, column, 0)
 
+        if gui is not None:
+            gui.backtrack(row, column)
+
         # Hmm, looks like this is unsolvable, go back up the chain
         return False
 
     def check_guess_is_valid(self, board, row, column, guess):
-        """Method to take the guess and validate it against the row, the column and the 3x3
-        square grid (sudoku rules duh)
+        """Method to take the guess and validate it against the row, the column and the
+        box, 3x3 on a 9x9 board (sudoku rules duh)
 
         Parameters
         ----------
         board : list[list[int]]
             Representation of the board in list of lists, 0's are for unsolved
         row : int
-            Value between 0-8
+            Value between 0-8 (0 to size - 1 on bigger boards)
         column : int
-            Value between 0-8
+            Value between 0-8 (0 to size - 1 on bigger boards)
         guess : int
             Value generated that may or may not be valid
 
@@ -132,30 +139,875 @@ class Solver:
             True - if guess is valid within the rules, valid
             False - value exists or breaks the rules, not valid
         """
+        size = len(board)
+        box_size = isqrt(size)
+
         if guess in board[row]:
             return False
-        self.operation_count += 1
 
         # Validate the guess doesn't exist in the row or any row at this column
-        if guess in [board[range_row][column] for range_row in range(9)]:
+        if guess in [board[range_row][column] for range_row in range(size)]:
             return False
-        self.operation_count += (1 * 9)
+
         # Validate the 3x3 grid, final rule
-        #   1. There are 3 "grids" or "chunks", 0, 1 and 2
+        #   1. There are 3 "grids" or "chunks", 0, 1 and 2 (box_size of them)
         #   2. Reduce the row/column value into one of these "chunks" using modulo
         #   3. Go through the grid (all 9 values) and check guess doesn't exist already
         #     a. if not ==> Valid, return True
         #     b. if does ==> Not valid, return False
-        row_grid = (row // 3) * 3
-        column_grid = (column // 3) * 3
-
-        self.operation_count += 2
+        row_grid = (row // box_size) * box_size
+        column_grid = (column // box_size) * box_size
 
-        for grid_row in range(row_grid, row_grid + 3):
-            for grid_column in range(column_grid, column_grid + 3):
-                self.operation_count += 1
+        for grid_row in range(row_grid, row_grid + box_size):
+            for grid_column in range(column_grid, column_grid + box_size):
                 if guess == board[grid_row][grid_column]:
                     return False
 
         # We still haven't matched the guess, so it's valid
         return True
+
+
+class Geometry:
+    """
+    Lookups for one size of board, worked out once and shared by every solver that
+    works on that size. Cells are numbered flat, row * size + column
+    """
+
+    __slots__ = (
+        "box_size",
+        "size",
+        "cell_count",
+        "box_index",
+        "cell_row",
+        "cell_column",
+        "cell_box",
+        "peers",
+        "units",
+        "all_digits_mask",
+    )
+
+    def __init__(self, box_size=3) -> None:
+        """
+        Parameters
+        ----------
+        box_size : int, default=3
+            3 for a 9x9 board, 4 for 16x16, 5 for 25x25...
+        """
+        size = box_size * box_size
+        cell_count = size * size
+        rows, columns, boxes = cell_indexes(box_size)
+
+        self.box_size = box_size
+        self.size = size
+        self.cell_count = cell_count
+
+        # Box number for each row/column, worked out once rather than on every guess
+        self.box_index = [
+            [
+                (row // box_size) * box_size + (column // box_size)
+                for column in range(size)
+            ]
+            for row in range(size)
+        ]
+
+        # Same lookups but keyed on the flat cell number
+        self.cell_row = [cell // size for cell in range(cell_count)]
+        self.cell_column = [cell % size for cell in range(cell_count)]
+        self.cell_box = [
+            self.box_index[cell // size][cell % size] for cell in range(cell_count)
+        ]
+
+        # Every other cell sharing a row, column or box with the cell, 20 for each
+        # on a 9x9 board
+        self.peers = [
+            sorted(
+                set(rows[self.cell_row[cell]])
+                .union(columns[self.cell_column[cell]], boxes[self.cell_box[cell]])
+                .difference((cell,))
+            )
+            for cell in range(cell_count)
+        ]
+
+        # The rows, columns and boxes as lists of flat cell numbers, 27 on a 9x9
+        self.units = [list(unit) for unit in rows + columns + boxes]
+
+        # Bit `n` set means the digit `n` is present, so bits 1-size are used and
+        # bit 0 is spare
+        self.all_digits_mask = ((1 << size) - 1) << 1
+
+
+def get_geometry(box_size):
+    """The shared `Geometry` for a board size, made the first time it's asked for
+
+    Parameters
+    ----------
+    box_size : int
+
+    Return
+    ------
+    Geometry
+    """
+    if box_size not in GEOMETRIES:
+        GEOMETRIES[box_size] = Geometry(box_size)
+
+    return GEOMETRIES[box_size]
+
+
+GEOMETRIES = {}
+
+# The 9x9 lookups, also at module level for anything that only deals in 9x9
+BOX_INDEX = get_geometry(3).box_index
+CELL_ROW = get_geometry(3).cell_row
+CELL_COLUMN = get_geometry(3).cell_column
+CELL_BOX = get_geometry(3).cell_box
+PEERS = get_geometry(3).peers
+UNITS = get_geometry(3).units
+ALL_DIGITS_MASK = get_geometry(3).all_digits_mask
+
+
+def order_values_ascending(solver, cells, row, column, candidates):
+    """Value ordering - try the candidate digits lowest first
+
+    Parameters
+    ----------
+    solver : BitmaskSolver
+    cells : list[int] or bytearray
+        The cells of the board being solved, in reading order
+    row : int
+    column : int
+    candidates : int
+        Bitmask of the legal digits for the cell
+
+    Return
+    ------
+    list[int]
+        Digits in the order they should be guessed
+    """
+    values = []
+    while candidates:
+        bit = candidates & -candidates
+        candidates ^= bit
+        values.append(bit.bit_length() - 1)
+
+    return values
+
+
+def order_values_least_constraining(solver, cells, row, column, candidates):
+    """Value ordering - try the digit that rules out the fewest options for the
+    empty peers first (least-constraining-value)
+
+    Parameters
+    ----------
+    solver : BitmaskSolver
+    cells : list[int] or bytearray
+        The cells of the board being solved, in reading order
+    row : int
+    column : int
+    candidates : int
+        Bitmask of the legal digits for the cell
+
+    Return
+    ------
+    list[int]
+        Digits in the order they should be guessed
+    """
+    peer_candidates = [
+        solver.get_cell_candidates(peer)
+        for peer in solver.peers[row * solver.size + column]
+        if cells[peer] == 0
+    ]
+
+    def constrained_count(value):
+        bit = 1 << value
+        return sum(1 for mask in peer_candidates if mask & bit)
+
+    return sorted(
+        order_values_ascending(solver, cells, row, column, candidates),
+        key=constrained_count,
+    )
+
+
+VALUE_ORDERINGS = {
+    "ascending": order_values_ascending,
+    "lcv": order_values_least_constraining,
+}
+
+CELL_SELECTIONS = ("first", "mrv")
+
+
+class BitmaskSolver(Solver):
+    """
+    Backtracking solver that tracks which digits are used in each row, column and
+    box as bitmasks, so working out the legal guesses for a cell is a couple of
+    bitwise operations rather than scanning the board
+
+    The empty cells are kept in an index that is updated as cells are filled and
+    emptied, so picking the next cell never rescans the grid. By default the cell
+    with the fewest candidates is picked (minimum-remaining-values)
+
+    Before searching, and after every guess, naked and hidden singles are filled in
+    until nothing changes. Lots of puzzles never need a guess at all, those are
+    flagged with `solved_by_propagation`
+
+    The search works on the cells flat, a `Board` is solved straight in its own
+    buffer and a list[list[int]] board is flattened then written back at the end.
+    Any size of board works, the lookups are swapped over when the size changes,
+    and with propagation a 16x16 or 25x25 puzzle is solved in seconds
+
+    Same contract as `Solver.solve()`, the board is mutated in place and a bool
+    is returned
+    """
+
+    def __init__(
+        self, cell_selection="mrv", value_ordering="ascending", use_propagation=True
+    ) -> None:
+        """
+        Parameters
+        ----------
+        cell_selection : str, default='mrv'
+            `mrv` - cell with the fewest candidates, `first` - first empty cell
+            in reading order (same order as `Solver`)
+        value_ordering : str or callable, default='ascending'
+            One of `VALUE_ORDERINGS`, or a callable with the same signature as
+            `order_values_ascending()`
+        use_propagation : bool, default=True
+            Fill in naked and hidden singles before and during the search
+
+        Raises
+        ------
+        ValueError
+            If the cell selection or value ordering isn't known
+        """
+        super().__init__()
+
+        if cell_selection not in CELL_SELECTIONS:
+            raise ValueError(f"Unknown cell selection [{cell_selection}]")
+
+        if not callable(value_ordering):
+            if value_ordering not in VALUE_ORDERINGS:
+                raise ValueError(f"Unknown value ordering [{value_ordering}]")
+            value_ordering = VALUE_ORDERINGS[value_ordering]
+
+        self.cell_selection = cell_selection
+        self.order_values = value_ordering
+        self.use_propagation = use_propagation
+        self.set_geometry(3)
+        self.row_masks = [0] * 9
+        self.column_masks = [0] * 9
+        self.box_masks = [0] * 9
+
+        # Board being solved and its cells, the cells are the board's own
+        # buffer for a `Board` or a flat copy for a list[list[int]]
+        self.board = None
+        self.cells = [0] * 81
+
+        # First `empty_count` entries of `empty_cells` are the cells still to solve,
+        # `empty_positions` is where each cell currently sits in that list
+        self.empty_cells = list(range(81))
+        self.empty_positions = list(range(81))
+        self.empty_count = 0
+
+        # Cells filled by propagation, in order, so they can be undone on backtrack
+        self.trail = []
+
+        # How the cells of the current board were filled
+        self.propagated_count = 0
+        self.searched_count = 0
+        self.solved_by_propagation = False
+
+    def set_geometry(self, box_size):
+        """Switch the lookups over to another size of board
+
+        Parameters
+        ----------
+        box_size : int
+            3 for a 9x9 board, 4 for 16x16, 5 for 25x25...
+        """
+        geometry = get_geometry(box_size)
+
+        self.geometry = geometry
+        self.size = geometry.size
+        self.box_index = geometry.box_index
+        self.cell_row = geometry.cell_row
+        self.cell_column = geometry.cell_column
+        self.cell_box = geometry.cell_box
+        self.peers = geometry.peers
+        self.units = geometry.units
+        self.all_digits_mask = geometry.all_digits_mask
+
+    def load_masks(self, board):
+        """Take on a board, building the row, column and box masks and the empty
+        cell index from it
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+            0's are for unsolved
+
+        Return
+        ------
+        bool
+            True if the givens are consistent, False if a digit appears twice
+            in any row, column or box
+        """
+        self.board = board
+        if isinstance(board, Board):
+            box_size = board.box_size
+            self.cells = board.cells
+        else:
+            box_size = isqrt(len(board))
+            self.cells = [value for row in board for value in row]
+
+        if box_size != self.geometry.box_size:
+            self.set_geometry(box_size)
+
+        cells = self.cells
+        cell_count = self.geometry.cell_count
+        cell_row = self.cell_row
+        cell_column = self.cell_column
+        cell_box = self.cell_box
+        self.row_masks = [0] * self.size
+        self.column_masks = [0] * self.size
+        self.box_masks = [0] * self.size
+        self.empty_cells = []
+
+        for cell in range(cell_count):
+            value = cells[cell]
+            if value == 0:
+                self.empty_cells.append(cell)
+                continue
+
+            bit = 1 << value
+            row = cell_row[cell]
+            column = cell_column[cell]
+            box = cell_box[cell]
+            used = self.row_masks[row] | self.column_masks[column] | self.box_masks[box]
+            if used & bit:
+                return False
+
+            self.row_masks[row] |= bit
+            self.column_masks[column] |= bit
+            self.box_masks[box] |= bit
+
+        self.empty_count = len(self.empty_cells)
+
+        # Filled cells go on the end so every cell has a slot it can be swapped into
+        filled_cells = set(range(cell_count)).difference(self.empty_cells)
+        self.empty_cells.extend(sorted(filled_cells))
+        self.empty_positions = [0] * cell_count
+        for position, cell in enumerate(self.empty_cells):
+            self.empty_positions[cell] = position
+
+        return True
+
+    def write_back(self):
+        """Copy the cells back into a list[list[int]] board, a `Board` already
+        has them"""
+        board = self.board
+        if board is None or isinstance(board, Board):
+            return
+
+        cells = self.cells
+        size = self.size
+        for row in range(size):
+            board[row][:] = cells[row * size : row * size + size]
+
+    def get_candidates(self, row, column):
+        """Get the digits that can legally go in a cell as a bitmask
+
+        Parameters
+        ----------
+        row : int
+            Value between 0-8 (0 to size - 1 on bigger boards)
+        column : int
+            Value between 0-8 (0 to size - 1 on bigger boards)
+
+        Return
+        ------
+        int
+            Bitmask where bit `n` set means `n` is a legal guess
+        """
+        return self.all_digits_mask & ~(
+            self.row_masks[row]
+            | self.column_masks[column]
+            | self.box_masks[self.box_index[row][column]]
+        )
+
+    def get_cell_candidates(self, cell):
+        """Same as `get_candidates()` but for a flat cell number
+
+        Parameters
+        ----------
+        cell : int
+            Flat cell number, row * size + column
+
+        Return
+        ------
+        int
+            Bitmask where bit `n` set means `n` is a legal guess
+        """
+        return self.all_digits_mask & ~(
+            self.row_masks[self.cell_row[cell]]
+            | self.column_masks[self.cell_column[cell]]
+            | self.box_masks[self.cell_box[cell]]
+        )
+
+    def remove_empty_cell(self, cell):
+        """Take `cell` out of the empty cell index
+
+        It is swapped to just past the end of the empty cells, so
+        `restore_empty_cell()` can put it back by growing the count again. Cells
+        must be restored in the reverse order they were removed
+
+        Parameters
+        ----------
+        cell : int
+            Flat cell number, row * size + column
+        """
+        last = self.empty_count - 1
+        position = self.empty_positions[cell]
+        last_cell = self.empty_cells[last]
+
+        self.empty_cells[position] = last_cell
+        self.empty_positions[last_cell] = position
+        self.empty_cells[last] = cell
+        self.empty_positions[cell] = last
+        self.empty_count = last
+
+    def restore_empty_cell(self):
+        """Put the most recently removed cell back into the empty cell index"""
+        self.empty_count += 1
+
+    def select_cell(self):
+        """Pick the next empty cell to guess at, based on `cell_selection`
+
+        Return
+        ------
+        tuple
+            (cell, candidates) - flat cell number and its candidate bitmask, a
+            candidate mask of 0 means the board is at a dead end
+        """
+        row_masks = self.row_masks
+        column_masks = self.column_masks
+        box_masks = self.box_masks
+        empty_cells = self.empty_cells
+        cell_row = self.cell_row
+        cell_column = self.cell_column
+        cell_box = self.cell_box
+        all_digits_mask = self.all_digits_mask
+
+        if self.cell_selection == "first":
+            cell = min(empty_cells[: self.empty_count])
+            return cell, self.get_cell_candidates(cell)
+
+        best_cell = None
+        best_candidates = 0
+        best_count = self.size + 1
+
+        for position in range(self.empty_count):
+            cell = empty_cells[position]
+            candidates = all_digits_mask & ~(
+                row_masks[cell_row[cell]]
+                | column_masks[cell_column[cell]]
+                | box_masks[cell_box[cell]]
+            )
+            count = candidates.bit_count()
+
+            if count < best_count:
+                best_cell, best_candidates, best_count = cell, candidates, count
+
+                # Can't do better than a forced move, or a dead end
+                if count <= 1:
+                    break
+
+        return best_cell, best_candidates
+
+    def assign(self, cell, value):
+        """Put `value` in a cell and mark it as used in the masks
+
+        Parameters
+        ----------
+        cell : int
+            Flat cell number, row * size + column
+        value : int
+        """
+        bit = 1 << value
+        self.cells[cell] = value
+        self.row_masks[self.cell_row[cell]] |= bit
+        self.column_masks[self.cell_column[cell]] |= bit
+        self.box_masks[self.cell_box[cell]] |= bit
+
+    def unassign(self, cell, value):
+        """Take `value` back out of a cell and clear it from the masks
+
+        Parameters
+        ----------
+        cell : int
+            Flat cell number, row * size + column
+        value : int
+        """
+        bit = ~(1 << value)
+        self.cells[cell] = 0
+        self.row_masks[self.cell_row[cell]] &= bit
+        self.column_masks[self.cell_column[cell]] &= bit
+        self.box_masks[self.cell_box[cell]] &= bit
+
+    def fill_cell(self, cell, value, gui=None):
+        """Fill a cell found by propagation, recording it on the trail
+
+        Parameters
+        ----------
+        cell : int
+            Flat cell number, row * size + column
+        value : int
+        gui : Gui
+        """
+        self.assign(cell, value)
+        self.remove_empty_cell(cell)
+        self.trail.append(cell)
+        self.propagated_count += 1
+
+        if gui is not None:
+            gui.set_board_value(self.cell_row[cell], self.cell_column[cell], value)
+
+    def undo_propagation(self, mark, gui=None):
+        """Empty the cells filled by propagation since the trail was `mark` long
+
+        Parameters
+        ----------
+        mark : int
+            Length of the trail to go back to
+        gui : Gui
+        """
+        trail = self.trail
+        cells = self.cells
+        while len(trail) > mark:
+            cell = trail.pop()
+
+            self.unassign(cell, cells[cell])
+            self.restore_empty_cell()
+            self.propagated_count -= 1
+
+            if gui is not None:
+                gui.set_board_value(self.cell_row[cell], self.cell_column[cell], 0)
+
+    def propagate(self, gui=None):
+        """Fill in naked singles (cells with one candidate) and hidden singles (digits
+        with only one place to go in a row, column or box) until nothing changes
+
+        Parameters
+        ----------
+        gui : Gui
+
+        Return
+        ------
+        bool
+            False if the board hit a contradiction, a cell with no candidates or
+            a digit with nowhere to go, True otherwise
+        """
+        cells = self.cells
+        all_digits_mask = self.all_digits_mask
+        progress = True
+
+        while progress and self.empty_count:
+            progress = False
+
+            # Naked singles, walk backwards so filling a cell (which swaps the last
+            # empty cell into its slot) doesn't skip anything
+            for position in range(self.empty_count - 1, -1, -1):
+                cell = self.empty_cells[position]
+                candidates = self.get_cell_candidates(cell)
+
+                if not candidates:
+                    return False
+
+                if candidates & (candidates - 1) == 0:
+                    self.fill_cell(cell, candidates.bit_length() - 1, gui)
+                    progress = True
+
+            # Hidden singles, per unit work out which digits are candidates in
+            # exactly one cell
+            for unit in self.units:
+                used = 0
+                once = 0
+                twice = 0
+
+                for cell in unit:
+                    value = cells[cell]
+                    if value:
+                        used |= 1 << value
+                        continue
+
+                    candidates = self.get_cell_candidates(cell)
+                    twice |= once & candidates
+                    once |= candidates
+
+                if all_digits_mask & ~(once | used):
+                    return False
+
+                singles = once & ~twice
+                while singles:
+                    bit = singles & -singles
+                    singles ^= bit
+
+                    for cell in unit:
+                        if cells[cell] == 0 and self.get_cell_candidates(cell) & bit:
+                            self.fill_cell(cell, bit.bit_length() - 1, gui)
+                            progress = True
+                            break
+
+        return True
+
+    def solve(self, board, gui=None):
+        """Solve the board in place, see `Solver.solve()`
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+            0's are for unsolved
+        gui : Gui
+            If not None, it will call back and update the value in real time in the gui
+
+        Return
+        ------
+        bool
+            True if the board has been solved, False if it can't be
+        """
+        self.trail = []
+        self.propagated_count = 0
+        self.searched_count = 0
+        self.solved_by_propagation = False
+
+        # Duplicate givens can never be solved, no point searching
+        if not self.load_masks(board):
+            return False
+
+        if self.use_propagation:
+            if not self.propagate(gui):
+                self.undo_propagation(0, gui)
+                return False
+
+            if self.empty_count == 0:
+                self.solved_by_propagation = True
+                self.write_back()
+                return True
+
+        if self.search(gui):
+            self.write_back()
+            return True
+
+        # Leave an unsolvable board how it was given, like `Solver` does
+        self.undo_propagation(0, gui)
+        return False
+
+    def solve_by_propagation(self, board, gui=None):
+        """Fast lane, only fill in the singles and never guess
+
+        The board is mutated in place whether or not it is finished, check
+        the return value or `solved_by_propagation`
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+            0's are for unsolved
+        gui : Gui
+
+        Return
+        ------
+        bool
+            True if propagation alone solved the board
+        """
+        self.trail = []
+        self.propagated_count = 0
+        self.searched_count = 0
+
+        self.solved_by_propagation = (
+            self.load_masks(board) and self.propagate(gui) and self.empty_count == 0
+        )
+        self.write_back()
+        return self.solved_by_propagation
+
+    def search(self, gui=None):
+        """Recursive backtracking over the masks, `load_masks()` must be called first
+
+        Parameters
+        ----------
+        gui : Gui
+
+        Return
+        ------
+        bool
+            True/False based on what that guess results in or if the board
+            has been solved
+        """
+        if self.empty_count == 0:
+            return True
+
+        cell, candidates = self.select_cell()
+
+        if self.budget is not None:
+            self.budget.check()
+
+        if not candidates:
+            if gui is not None:
+                gui.backtrack(self.cell_row[cell], self.cell_column[cell])
+            return False
+
+        row = self.cell_row[cell]
+        column = self.cell_column[cell]
+        self.remove_empty_cell(cell)
+
+        for guess in self.order_values(self, self.cells, row, column, candidates):
+            self.assign(cell, guess)
+            self.searched_count += 1
+            mark = len(self.trail)
+
+            if gui is not None:
+                gui.set_board_value(row, column, guess)
+                gui.set_progress_bar_value((((row + 1) * 10) + column + 2))
+
+            if (not self.use_propagation or self.propagate(gui)) and self.search(gui):
+                return True
+
+            self.undo_propagation(mark, gui)
+            self.unassign(cell, guess)
+            self.searched_count -= 1
+
+            if gui is not None:
+                gui.set_board_value(row, column, 0)
+
+        if gui is not None:
+            gui.backtrack(row, column)
+
+        self.restore_empty_cell()
+        return False
+
+    def count_solutions(self, board, limit=2):
+        """Count the solutions of a board, stopping as soon as `limit` have been
+        found. With the default limit it tells whether a puzzle has exactly one
+        solution
+
+        The board is left how it was given
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+            0's are for unsolved
+        limit : int, default=2
+            Stop counting at this many
+
+        Return
+        ------
+        int
+            Number of solutions, no more than `limit`
+        """
+        count = 0
+        if limit <= 0:
+            return count
+
+        solutions = self.solutions(board)
+
+        for _ in solutions:
+            count += 1
+            if count >= limit:
+                break
+
+        # Closing puts the board back, like running out of solutions does
+        solutions.close()
+        return count
+
+    def solutions(self, board, gui=None):
+        """Lazily yield every solution of a board, in search order, so even the
+        empty board can be walked through a solution at a time
+
+        Nothing is copied, the board itself is yielded each time filled in with
+        the next solution, so copy it to keep it. Once the solutions run out, or the
+        generator is closed, the board is back how it was given
+
+        Usage
+        -----
+        for solution in solver.solutions(board):
+            ... solution.copy() ...
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+            0's are for unsolved
+        gui : Gui
+
+        Yield
+        -----
+        Board or list[list[int]]
+            `board`, filled in with a solution
+        """
+        self.trail = []
+        self.propagated_count = 0
+        self.searched_count = 0
+        self.solved_by_propagation = False
+
+        if not self.load_masks(board):
+            return
+
+        try:
+            if not self.use_propagation or self.propagate(gui):
+                yield from self.search_solutions(gui)
+        finally:
+            self.undo_propagation(0, gui)
+            self.write_back()
+
+    def search_solutions(self, gui=None):
+        """Backtracking like `search()` as a generator, it carries on past each
+        solution and always puts the board back, even when closed part way
+
+        Parameters
+        ----------
+        gui : Gui
+
+        Yield
+        -----
+        Board or list[list[int]]
+            The board being solved, at each solution
+        """
+        if self.empty_count == 0:
+            self.write_back()
+            yield self.board
+            return
+
+        cell, candidates = self.select_cell()
+
+        if self.budget is not None:
+            self.budget.check()
+
+        if not candidates:
+            if gui is not None:
+                gui.backtrack(self.cell_row[cell], self.cell_column[cell])
+            return
+
+        row = self.cell_row[cell]
+        column = self.cell_column[cell]
+        self.remove_empty_cell(cell)
+
+        try:
+            for guess in self.order_values(self, self.cells, row, column, candidates):
+                self.assign(cell, guess)
+                self.searched_count += 1
+                mark = len(self.trail)
+
+                if gui is not None:
+                    gui.set_board_value(row, column, guess)
+
+                try:
+                    if not self.use_propagation or self.propagate(gui):
+                        yield from self.search_solutions(gui)
+                finally:
+                    self.undo_propagation(mark, gui)
+                    self.unassign(cell, guess)
+                    self.searched_count -= 1
+
+                    if gui is not None:
+                        gui.set_board_value(row, column, 0)
+
+            if gui is not None:
+                gui.backtrack(row, column)
+        finally:
+            self.restore_empty_cell()
@@ -0,0 +1,193 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+from collections import Counter
+
+from budget import Budget, CANCELLED
+from run import Run, ENGINES, DEFAULT_ENGINE, INVALID
+
+
+def parse_request(line):
+    """Decode one JSON-lines request, straight from the bytes read
+
+    Parameters
+    ----------
+    line : bytes
+        {"id", "puzzle", "engine", "timeout", "max_operations"}, only the puzzle is
+        needed, the id is handed back as given
+
+    Raises
+    ------
+    ValueError
+        If it isn't a JSON object
+
+    Return
+    ------
+    dict
+    """
+    try:
+        request = json.loads(line)
+    except ValueError:
+        raise ValueError("Request isn't JSON")
+
+    if not isinstance(request, dict):
+        raise ValueError("Request isn't a JSON object")
+
+    return request
+
+
+def read_request(request, engine, timeout=None, max_operations=None):
+    """Pick the puzzle, engine and budget out of a request
+
+    Parameters
+    ----------
+    request : dict
+        From `parse_request()`
+    engine : str
+        Used if the request doesn't pick an engine
+    timeout : float, default=None
+        Used if the request doesn't have a timeout
+    max_operations : int, default=None
+        Used if the request doesn't have max_operations
+
+    Raises
+    ------
+    ValueError
+        If the request can't be used, the message says why
+
+    Return
+    ------
+    tuple
+        (puzzle, engine, timeout, max_operations)
+    """
+    puzzle = request.get("puzzle")
+    if not isinstance(puzzle, str):
+        raise ValueError("puzzle has to be a oneliner string")
+
+    engine = request.get("engine", engine)
+    if not isinstance(engine, str) or engine not in ENGINES:
+        raise ValueError(
+            f"Unknown engine [{engine}], choose from [{', '.join(ENGINES)}]"
+        )
+
+    timeout = request.get("timeout", timeout)
+    if timeout is not None and (
+        not isinstance(timeout, (int, float)) or timeout < 0
+    ):
+        raise ValueError("timeout has to be a number of seconds")
+
+    max_operations = request.get("max_operations", max_operations)
+    if max_operations is not None and (
+        not isinstance(max_operations, int) or max_operations < 0
+    ):
+        raise ValueError("max_operations has to be a whole number")
+
+    return puzzle, engine, timeout, max_operations
+
+
+def process_stream(
+    lines,
+    out,
+    engine=DEFAULT_ENGINE,
+    timeout=None,
+    max_operations=None,
+    flush_every=1,
+    token=None,
+):
+    """Solve JSON-lines requests as they come in, writing a JSON-lines response for
+    each, in the same order. Made for another program to keep one solver process
+    running and stream puzzles through it
+
+    A response is the request's id and `Run.report_oneliner()`. A line that isn't
+    a usable request gets an `INVALID` response with the error, and the id if
+    it could be read
+
+    Parameters
+    ----------
+    lines : iterable[bytes]
+        Requests, one per line, e.g. `sys.stdin.buffer`. Blank lines are skipped
+    out : binary file
+        Where responses go, e.g. `sys.stdout.buffer`
+    engine : str, default='bitmask'
+        Name of the engine in `ENGINES` for requests that don't pick one
+    timeout : float, default=None
+        Seconds for requests that don't give a timeout, None for no limit
+    max_operations : int, default=None
+        Operations for requests that don't give max_operations, None for no limit
+    flush_every : int, default=1
+        Responses written between flushes, 1 so the caller gets each one straight
+        away. More is quicker but the caller mustn't wait on each response
+    token : CancellationToken, default=None
+        Once cancelled the stream stops after the request it's on
+
+    Raises
+    ------
+    ValueError
+        If the engine isn't known
+
+    Return
+    ------
+    Counter
+        Responses by status
+    """
+    if engine not in ENGINES:
+        raise ValueError(
+            f"Unknown engine [{engine}], choose from [{', '.join(ENGINES)}]"
+        )
+
+    runs = {}
+    counts = Counter()
+    unflushed = 0
+
+    for line in lines:
+        if not line.strip():
+            continue
+
+        request_id = None
+        try:
+            request = parse_request(line)
+            request_id = request.get("id")
+            puzzle, request_engine, request_timeout, request_max = read_request(
+                request, engine, timeout, max_operations
+            )
+        except ValueError as error:
+            response = {"id": request_id, "status": INVALID, "error": str(error)}
+        else:
+            if request_engine not in runs:
+                runs[request_engine] = Run(request_engine)
+            run = runs[request_engine]
+
+            # Always one, even without limits, as it counts the operations
+            run.budget = Budget(request_timeout, request_max, token)
+
+            response = {"id": request_id, **run.report_oneliner(puzzle)}
+
+        counts[response["status"]] += 1
+        out.write(json.dumps(response).encode())
+        out.write(b"\n")
+
+        unflushed += 1
+        if unflushed >= flush_every:
+            out.flush()
+            unflushed = 0
+
+        if response.get("reason") == CANCELLED:
+            break
+
+    out.flush()
+    return counts
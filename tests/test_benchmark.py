@@ -0,0 +1,244 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from benchmark import (
+    CORPORA,
+    benchmark_corpora,
+    benchmark_sizes,
+    benchmark_startup,
+    compare_to_baseline,
+    load_baseline,
+    load_corpus,
+    make_puzzle,
+    parse_importtime,
+    percentile,
+    save_baseline,
+    MAIN,
+)
+from solver import BitmaskSolver
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_make_puzzle(self):
+        """
+        test a made puzzle is the right size, blanked as asked and solvable
+        """
+        board = make_puzzle(4, 0.5, random.Random(1))
+
+        self.assertEqual(16, len(board))
+        self.assertEqual(128, board.cells.count(0))
+        self.assertEqual(True, BitmaskSolver().solve(board))
+
+    def test_make_puzzle_with_seed(self):
+        """
+        test the same seed makes the same puzzle
+        """
+        self.assertEqual(
+            make_puzzle(3, 0.5, random.Random(1)), make_puzzle(3, 0.5, random.Random(1))
+        )
+
+    def test_benchmark_sizes(self):
+        """
+        test there's a row for each size and engine, and every puzzle is solved
+        """
+        rows = list(benchmark_sizes(("bitmask", "dlx"), (3, 4), count=2))
+
+        self.assertEqual(
+            [(9, "bitmask"), (9, "dlx"), (16, "bitmask"), (16, "dlx")],
+            [(row["size"], row["engine"]) for row in rows],
+        )
+        for row in rows:
+            self.assertEqual(2, row["solved"])
+            self.assertGreater(row["operations"], 0)
+
+    def test_benchmark_sizes_with_unknown_engine(self):
+        """
+        test an unknown engine is caught before anything is timed
+        """
+        with self.assertRaises(ValueError):
+            list(benchmark_sizes(("cheese",)))
+
+    def test_load_corpus(self):
+        """
+        test every bundled puzzle has exactly one solution, and the 17-clue ones
+        have 17 clues
+        """
+        solver = BitmaskSolver()
+
+        for corpus in CORPORA:
+            boards = load_corpus(corpus)
+            self.assertGreater(len(boards), 0)
+            for board in boards:
+                self.assertEqual(1, solver.count_solutions(board))
+
+        for board in load_corpus("17-clue"):
+            self.assertEqual(17, 81 - board.cells.count(0))
+
+        with self.assertRaises(ValueError):
+            load_corpus("cheese")
+
+    def test_percentile(self):
+        """
+        test nearest rank percentiles
+        """
+        values = list(range(1, 101))
+
+        self.assertEqual(50, percentile(values, 0.5))
+        self.assertEqual(99, percentile(values, 0.99))
+        self.assertEqual(3, percentile([3], 0.99))
+        self.assertEqual(0, percentile([], 0.5))
+
+    def test_benchmark_corpora(self):
+        """
+        test a row for each corpus and engine, with latencies and memory
+        """
+        rows = list(benchmark_corpora(("bitmask", "dlx"), ("easy", "17-clue")))
+
+        self.assertEqual(
+            [
+                ("easy", "bitmask"),
+                ("easy", "dlx"),
+                ("17-clue", "bitmask"),
+                ("17-clue", "dlx"),
+            ],
+            [(row["corpus"], row["engine"]) for row in rows],
+        )
+        for row in rows:
+            self.assertEqual(row["puzzles"], row["solved"])
+            self.assertEqual(0, row["budget_exceeded"])
+            self.assertLessEqual(row["p50"], row["p99"])
+            self.assertGreater(row["peak_memory"], 0)
+
+    def test_baseline_compare(self):
+        """
+        test a saved baseline compares clean against itself and catches a
+        regression
+        """
+        rows = list(benchmark_corpora(("bitmask",), ("17-clue",), memory=False))
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "baseline.json")
+            save_baseline(rows, file_name)
+            baseline = load_baseline(file_name)
+
+        self.assertEqual([], compare_to_baseline(rows, baseline))
+
+        worse = [dict(rows[0], operations=rows[0]["operations"] * 2, solved=9)]
+        regressions = compare_to_baseline(worse, baseline)
+
+        self.assertEqual(
+            ["solved", "operations"],
+            [regression["metric"] for regression in regressions],
+        )
+        self.assertAlmostEqual(1.0, regressions[1]["change"])
+
+    def test_parse_importtime(self):
+        """
+        test the -X importtime lines are read into seconds and depths, anything
+        else is skipped
+        """
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     _signal\n"
+            "import time:      1500 |       2000 |   signal\n"
+            "import time:       300 |       2300 | main\n"
+            "Solved? - True\n"
+        )
+
+        self.assertEqual(
+            [
+                {
+                    "module": "_signal",
+                    "self": 0.00012,
+                    "cumulative": 0.00012,
+                    "depth": 2,
+                },
+                {"module": "signal", "self": 0.0015, "cumulative": 0.002, "depth": 1},
+                {"module": "main", "self": 0.0003, "cumulative": 0.0023, "depth": 0},
+            ],
+            parse_importtime(output),
+        )
+
+    def test_import_main_has_no_side_effects(self):
+        """
+        test importing main doesn't parse the command line, print anything or load
+        any of the modes
+        """
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, main; "
+                "print(sorted({'args', 'argparse', 'run', 'signal'} "
+                "& sys.modules.keys()))",
+            ],
+            cwd=os.path.dirname(MAIN),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        self.assertEqual("[]\n", process.stdout)
+        self.assertEqual("", process.stderr)
+
+    def test_import_args_loads_no_mode(self):
+        """
+        test the parsers are built without loading the solvers, so every mode
+        only pays for argparse
+        """
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, args; sys.argv = ['main.py', 'gui']; args.Args.process(); "
+                "print(sorted({'benchmark', 'board', 'run', 'writer'} "
+                "& sys.modules.keys()))",
+            ],
+            cwd=os.path.dirname(MAIN),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        self.assertEqual("[]\n", process.stdout)
+
+    def test_benchmark_startup(self):
+        """
+        test a headless oneliner is timed and only imports what solving it needs
+        """
+        result = benchmark_startup(runs=1)
+        modules = {row["module"] for row in result["imports"]}
+
+        self.assertEqual(1, result["runs"])
+        self.assertTrue(result["command"].startswith("main.py headless oneliner "))
+        self.assertGreater(result["p50"], 0)
+        self.assertIn("run", modules)
+        self.assertIn("solver", modules)
+        for module in ("cache", "sqlite3", "json", "tracemalloc", "metrics"):
+            self.assertNotIn(module, modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import copy
+import unittest
+
+from board import Board
+from solver import BitmaskSolver
+
+
+class TestBoard(unittest.TestCase):
+
+    puzzle = (
+        "300208700050096832080700006410000078020074500703185400002531004031640050009000610"
+    )
+
+    def test_size(self):
+        board = Board.from_oneliner(self.puzzle)
+
+        self.assertEqual(81, len(board.cells))
+        self.assertFalse(hasattr(board, "__dict__"))
+        with self.assertRaises(ValueError):
+            Board(bytes(80))
+
+    def test_round_trip(self):
+        board = Board.from_oneliner(self.puzzle)
+
+        self.assertEqual(self.puzzle, board.to_oneliner())
+        self.assertEqual(board, Board.from_lists(board.to_lists()))
+        self.assertEqual(board.to_lists(), board)
+        self.assertEqual(
+            Board.from_oneliner(self.puzzle.replace("0", ".")).cells, board.cells
+        )
+
+    def test_indexing(self):
+        board = Board.from_oneliner(self.puzzle)
+
+        self.assertEqual(3, board[0][0])
+        self.assertEqual(3, board.get(1, 7))
+        self.assertEqual([3, 0, 0, 4, 0, 7, 0, 0, 0], list(board.column(0)))
+        self.assertEqual([3, 0, 0, 0, 5, 0, 0, 8, 0], list(board.box(0)))
+        self.assertIn(7, board.row(0))
+
+        board[0][1] = 6
+        self.assertEqual(6, board.cells[1])
+        box = board.box(8)
+        box[8] = 9
+        self.assertEqual(9, board.get(8, 8))
+
+    def test_copy(self):
+        board = Board.from_oneliner(self.puzzle)
+        copied = copy.copy(board)
+
+        copied.set(0, 1, 6)
+
+        self.assertEqual(0, board.get(0, 1))
+        self.assertNotEqual(board, copied)
+
+    def test_16x16(self):
+        """
+        test a 256 cell oneliner is a 16x16 board, with letters for 10 and up
+        """
+        oneliner = (
+            "00B020CAF003007000000070B90800020020F001D000800B05D6B0402AC031E0284000F000D5060000E579"
+            "B000001G0CF00100037600A80006090A08C0F00000AB80GC020F0E0D000000040B021000530F0E60008B00"
+            "0200000030006D000BA860509B8000020C31009BA2G0003F0E6004A01F0C0060B009000F500090002400"
+        )
+        board = Board.from_oneliner(oneliner)
+
+        self.assertEqual(4, board.box_size)
+        self.assertEqual(16, len(board))
+        self.assertEqual(11, board[0][2])
+        self.assertEqual(16, len(board.box(15)))
+        self.assertEqual(oneliner, board.to_oneliner())
+        self.assertEqual(board, Board.from_lists(board.to_lists()))
+        self.assertEqual(256, len(Board(box_size=4).cells))
+        with self.assertRaises(ValueError):
+            Board(bytes(256), box_size=3)
+
+    def test_solve_in_place(self):
+        board = Board.from_oneliner(self.puzzle)
+        cells = board.cells
+
+        self.assertTrue(BitmaskSolver().solve(board))
+        self.assertIs(cells, board.cells)
+        self.assertNotIn(0, board.cells)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import pickle
+import unittest
+
+from board import Board
+from budget import (
+    Budget,
+    BudgetExceeded,
+    CancellationToken,
+    CANCELLED,
+    MAX_OPERATIONS,
+    TIMEOUT,
+    solve_within,
+)
+from run import Run, ENGINES
+
+# Needs a long search from the plain backtracking solver
+HARD = "000000010400000000020000000000050407008000300001090000300400200050100000000806000"
+EASY = "3.542.81.4879.15.6.29.5637485.793.416132.8957.74.6528.2413.9.655.867.192.965124.8"
+
+
+class TestBudget(unittest.TestCase):
+
+    def test_max_operations_every_engine(self):
+        """
+        test every engine stops at the operation ceiling, leaves the board as given
+        and can still solve afterwards
+        """
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                solver = ENGINES[engine]()
+                board = Board.from_oneliner(HARD)
+                # Blank the givens propagation would fill, so every engine has to search
+                board.cells[:9] = bytes(9)
+                given = board.copy()
+
+                result = solve_within(solver, board, Budget(max_operations=1))
+
+                self.assertIsInstance(result, BudgetExceeded)
+                self.assertFalse(result)
+                self.assertEqual(MAX_OPERATIONS, result.reason)
+                self.assertGreater(result.operation_count, 1)
+                self.assertEqual(given, board)
+                self.assertIsNone(solver.budget)
+
+                board = Board.from_oneliner(EASY)
+                self.assertEqual(True, solve_within(solver, board, None))
+
+    def test_timeout(self):
+        """
+        test a solve that runs too long is stopped with the operations it used
+        """
+        board = Board.from_oneliner(HARD)
+
+        result = solve_within(ENGINES["backtrack"](), board, Budget(timeout=0.05))
+
+        self.assertEqual(TIMEOUT, result.reason)
+        self.assertGreater(result.operation_count, 0)
+        self.assertEqual(Board.from_oneliner(HARD), board)
+
+    def test_cancelled(self):
+        """
+        test a cancelled token stops the solve, and a reset one doesn't
+        """
+        token = CancellationToken()
+        token.cancel()
+        board = [[0] * 9 for _ in range(9)]
+
+        result = solve_within(ENGINES["bitmask"](), board, Budget(token=token))
+
+        self.assertEqual(CANCELLED, result.reason)
+        self.assertEqual([[0] * 9 for _ in range(9)], board)
+
+        token.reset()
+        budget = Budget(token=token)
+        self.assertEqual(True, solve_within(ENGINES["bitmask"](), board, budget))
+
+    def test_within_budget(self):
+        """
+        test a budget that's big enough doesn't change the result, and counts from
+        the start of each solve
+        """
+        budget = Budget(timeout=60, max_operations=100000)
+        solver = ENGINES["dlx"]()
+        operations = []
+
+        for _ in range(3):
+            board = Board.from_oneliner(HARD)
+            self.assertEqual(True, solve_within(solver, board, budget))
+            self.assertNotIn(0, board.cells)
+            operations.append(budget.operations)
+
+        self.assertGreater(operations[0], 0)
+        self.assertEqual([operations[0]] * 3, operations)
+        self.assertEqual(sum(operations), budget.operation_count)
+
+    def test_pickle(self):
+        """
+        test a budget overrun survives the trip back from a worker process
+        """
+        result = pickle.loads(pickle.dumps(BudgetExceeded(TIMEOUT, 42)))
+
+        self.assertEqual(TIMEOUT, result.reason)
+        self.assertEqual(42, result.operation_count)
+        self.assertEqual("Budget exceeded [timeout] after [42] operations", str(result))
+
+    def test_process_batch(self):
+        """
+        test a puzzle over budget is reported and the rest of the batch carries on
+        """
+        run = Run("backtrack", budget=Budget(max_operations=10000))
+        results = list(run.process_batch([EASY, HARD, EASY]))
+
+        self.assertEqual(True, results[0][0])
+        self.assertIsInstance(results[1][0], BudgetExceeded)
+        self.assertEqual(Board.from_oneliner(HARD), results[1][1])
+        self.assertEqual(True, results[2][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
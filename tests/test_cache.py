@@ -0,0 +1,113 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import tempfile
+import unittest
+
+from budget import Budget, solve_within
+from cache import SolutionCache, CachedSolver, canonical_form
+from solver import BitmaskSolver
+
+
+class TestCache(unittest.TestCase):
+
+    board = [
+        [3, 0, 0, 2, 0, 8, 7, 0, 0],
+        [0, 5, 0, 0, 9, 6, 8, 3, 2],
+        [0, 8, 0, 7, 0, 0, 0, 0, 6],
+        [4, 1, 0, 0, 0, 0, 0, 7, 8],
+        [0, 2, 0, 0, 7, 4, 5, 0, 0],
+        [7, 0, 3, 1, 8, 5, 4, 0, 0],
+        [0, 0, 2, 5, 3, 1, 0, 0, 4],
+        [0, 3, 1, 6, 4, 0, 0, 5, 0],
+        [0, 0, 9, 0, 0, 0, 6, 1, 0],
+    ]
+
+    def transformed(self):
+        """
+        Same puzzle with the digits relabelled, the first two bands swapped and
+        then transposed
+        """
+        relabel = [0, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+        rows = [3, 4, 5, 0, 1, 2, 6, 7, 8]
+        board = [
+            [relabel[self.board[row][column]] for column in range(9)] for row in rows
+        ]
+        return [list(column) for column in zip(*board)]
+
+    def test_canonical_form_with_equivalent_puzzles(self):
+        """
+        test that a relabelled, reordered and transposed puzzle has the same form
+        """
+        self.assertEqual(
+            canonical_form(self.board)[0], canonical_form(self.transformed())[0]
+        )
+
+    def test_cached_solver_with_hit(self):
+        """
+        test that an equivalent puzzle is answered from the cache, mapped back
+        """
+        solver = CachedSolver(BitmaskSolver(), SolutionCache())
+        budget = Budget()
+        solve_within(solver, [row[:] for row in self.board], budget)
+
+        board = self.transformed()
+        expected = self.transformed()
+        BitmaskSolver().solve(expected)
+
+        self.assertEqual(True, solve_within(solver, board, budget))
+        self.assertEqual(expected, board)
+        self.assertEqual(0, budget.operations)
+        self.assertEqual(1, solver.cache.hits)
+
+    def test_cache_with_eviction(self):
+        """
+        test that the least recently used entry goes first
+        """
+        cache = SolutionCache(max_size=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+
+        self.assertEqual(None, cache.get("b"))
+        self.assertEqual("1", cache.get("a"))
+        self.assertEqual(
+            {"size": 2, "hits": 2, "misses": 1, "evictions": 1, "disk_hits": 0},
+            cache.stats(),
+        )
+
+    def test_cache_with_database(self):
+        """
+        test that entries survive in the SQLite file for a new cache
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            database = os.path.join(directory, "cache.db")
+
+            cache = SolutionCache(database=database)
+            cache.put("a", "1")
+            cache.close()
+
+            cache = SolutionCache(database=database)
+            self.assertEqual("1", cache.get("a"))
+            self.assertEqual(1, cache.disk_hits)
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+from board import Board
+from dlx import DlxSolver
+
+
+class TestDlxSolver(unittest.TestCase):
+
+    def test_solve_with_solvable_master(self):
+        """
+        test solve with an master level puzzle
+        """
+        board = [
+            [4, 3, 8, 0, 0, 0, 0, 0, 0],
+            [0, 0, 1, 0, 0, 0, 0, 0, 7],
+            [0, 0, 5, 0, 0, 0, 0, 2, 1],
+            [0, 0, 0, 8, 3, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 3, 0],
+            [5, 0, 0, 4, 0, 0, 0, 8, 0],
+            [0, 0, 0, 0, 0, 2, 6, 0, 9],
+            [0, 4, 0, 0, 0, 5, 0, 0, 0],
+            [6, 0, 0, 0, 1, 0, 0, 0, 0],
+        ]
+
+        expected = [
+            [4, 3, 8, 1, 2, 7, 5, 9, 6],
+            [2, 6, 1, 5, 9, 3, 8, 4, 7],
+            [9, 7, 5, 6, 8, 4, 3, 2, 1],
+            [7, 2, 4, 8, 3, 9, 1, 6, 5],
+            [8, 9, 6, 2, 5, 1, 7, 3, 4],
+            [5, 1, 3, 4, 7, 6, 9, 8, 2],
+            [1, 8, 7, 3, 4, 2, 6, 5, 9],
+            [3, 4, 9, 7, 6, 5, 2, 1, 8],
+            [6, 5, 2, 9, 1, 8, 4, 7, 3],
+        ]
+        self.assertEqual(True, DlxSolver().solve(board))
+        self.assertEqual(board, expected)
+
+    def test_solve_with_insolvable(self):
+        """
+        test solve that cannot be solved, clashing givens
+        """
+        board = [
+            [3, 3, 0, 8, 1, 8, 5, 9, 6],
+            [2, 6, 1, 5, 9, 3, 8, 4, 7],
+            [9, 7, 5, 6, 8, 4, 3, 2, 1],
+            [7, 2, 4, 8, 3, 9, 1, 6, 5],
+            [8, 9, 0, 2, 5, 1, 7, 3, 4],
+            [5, 1, 9, 4, 7, 6, 9, 8, 2],
+            [1, 8, 7, 3, 4, 2, 6, 5, 9],
+            [3, 4, 9, 7, 6, 5, 2, 1, 8],
+            [6, 5, 0, 9, 1, 8, 4, 7, 3],
+        ]
+
+        self.assertEqual(False, DlxSolver().solve(board))
+
+    def test_solve_reuses_matrix(self):
+        """
+        test that the links are put back after a solve, so the same solver can
+        go again
+        """
+        solver = DlxSolver()
+        links = (solver.left[:], solver.right[:], solver.up[:], solver.down[:])
+
+        board = [[0] * 9 for _ in range(9)]
+        self.assertEqual(True, solver.solve(board))
+        self.assertEqual(links, (solver.left, solver.right, solver.up, solver.down))
+
+        board = [[0] * 9 for _ in range(9)]
+        self.assertEqual(True, solver.solve(board))
+        self.assertEqual([1, 2, 3, 4, 5, 6, 7, 8, 9], board[0])
+
+    def test_solve_with_16x16(self):
+        """
+        test a 16x16 board rebuilds the matrix, and a 9x9 after it goes back
+        """
+        solver = DlxSolver()
+        puzzle = Board.from_oneliner(
+            "00B020CAF003007000000070B90800020020F001D000800B05D6B0402AC031E0284000F000D5060000E579"
+            "B000001G0CF00100037600A80006090A08C0F00000AB80GC020F0E0D000000040B021000530F0E60008B00"
+            "0200000030006D000BA860509B8000020C31009BA2G0003F0E6004A01F0C0060B009000F500090002400"
+        )
+        board = puzzle.copy()
+
+        self.assertEqual(True, solver.solve(board))
+        self.assertEqual(16, solver.board_size)
+        for row in range(16):
+            self.assertEqual(set(range(1, 17)), set(board.row(row)))
+            self.assertEqual(set(range(1, 17)), set(board.column(row)))
+            self.assertEqual(set(range(1, 17)), set(board.box(row)))
+        for given, value in zip(puzzle.cells, board.cells):
+            self.assertIn(given, (0, value))
+
+        board = [[0] * 9 for _ in range(9)]
+        self.assertEqual(True, solver.solve(board))
+        self.assertEqual([1, 2, 3, 4, 5, 6, 7, 8, 9], board[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import tempfile
+import unittest
+
+from board import Board
+from events import EventTrace, ASSIGN, UNASSIGN, BACKTRACK
+from run import Run, ENGINES
+
+# Needs a search, with plenty of backtracking
+PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+
+def replay(trace):
+    """Play a trace's events onto its base board"""
+    cells = bytearray(trace.base)
+    for event in trace.raw_events():
+        EventTrace.apply(cells, event)
+    return Board(cells)
+
+
+class TestEventTrace(unittest.TestCase):
+
+    def test_replay_every_engine(self):
+        """
+        test replaying the trace of a solve ends on the solution, whatever the
+        engine
+        """
+        for engine in ENGINES:
+            if engine == "backtrack":
+                continue
+
+            with self.subTest(engine=engine):
+                board = Board.from_oneliner(PUZZLE)
+                trace = EventTrace(board)
+
+                self.assertEqual(True, ENGINES[engine]().solve(board, trace))
+                self.assertEqual(Board.from_oneliner(PUZZLE), Board(trace.base))
+                self.assertEqual(board, replay(trace))
+
+    def test_events(self):
+        """
+        test the kinds of event are packed and unpacked with the right cell
+        """
+        board = Board.from_oneliner(PUZZLE)
+        trace = EventTrace(board)
+        ENGINES["bitmask"]().solve(board, trace)
+
+        kinds = {kind for kind, _, _, _ in trace.events()}
+        self.assertEqual({ASSIGN, UNASSIGN, BACKTRACK}, kinds)
+
+        for kind, row, column, value in trace.events():
+            if kind == ASSIGN:
+                self.assertIn(value, range(1, 10))
+            else:
+                self.assertEqual(0, value)
+            self.assertIn(row, range(9))
+            self.assertIn(column, range(9))
+
+    def test_unsolvable(self):
+        """
+        test replaying an unsolvable board ends back where it started
+        """
+        board = [[0] * 9 for _ in range(9)]
+        board[0] = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+        board[1][8] = 9
+        trace = EventTrace(board)
+
+        self.assertEqual(False, ENGINES["backtrack"]().solve(board, trace))
+        self.assertGreater(len(trace), 0)
+        self.assertEqual(Board.from_lists(board), replay(trace))
+
+    def test_wrap(self):
+        """
+        test a full buffer folds the oldest events into the base board and still
+        replays to the solution
+        """
+        board = Board.from_oneliner(PUZZLE)
+        trace = EventTrace(board, capacity=16)
+        ENGINES["bitmask"]().solve(board, trace)
+
+        self.assertEqual(16, len(trace))
+        self.assertEqual(trace.count - 16, trace.dropped)
+        self.assertEqual(board, replay(trace))
+
+    def test_save_and_load(self):
+        """
+        test a trace survives a round trip through a file
+        """
+        board = Board.from_oneliner(PUZZLE)
+        trace = EventTrace(board, capacity=100)
+        ENGINES["iterative"]().solve(board, trace)
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "trace.sdkt")
+            trace.save(file_name)
+            loaded = EventTrace.load(file_name)
+
+        self.assertEqual(trace.base, loaded.base)
+        self.assertEqual(list(trace.events()), list(loaded.events()))
+        self.assertEqual(trace.dropped, loaded.dropped)
+        self.assertEqual(board, replay(loaded))
+
+    def test_load_with_text_file(self):
+        """
+        test a file that isn't a trace is rejected
+        """
+        self.assertRaises(
+            RuntimeError, lambda: EventTrace.load("tests/test_file_read.txt")
+        )
+
+    def test_run_record_trace(self):
+        """
+        test `Run` keeps the trace of the last solve when asked
+        """
+        run = Run(record_trace=True)
+        result, board = run.process_oneliner(PUZZLE)
+
+        self.assertEqual(True, result)
+        self.assertEqual(board, replay(run.trace))
+        self.assertIsNone(Run().trace)
+
+
+if __name__ == "__main__":
+    unittest.main()
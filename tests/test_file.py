@@ -50,3 +50,10 @@ class TestFileUtils(unittest.TestCase):
         FileUtils.write_file(file_name, file_contents)
 
         self.assertEqual(file_contents, FileUtils().read_file(file_name))
+
+    def test_read_lines_with_valid_file(self):
+        """
+        test that when run with valid file, lines are yielded
+        """
+        file_name = "tests/test_file_read.txt"
+        self.assertEqual(["cheese"], list(FileUtils.read_lines(file_name)))
@@ -0,0 +1,89 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+from generator import Generator, generate_many
+from run import Run
+from solver import BitmaskSolver
+
+
+class TestGenerator(unittest.TestCase):
+
+    def test_generate_solution(self):
+        """
+        test a generated grid is full and valid
+        """
+        board = Generator(1).generate_solution()
+
+        self.assertNotIn(0, board.cells)
+        for index in range(9):
+            self.assertEqual(set(range(1, 10)), set(board.row(index)))
+            self.assertEqual(set(range(1, 10)), set(board.column(index)))
+            self.assertEqual(set(range(1, 10)), set(board.box(index)))
+
+    def test_generate_is_unique(self):
+        """
+        test the puzzle has one solution, which is the grid it came from, and is
+        blanked as asked
+        """
+        puzzle, solution = Generator(2).generate(0.6)
+        board = puzzle.copy()
+
+        self.assertEqual(1, BitmaskSolver().count_solutions(puzzle))
+        self.assertEqual(True, BitmaskSolver().solve(board))
+        self.assertEqual(solution, board)
+        self.assertEqual(round(81 * 0.6), puzzle.cells.count(0))
+
+    def test_generate_with_seed(self):
+        """
+        test the same seed makes the same puzzles, different seeds don't
+        """
+        self.assertEqual(Generator(3).generate(), Generator(3).generate())
+        self.assertNotEqual(Generator(3).generate(), Generator(4).generate())
+
+    def test_generate_with_16x16(self):
+        """
+        test a 16x16 puzzle can be made
+        """
+        puzzle, solution = Generator(5, box_size=4).generate(0.4)
+
+        self.assertEqual(16, len(puzzle))
+        self.assertEqual(1, BitmaskSolver().count_solutions(puzzle))
+
+    def test_generate_many(self):
+        """
+        test the puzzles are the same in process or across workers, and can be
+        solved as a batch
+        """
+        puzzles = list(generate_many(6, seed=7, chunk_size=4))
+
+        self.assertEqual(6, len(puzzles))
+        self.assertEqual(
+            puzzles, list(generate_many(6, seed=7, workers=2, chunk_size=4))
+        )
+
+        lines = [puzzle for puzzle, _ in puzzles]
+        for (result, board), (_, solution) in zip(
+            Run().process_batch(lines), puzzles
+        ):
+            self.assertEqual(True, result)
+            self.assertEqual(solution, Run.format_oneliner(board))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import unittest
+
+from board import Board
+from budget import Budget, solve_within
+from iterative import IterativeSolver, RUNNING, SOLVED, UNSOLVABLE
+
+
+class TestIterativeSolver(unittest.TestCase):
+
+    board = [
+        [3, 0, 0, 0, 9, 0, 0, 6, 0],
+        [7, 0, 0, 8, 0, 0, 1, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [9, 0, 0, 0, 7, 0, 8, 0, 0],
+        [0, 0, 0, 0, 5, 0, 4, 0, 0],
+        [5, 7, 0, 0, 6, 0, 0, 0, 1],
+        [1, 0, 0, 2, 0, 0, 3, 0, 0],
+        [0, 0, 3, 9, 0, 0, 0, 0, 4],
+        [0, 4, 5, 0, 0, 0, 0, 0, 0],
+    ]
+
+    expected = [
+        [3, 1, 8, 5, 9, 4, 2, 6, 7],
+        [7, 5, 6, 8, 2, 3, 1, 4, 9],
+        [4, 2, 9, 6, 1, 7, 5, 3, 8],
+        [9, 3, 1, 4, 7, 2, 8, 5, 6],
+        [6, 8, 2, 1, 5, 9, 4, 7, 3],
+        [5, 7, 4, 3, 6, 8, 9, 2, 1],
+        [1, 9, 7, 2, 4, 6, 3, 8, 5],
+        [2, 6, 3, 9, 8, 5, 7, 1, 4],
+        [8, 4, 5, 7, 3, 1, 6, 9, 2],
+    ]
+
+    def test_solve_with_solvable_hard(self):
+        """
+        test solve with an hard level puzzle, with and without propagation
+        """
+        for use_propagation in (True, False):
+            board = [row[:] for row in self.board]
+            solver = IterativeSolver(use_propagation=use_propagation)
+
+            self.assertEqual(True, solver.solve(board))
+            self.assertEqual(self.expected, board)
+
+    def test_solve_with_insolvable(self):
+        """
+        test that an unsolvable board is handed back how it was given
+        """
+        board = [[0] * 9 for _ in range(9)]
+        board[0] = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+        board[1][8] = 9
+        given = [row[:] for row in board]
+
+        self.assertEqual(False, IterativeSolver().solve(board))
+        self.assertEqual(given, board)
+
+    def test_solve_with_insolvable_after_propagation(self):
+        """
+        test the counters are put back on an unsolvable board where propagation
+        filled cells before the first guess, same as `BitmaskSolver`
+        """
+        # 17 clue puzzle with a wrong first given
+        board = Board.from_oneliner(
+            "500000010400000000020000000000050407008000300001090000300400200050100000"
+            "000806000"
+        )
+        given = board.copy()
+        solver = IterativeSolver()
+
+        self.assertEqual(False, solver.solve(board))
+        self.assertEqual(given, board)
+        self.assertEqual(0, solver.searched_count)
+        self.assertEqual(0, solver.propagated_count)
+
+    def test_step_with_limit(self):
+        """
+        test that step hands back after the limit while there is more to do
+        """
+        board = [row[:] for row in self.board]
+        solver = IterativeSolver(use_propagation=False)
+
+        self.assertEqual(RUNNING, solver.start(board))
+        self.assertEqual(RUNNING, solver.step(10))
+        self.assertEqual(SOLVED, solver.step())
+        self.assertEqual(self.expected, board)
+
+    def test_snapshot_and_restore(self):
+        """
+        test that a solve checkpointed through json and resumed on a new solver
+        ends the same as one run straight through
+        """
+        straight = Budget()
+        solve_within(IterativeSolver(), [row[:] for row in self.board], straight)
+
+        board = [row[:] for row in self.board]
+        budget = Budget()
+        solver = IterativeSolver()
+        solver.budget = budget
+        solver.start(board)
+
+        while solver.step(2) == RUNNING:
+            snapshot = json.loads(json.dumps(solver.snapshot()))
+            solver = IterativeSolver()
+            solver.budget = budget
+            board = solver.restore(snapshot)
+
+        self.assertEqual(SOLVED, solver.status)
+        self.assertEqual(self.expected, board)
+        self.assertEqual(straight.operations, budget.operations)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+from board import Board
+from metrics import Metrics, instrument
+from run import Run, ENGINES
+from cache import SolutionCache
+
+# Needs a search, with plenty of backtracking
+HARD = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+# Few enough guesses for the plain backtracking engine
+EASY = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_guesses_left_standing_fill_the_board(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                puzzle = EASY if engine == "backtrack" else HARD
+                run = Run(engine, metrics=True)
+                board = Board.from_oneliner(puzzle)
+
+                self.assertTrue(run.solve(board))
+
+                # Each empty cell ends up with a guess that stuck, or propagated
+                metrics = run.metrics
+                propagated = getattr(run.solver, "propagated_count", 0)
+                self.assertGreater(metrics.nodes, 0)
+                self.assertGreater(metrics.backtracks, 0)
+                self.assertEqual(
+                    puzzle.count("0"),
+                    metrics.guesses - metrics.backtracks + propagated,
+                )
+                self.assertEqual(metrics.nodes, sum(metrics.depth_histogram))
+                self.assertEqual(metrics.max_depth, len(metrics.depth_histogram) - 1)
+                self.assertEqual(1, metrics.depth_histogram[0])
+
+    def test_counts_by_engine(self):
+        run = Run("backtrack", metrics=True)
+        run.solve(Board.from_oneliner(EASY))
+
+        # Every guess is a node of its own, nothing is propagated
+        self.assertEqual(run.metrics.nodes, run.metrics.guesses)
+        self.assertEqual(0, run.metrics.propagations)
+        self.assertGreater(run.metrics.validations, run.metrics.guesses)
+
+        run = Run("dlx", metrics=True)
+        run.solve(Board.from_oneliner(HARD))
+        self.assertEqual(0, run.metrics.validations)
+
+        run = Run("bitmask", metrics=True)
+        run.solve(Board.from_oneliner(EASY))
+
+        # Propagation does the lot
+        self.assertEqual(0, run.metrics.nodes)
+        self.assertEqual(0, run.metrics.guesses)
+        self.assertEqual(EASY.count("0"), run.metrics.propagations)
+
+    def test_same_counts_iterative_and_recursive(self):
+        recursive = Run("bitmask", metrics=True)
+        iterative = Run("iterative", metrics=True)
+
+        recursive.solve(Board.from_oneliner(HARD))
+        iterative.solve(Board.from_oneliner(HARD))
+
+        self.assertEqual(recursive.metrics.as_dict(), iterative.metrics.as_dict())
+
+    def test_disabled_leaves_solver_alone(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                run = Run(engine)
+                self.assertIsNone(run.metrics)
+                for name in ("metrics", "solve", "search", "select_cell", "assign"):
+                    self.assertNotIn(name, vars(run.solver))
+
+    def test_instrument_cached_and_twice(self):
+        run = Run("bitmask", cache=SolutionCache(), metrics=True)
+        run.solve(Board.from_oneliner(HARD))
+        nodes = run.metrics.nodes
+
+        # The second time comes from the cache, nothing is searched
+        run.solve(Board.from_oneliner(HARD))
+        self.assertEqual(nodes, run.metrics.nodes)
+        self.assertIs(run.metrics, instrument(run.solver))
+
+    def test_add_and_json(self):
+        run = Run("bitmask", metrics=True)
+        run.solve(Board.from_oneliner(HARD))
+
+        total = Metrics()
+        total.add(run.metrics.as_dict())
+        total.add(run.metrics.as_dict())
+
+        self.assertEqual(2 * run.metrics.nodes, total.nodes)
+        self.assertEqual(run.metrics.max_depth, total.max_depth)
+        self.assertEqual(
+            [2 * count for count in run.metrics.depth_histogram],
+            total.depth_histogram,
+        )
+        self.assertIn('"backtracks": ', run.metrics.to_json())
+
+        total.reset()
+        self.assertEqual(Metrics().as_dict(), total.as_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
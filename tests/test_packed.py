@@ -0,0 +1,132 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import tempfile
+import unittest
+
+from packed import (
+    PackedReader,
+    PackedWriter,
+    RECORD_SIZE,
+    HEADER,
+    encode,
+    decode,
+    is_packed,
+    oneliners_to_packed,
+    packed_to_oneliners,
+    packed_to_csv,
+)
+
+
+class TestPacked(unittest.TestCase):
+
+    puzzles = [
+        "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+        "300208700050096832080700006410000078020074500703185400002531004031640050009000610",
+        "000406002800053190906008000670180009100000370008000500080040250000000004409000610",
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, "puzzles.sdkp")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_encode_and_decode(self):
+        """
+        test that a record is 41 bytes and decodes back to the same oneliner
+        """
+        record = encode(self.puzzles[0])
+
+        self.assertEqual(RECORD_SIZE, len(record))
+        self.assertEqual(self.puzzles[0], decode(record))
+
+    def test_oneliners_to_packed_and_back(self):
+        """
+        test that oneliners round trip through a packed file, in either format
+        """
+        lines = [self.puzzles[0], "", ",".join(self.puzzles[1]), self.puzzles[2]]
+        self.assertEqual(3, oneliners_to_packed(lines, self.file_name))
+
+        self.assertEqual(True, is_packed(self.file_name))
+        self.assertEqual(
+            HEADER.size + 3 * RECORD_SIZE, os.path.getsize(self.file_name)
+        )
+        self.assertEqual(self.puzzles, list(packed_to_oneliners(self.file_name)))
+
+    def test_oneliners_to_packed_with_invalid(self):
+        """
+        test that a line that isn't a puzzle is rejected
+        """
+        self.assertRaisesRegex(
+            RuntimeError,
+            "Not a valid oneliner \\[cheese\\]",
+            lambda: oneliners_to_packed(["cheese"], self.file_name),
+        )
+
+    def test_reader_random_access(self):
+        """
+        test that records can be picked out by index and sliced
+        """
+        with PackedWriter(self.file_name) as writer:
+            for puzzle in self.puzzles:
+                writer.write_oneliner(puzzle)
+
+        with PackedReader(self.file_name) as reader:
+            self.assertEqual(3, len(reader))
+            self.assertEqual(self.puzzles[2], reader.oneliner(-1))
+            self.assertEqual([3, 0, 0, 2, 0, 8, 7, 0, 0], reader[1][0])
+            self.assertEqual(2 * RECORD_SIZE, len(reader.records(1)))
+            self.assertEqual(self.puzzles[1:2], list(reader.oneliners(1, 2)))
+            self.assertRaises(IndexError, lambda: reader.record(3))
+
+        self.assertEqual(
+            "0,0,0,4,0,6,0,0,2\n", packed_to_csv(self.file_name, 2)[0]
+        )
+
+    def test_reader_close_with_records_out(self):
+        """
+        test that closing with records or a part run generator still about works,
+        and the records can still be read
+        """
+        oneliners_to_packed(self.puzzles, self.file_name)
+
+        with PackedReader(self.file_name) as reader:
+            record = reader.record(0)
+
+        self.assertEqual(self.puzzles[0], decode(record))
+
+        reader = PackedReader(self.file_name)
+        oneliners = reader.oneliners()
+        self.assertEqual(self.puzzles[0], next(oneliners))
+        reader.close()
+        self.assertEqual(self.puzzles[1], next(oneliners))
+
+    def test_reader_with_text_file(self):
+        """
+        test that a file that isn't packed is rejected
+        """
+        self.assertEqual(False, is_packed("tests/test_file_read.txt"))
+        self.assertRaises(
+            RuntimeError, lambda: PackedReader("tests/test_file_read.txt")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+from parallel import ParallelRunner, solve_many
+
+
+class TestParallel(unittest.TestCase):
+
+    puzzles = [
+        "3..2.87...5..96832.8.7....641.....78.2..745..7.31854....2531..4.3164..5...9...61.",
+        "cheese",
+        "0,0,0,4,0,6,0,0,2,8,0,0,0,5,3,1,9,0,9,0,6,0,0,8,0,0,0,6,7,0,1,8,0,0,0,9,1,0,0,0,0,0,3,7,0,0,0,8,0,0,0,5,0,0,0,8,0,0,4,0,2,5,0,0,0,0,0,0,0,0,0,4,4,0,9,0,0,0,6,1,0",
+    ] * 5
+
+    def test_solve_many_ordered(self):
+        """
+        test that results come back in input order with the right solutions
+        """
+        results = list(solve_many(self.puzzles, workers=2))
+
+        self.assertEqual(list(range(15)), [index for index, _, _ in results])
+        self.assertEqual(
+            (True, "396218745157496832284753196415962378928374561763185429672531984831649257549827613"),
+            results[0][1:],
+        )
+        self.assertEqual((None, None), results[1][1:])
+        self.assertEqual(
+            (True, "517496832824753196936218745673185429145962378298374561381649257762531984459827613"),
+            results[2][1:],
+        )
+
+    def test_solve_many_unordered(self):
+        """
+        test that as-completed results are the same set as ordered ones
+        """
+        ordered = list(solve_many(self.puzzles, workers=2))
+        unordered = list(solve_many(self.puzzles, workers=2, ordered=False))
+
+        self.assertEqual(ordered, sorted(unordered))
+
+    def test_adapt_chunk_size(self):
+        """
+        test that fast puzzles grow the chunk size and slow ones shrink it
+        """
+        runner = ParallelRunner(workers=1, chunk_size=16, target_chunk_seconds=0.05)
+
+        runner.adapt_chunk_size(0.001, 16)
+        self.assertGreater(runner.chunk_size, 16)
+
+        runner = ParallelRunner(workers=1, chunk_size=16, target_chunk_seconds=0.05)
+
+        runner.adapt_chunk_size(10, 16)
+        self.assertLess(runner.chunk_size, 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
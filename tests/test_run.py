@@ -15,9 +15,14 @@
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+import os
+import tempfile
 import unittest
 
-from run import Run
+from budget import Budget
+from options import ENGINE_NAMES, DEFAULT_ENGINE
+from run import Run, ENGINES, INVALID
+from validate import InvalidPuzzle
 
 
 class TestRun(unittest.TestCase):
@@ -61,3 +66,185 @@ class TestRun(unittest.TestCase):
             "Your oneliner input is not valid, a row doesn't have 9 digits!",
             lambda: Run().process_oneliner(oneliner),
         )
+
+    def test_process_oneliner_with_engines(self):
+        """
+        test that every engine gives the same board back
+        """
+        oneliner = "0,0,0,4,0,6,0,0,2,8,0,0,0,5,3,1,9,0,9,0,6,0,0,8,0,0,0,6,7,0,1,8,0,0,0,9,1,0,0,0,0,0,3,7,0,0,0,8,0,0,0,5,0,0,0,8,0,0,4,0,2,5,0,0,0,0,0,0,0,0,0,4,4,0,9,0,0,0,6,1,0"
+        run = Run()
+        expected = run.process_oneliner(oneliner, "backtrack")
+
+        for engine in ENGINES:
+            self.assertEqual(expected, run.process_oneliner(oneliner, engine))
+            self.assertEqual(engine, run.engine)
+
+    def test_init_with_unknown_engine(self):
+        """
+        test that an engine that doesn't exist is rejected
+        """
+        self.assertRaisesRegex(
+            ValueError, "Unknown engine \\[cheese\\]", lambda: Run("cheese")
+        )
+
+    def test_engine_names(self):
+        """
+        test the command line offers exactly the engines there are
+        """
+        self.assertEqual(ENGINE_NAMES, tuple(ENGINES))
+        self.assertIn(DEFAULT_ENGINE, ENGINES)
+
+    def test_parse_oneliner_with_squished_string(self):
+        """
+        test that 81 digits with no commas, and dots for unknowns, parse the same
+        """
+        commas = "3,0,0,2,0,8,7,0,0,0,5,0,0,9,6,8,3,2,0,8,0,7,0,0,0,0,6,4,1,0,0,0,0,0,7,8,0,2,0,0,7,4,5,0,0,7,0,3,1,8,5,4,0,0,0,0,2,5,3,1,0,0,4,0,3,1,6,4,0,0,5,0,0,0,9,0,0,0,6,1,0"
+        squished = "3..2.87...5..96832.8.7....641.....78.2..745..7.31854....2531..4.3164..5...9...61."
+        self.assertEqual(Run.parse_oneliner(commas), Run.parse_oneliner(squished))
+
+    def test_parse_oneliner_with_16x16(self):
+        """
+        test that 256 cells is a 16x16, squished with letters or comma seperated
+        with numbers
+        """
+        squished = (
+            "00B020CAF003007000000070B90800020020F001D000800B05D6B0402AC031E0284000F000D5060000E579"
+            "B000001G0CF00100037600A80006090A08C0F00000AB80GC020F0E0D000000040B021000530F0E60008B00"
+            "0200000030006D000BA860509B8000020C31009BA2G0003F0E6004A01F0C0060B009000F500090002400"
+        )
+        commas = ",".join(str(int(value, 17)) for value in squished)
+
+        board = Run.parse_oneliner(squished)
+
+        self.assertEqual(16, len(board))
+        self.assertEqual(board, Run.parse_oneliner(commas))
+        self.assertEqual(squished, Run.format_oneliner(board))
+        self.assertEqual(squished, Run.format_oneliner(board.to_lists()))
+
+    def test_parse_oneliner_with_invalid_16x16(self):
+        """
+        test that a 16x16 short of cells, or with a value over 16, isn't valid
+        """
+        self.assertRaisesRegex(
+            RuntimeError,
+            "you don't have 16 rows!",
+            lambda: Run.parse_oneliner("0" * 200),
+        )
+        self.assertRaisesRegex(
+            RuntimeError,
+            "a row doesn't have 16 digits!",
+            lambda: Run.parse_oneliner("0" * 250),
+        )
+        self.assertRaisesRegex(
+            ValueError,
+            "has values bigger than 16",
+            lambda: Run.parse_oneliner("17" + ",0" * 255),
+        )
+        self.assertRaisesRegex(
+            ValueError, "has values bigger than 9", lambda: Run.parse_oneliner("A" * 81)
+        )
+
+    def test_process_oneliner_with_16x16(self):
+        """
+        test each engine that fills in singles solves a 16x16 oneliner
+        """
+        for engine in ("bitmask", "dlx", "iterative"):
+            result, board = Run(engine).process_oneliner(
+                "00B020CAF003007000000070B90800020020F001D000800B05D6B0402AC031E0284000F000D5060000E579"
+                "B000001G0CF00100037600A80006090A08C0F00000AB80GC020F0E0D000000040B021000530F0E60008B00"
+                "0200000030006D000BA860509B8000020C31009BA2G0003F0E6004A01F0C0060B009000F500090002400"
+            )
+
+            self.assertEqual(True, result)
+            self.assertNotIn(0, board.cells)
+
+    def test_process_batch_with_mixed_lines(self):
+        """
+        test that a batch solves each line, skips blanks and flags invalid lines
+        without stopping
+        """
+        lines = [
+            "3..2.87...5..96832.8.7....641.....78.2..745..7.31854....2531..4.3164..5...9...61.\n",
+            "\n",
+            "3,0,0,2\n",
+            "11...............................................................................\n",
+        ]
+        results = list(Run().process_batch(lines))
+
+        self.assertEqual(3, len(results))
+        self.assertEqual(True, results[0][0])
+        self.assertEqual(
+            "396218745157496832284753196415962378928374561763185429672531984831649257549827613",
+            Run.format_oneliner(results[0][1]),
+        )
+        self.assertEqual((None, None), results[1])
+        # Duplicate givens, still falsy but reported as invalid rather than searched
+        self.assertEqual(False, bool(results[2][0]))
+        self.assertEqual(INVALID, Run.status(results[2][0]))
+
+    def test_parse_file(self):
+        """
+        test a puzzle file reads into a board, blank lines don't count as rows
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "puzzle.txt")
+            with open(file_name, "w") as file:
+                file.write("\n".join(",".join("0" * 8 + "9") for _ in range(9)))
+                file.write("\n\n")
+
+            board = Run.parse_file(file_name)
+
+        self.assertEqual(9, len(board))
+        self.assertEqual([0] * 8 + [9], board.to_lists()[8])
+
+    def test_parse_file_with_invalid_files(self):
+        """
+        test ragged rows, out of range values, things that aren't numbers and the
+        wrong number of rows are all invalid rather than some other error
+        """
+        row = ",".join("0" * 9)
+        files = {
+            "ragged": [row] * 8 + ["0,0,0"],
+            "too big": [row] * 8 + [row[:-1] + "10"],
+            "negative": ["-1" + row[1:]] + [row] * 8,
+            "not numbers": [row] * 8 + [row[:-1] + "x"],
+            "rows": [row] * 8,
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "puzzle.txt")
+            for name, lines in files.items():
+                with open(file_name, "w") as file:
+                    file.write("\n".join(lines))
+
+                with self.subTest(name):
+                    self.assertRaises(InvalidPuzzle, Run.parse_file, file_name)
+
+        self.assertRaises(InvalidPuzzle, Run.parse_file, "tests/test_file_input.txt")
+
+    def test_solve_with_conflicting_givens(self):
+        """
+        test clashing givens come back invalid with the cells, straight away even
+        for the plain backtracking engine
+        """
+        puzzle = (
+            "800000000003600000070090200050007000000045700000100030001000068008500010"
+            "090000480"
+        )
+
+        for engine in ENGINES:
+            with self.subTest(engine):
+                run = Run(engine, budget=Budget())
+                board = Run.parse_oneliner(puzzle)
+                result = run.solve(board)
+
+                self.assertIsInstance(result, InvalidPuzzle)
+                self.assertEqual(INVALID, Run.status(result))
+                self.assertEqual(["r7c9", "r9c8"], result.conflicts[0]["cells"])
+                self.assertEqual(puzzle, Run.format_oneliner(board))
+                if engine == "backtrack":
+                    self.assertEqual(0, run.budget.operation_count)
+
+        report = Run().report_oneliner(puzzle)
+        self.assertEqual(INVALID, report["status"])
+        self.assertEqual("duplicate", report["conflicts"][0]["reason"])
@@ -0,0 +1,218 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import threading
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+
+from server import SolveServer
+
+EASY = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+EASY_SOLUTION = (
+    "483921657967345821251876493548132976729564138136798245372689514814253769"
+    "695417382"
+)
+
+# Needs a search, plain backtracking takes seconds over it
+HARD = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+
+def crash(timeout):
+    """Kill the worker it's run on, as a crash would"""
+    os._exit(1)
+
+
+class TestSolveServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.loop = asyncio.new_event_loop()
+        cls.server = SolveServer(port=0, workers=1, queue_size=8, max_batch=3)
+        cls.loop.run_until_complete(cls.server.start())
+
+        cls.thread = threading.Thread(target=cls.loop.run_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run_coroutine_threadsafe(cls.server.close(), cls.loop).result()
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join()
+        cls.loop.close()
+
+    def setUp(self):
+        self.connection = http.client.HTTPConnection("127.0.0.1", self.server.port)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def request(self, method, path, body=None):
+        """Send a request on the kept alive connection, (status, headers, JSON)"""
+        if body is not None and not isinstance(body, str):
+            body = json.dumps(body)
+
+        self.connection.request(method, path, body)
+        response = self.connection.getresponse()
+        return response.status, response.headers, json.loads(response.read())
+
+    def test_solve(self):
+        """
+        test solving over a kept alive connection, and a puzzle that isn't valid
+        """
+        for _ in range(3):
+            status, _, response = self.request("POST", "/solve", {"puzzle": EASY})
+
+            self.assertEqual(200, status)
+            self.assertEqual("solved", response["status"])
+            self.assertEqual(EASY_SOLUTION, response["solution"])
+            # Filled in by propagation alone, there's no node to count
+            self.assertEqual(0, response["operations"])
+
+        status, _, response = self.request("POST", "/solve", {"puzzle": "12"})
+        self.assertEqual(200, status)
+        self.assertEqual("invalid", response["status"])
+
+    def test_solve_with_budget(self):
+        """
+        test a request's own timeout stops the worker, and the engine it picks
+        """
+        status, _, response = self.request(
+            "POST", "/solve", {"puzzle": HARD, "engine": "backtrack", "timeout": 0.2}
+        )
+
+        self.assertEqual(200, status)
+        self.assertEqual("budget_exceeded", response["status"])
+        self.assertEqual("timeout", response["reason"])
+        self.assertIsNone(response["solution"])
+
+    def test_batch(self):
+        """
+        test a batch comes back in order, and a too big one is turned away
+        """
+        status, _, response = self.request(
+            "POST", "/batch", {"puzzles": [EASY, "x", HARD], "engine": "dlx"}
+        )
+
+        self.assertEqual(200, status)
+        self.assertEqual(
+            ["solved", "invalid", "solved"],
+            [result["status"] for result in response["results"]],
+        )
+
+        status, _, _ = self.request("POST", "/batch", {"puzzles": [EASY] * 4})
+        self.assertEqual(413, status)
+
+    def test_validate(self):
+        """
+        test a unique puzzle is valid, and one with lots of solutions isn't
+        """
+        _, _, response = self.request("POST", "/validate", {"puzzle": EASY})
+        self.assertEqual(("valid", 1), (response["status"], response["solutions"]))
+
+        _, _, response = self.request("POST", "/validate", {"puzzle": "0" * 81})
+        self.assertEqual(("invalid", 2), (response["status"], response["solutions"]))
+
+        _, _, response = self.request("POST", "/validate", {"puzzle": "11" + "0" * 79})
+        self.assertEqual(("invalid", 0), (response["status"], response["solutions"]))
+        self.assertEqual(
+            ["r1c1", "r1c2"], response["conflicts"][0]["cells"]
+        )
+
+    def test_bad_requests(self):
+        """
+        test the error statuses
+        """
+        self.assertEqual(404, self.request("POST", "/cheese", {})[0])
+        self.assertEqual(405, self.request("GET", "/solve")[0])
+        self.assertEqual(400, self.request("POST", "/solve", "{not json")[0])
+        self.assertEqual(400, self.request("POST", "/solve", {"puzzle": 12})[0])
+        self.assertEqual(
+            400, self.request("POST", "/solve", {"puzzle": EASY, "engine": "x"})[0]
+        )
+        self.assertEqual(
+            400, self.request("POST", "/solve", {"puzzle": EASY, "timeout": -1})[0]
+        )
+        for engine in ([], {}):
+            body = {"puzzle": EASY, "engine": engine}
+            self.assertEqual(400, self.request("POST", "/solve", body)[0])
+
+    def test_internal_error(self):
+        """
+        test a handler that goes wrong still gets a response, and is counted
+        """
+        self.server.handle_health = lambda: 1 / 0
+        try:
+            status, _, response = self.request("GET", "/health")
+        finally:
+            del self.server.handle_health
+
+        self.assertEqual(500, status)
+        self.assertEqual("Internal error [ZeroDivisionError]", response["error"])
+
+        _, _, response = self.request("GET", "/metrics")
+        self.assertGreaterEqual(response["responses"]["500"], 1)
+        self.assertGreaterEqual(response["outcomes"]["error"], 1)
+
+    def test_crashed_worker(self):
+        """
+        test a worker dying is a 500, and the pool is replaced for the next request
+        """
+        crashing = self.server.submit(5, crash)
+        future = asyncio.run_coroutine_threadsafe(crashing, self.loop)
+        with self.assertRaises(BrokenProcessPool):
+            future.result()
+
+        status, _, response = self.request("POST", "/solve", {"puzzle": EASY})
+        self.assertEqual(200, status)
+        self.assertEqual("solved", response["status"])
+
+    def test_backpressure(self):
+        """
+        test requests are turned away with a 503 once the queue is full
+        """
+        self.server.queue_size = 0
+        try:
+            status, headers, _ = self.request("POST", "/solve", {"puzzle": EASY})
+        finally:
+            self.server.queue_size = 8
+
+        self.assertEqual(503, status)
+        self.assertEqual("1", headers["Retry-After"])
+
+    def test_health_and_metrics(self):
+        """
+        test health, and that metrics count the requests
+        """
+        status, _, response = self.request("GET", "/health")
+        self.assertEqual(200, status)
+        self.assertEqual(("ok", 1), (response["status"], response["workers"]))
+
+        self.request("POST", "/solve", {"puzzle": EASY})
+        status, _, response = self.request("GET", "/metrics")
+
+        self.assertEqual(200, status)
+        self.assertGreaterEqual(response["requests"]["/solve"], 1)
+        self.assertGreaterEqual(response["outcomes"]["solved"], 1)
+        self.assertGreater(response["latency"]["count"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
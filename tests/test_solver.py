@@ -17,7 +17,9 @@
 
 import unittest
 
-from solver import Solver
+from board import Board
+from run import Run
+from solver import Solver, BitmaskSolver
 
 
 class TestSolver(unittest.TestCase):
@@ -94,6 +96,32 @@ class TestSolver(unittest.TestCase):
 
         self.assertEqual(False, Solver().check_guess_is_valid(board, 0, 3, 9))
 
+    def test_check_guess_is_valid_with_16x16(self):
+        """
+        test the box check uses 4x4 boxes on a 16x16 board
+        """
+        board = [[0] * 16 for _ in range(16)]
+        board[0][12] = 16
+
+        self.assertEqual(False, Solver().check_guess_is_valid(board, 3, 15, 16))
+        self.assertEqual(True, Solver().check_guess_is_valid(board, 4, 15, 16))
+        self.assertEqual(True, Solver().check_guess_is_valid(board, 3, 11, 16))
+
+    def test_solve_with_16x16_nearly_solved(self):
+        """
+        test solve fills in the last few cells of a 16x16 board
+        """
+        solution = [
+            [(4 * (row % 4) + row // 4 + column) % 16 + 1 for column in range(16)]
+            for row in range(16)
+        ]
+        board = [row[:] for row in solution]
+        for cell in (0, 17, 100, 255):
+            board[cell // 16][cell % 16] = 0
+
+        self.assertEqual(True, Solver().solve(board))
+        self.assertEqual(solution, board)
+
     def test_solve_with_insolvable(self):
         """
         test solve that cannot be solved
@@ -263,5 +291,351 @@ class TestSolver(unittest.TestCase):
         self.assertEqual(board, expected)
 
 
+class TestBitmaskSolver(unittest.TestCase):
+
+    def test_load_masks_with_duplicate_givens(self):
+        """
+        test that when the givens repeat a digit in a row, masks are rejected
+        """
+        board = [[0] * 9 for _ in range(9)]
+        board[0][0] = 5
+        board[0][8] = 5
+
+        self.assertEqual(False, BitmaskSolver().load_masks(board))
+
+    def test_get_candidates(self):
+        """
+        test that the candidates exclude the row, column and box digits
+        """
+        board = [[0] * 9 for _ in range(9)]
+        board[0][8] = 1
+        board[8][0] = 2
+        board[1][1] = 3
+
+        solver = BitmaskSolver()
+        solver.load_masks(board)
+
+        candidates = solver.get_candidates(0, 0)
+        self.assertEqual(
+            [4, 5, 6, 7, 8, 9], [n for n in range(1, 10) if candidates & (1 << n)]
+        )
+
+    def test_select_cell_with_mrv(self):
+        """
+        test that the cell with the fewest candidates is picked, not the first empty
+        """
+        board = [
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [1, 2, 3, 4, 0, 6, 7, 8, 9],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        ]
+
+        solver = BitmaskSolver()
+        solver.load_masks(board)
+
+        self.assertEqual((4 * 9 + 4, 1 << 5), solver.select_cell())
+
+    def test_select_cell_with_first(self):
+        """
+        test that `first` keeps the reading order of `Solver`
+        """
+        board = [
+            [4, 3, 8, 1, 2, 7, 5, 9, 0],
+            [2, 6, 1, 5, 9, 3, 8, 4, 7],
+            [9, 7, 5, 6, 8, 4, 3, 2, 1],
+            [7, 2, 4, 8, 3, 9, 1, 6, 5],
+            [8, 9, 6, 0, 5, 1, 7, 3, 4],
+            [5, 1, 3, 4, 7, 6, 9, 8, 2],
+            [1, 0, 7, 3, 4, 2, 6, 5, 9],
+            [3, 4, 9, 7, 6, 5, 2, 1, 8],
+            [6, 5, 2, 9, 1, 8, 4, 7, 3],
+        ]
+
+        solver = BitmaskSolver(cell_selection="first")
+        solver.load_masks(board)
+
+        self.assertEqual(8, solver.select_cell()[0])
+
+    def test_init_with_unknown_strategy(self):
+        """
+        test that an unknown selection or ordering is rejected
+        """
+        self.assertRaises(ValueError, lambda: BitmaskSolver(cell_selection="random"))
+        self.assertRaises(ValueError, lambda: BitmaskSolver(value_ordering="random"))
+
+    def test_solve_with_least_constraining_value(self):
+        """
+        test solve with the lcv ordering gets the same answer
+        """
+        board = [
+            [4, 3, 8, 0, 0, 0, 0, 0, 0],
+            [0, 0, 1, 0, 0, 0, 0, 0, 7],
+            [0, 0, 5, 0, 0, 0, 0, 2, 1],
+            [0, 0, 0, 8, 3, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 3, 0],
+            [5, 0, 0, 4, 0, 0, 0, 8, 0],
+            [0, 0, 0, 0, 0, 2, 6, 0, 9],
+            [0, 4, 0, 0, 0, 5, 0, 0, 0],
+            [6, 0, 0, 0, 1, 0, 0, 0, 0],
+        ]
+
+        expected = [
+            [4, 3, 8, 1, 2, 7, 5, 9, 6],
+            [2, 6, 1, 5, 9, 3, 8, 4, 7],
+            [9, 7, 5, 6, 8, 4, 3, 2, 1],
+            [7, 2, 4, 8, 3, 9, 1, 6, 5],
+            [8, 9, 6, 2, 5, 1, 7, 3, 4],
+            [5, 1, 3, 4, 7, 6, 9, 8, 2],
+            [1, 8, 7, 3, 4, 2, 6, 5, 9],
+            [3, 4, 9, 7, 6, 5, 2, 1, 8],
+            [6, 5, 2, 9, 1, 8, 4, 7, 3],
+        ]
+        self.assertEqual(True, BitmaskSolver(value_ordering="lcv").solve(board))
+        self.assertEqual(board, expected)
+
+    def test_solve_with_insolvable(self):
+        """
+        test solve that cannot be solved
+        """
+        board = [
+            [3, 3, 0, 8, 1, 8, 5, 9, 6],
+            [2, 6, 1, 5, 9, 3, 8, 4, 7],
+            [9, 7, 5, 6, 8, 4, 3, 2, 1],
+            [7, 2, 4, 8, 3, 9, 1, 6, 5],
+            [8, 9, 0, 2, 5, 1, 7, 3, 4],
+            [5, 1, 9, 4, 7, 6, 9, 8, 2],
+            [1, 8, 7, 3, 4, 2, 6, 5, 9],
+            [3, 4, 9, 7, 6, 5, 2, 1, 8],
+            [6, 5, 0, 9, 1, 8, 4, 7, 3],
+        ]
+
+        self.assertEqual(False, BitmaskSolver().solve(board))
+
+    def test_solve_by_propagation_with_easy(self):
+        """
+        test that an easy puzzle is finished by singles alone, no guesses
+        """
+        board = [
+            [3, 0, 0, 2, 0, 8, 7, 0, 0],
+            [0, 5, 0, 0, 9, 6, 8, 3, 2],
+            [0, 8, 0, 7, 0, 0, 0, 0, 6],
+            [4, 1, 0, 0, 0, 0, 0, 7, 8],
+            [0, 2, 0, 0, 7, 4, 5, 0, 0],
+            [7, 0, 3, 1, 8, 5, 4, 0, 0],
+            [0, 0, 2, 5, 3, 1, 0, 0, 4],
+            [0, 3, 1, 6, 4, 0, 0, 5, 0],
+            [0, 0, 9, 0, 0, 0, 6, 1, 0],
+        ]
+
+        solver = BitmaskSolver()
+        self.assertEqual(True, solver.solve_by_propagation(board))
+        self.assertEqual(41, solver.propagated_count)
+        self.assertEqual(0, solver.searched_count)
+        self.assertEqual([3, 9, 6, 2, 1, 8, 7, 4, 5], board[0])
+
+    def test_solve_with_propagation_and_search(self):
+        """
+        test that a hard puzzle mixes propagation and search, and the two counts
+        add up to the cells that were empty
+        """
+        board = [
+            [3, 0, 0, 0, 9, 0, 0, 6, 0],
+            [7, 0, 0, 8, 0, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [9, 0, 0, 0, 7, 0, 8, 0, 0],
+            [0, 0, 0, 0, 5, 0, 4, 0, 0],
+            [5, 7, 0, 0, 6, 0, 0, 0, 1],
+            [1, 0, 0, 2, 0, 0, 3, 0, 0],
+            [0, 0, 3, 9, 0, 0, 0, 0, 4],
+            [0, 4, 5, 0, 0, 0, 0, 0, 0],
+        ]
+        empties = sum(row.count(0) for row in board)
+
+        solver = BitmaskSolver()
+        self.assertEqual(True, solver.solve(board))
+        self.assertEqual(False, solver.solved_by_propagation)
+        self.assertGreater(solver.searched_count, 0)
+        self.assertEqual(empties, solver.propagated_count + solver.searched_count)
+        self.assertEqual([3, 1, 8, 5, 9, 4, 2, 6, 7], board[0])
+
+    def test_solve_with_insolvable_after_propagation(self):
+        """
+        test that a board propagation makes progress on but can't be solved is
+        handed back how it was given
+        """
+        board = [
+            [8, 0, 2, 0, 0, 0, 6, 4, 0],
+            [0, 4, 3, 0, 8, 0, 0, 0, 5],
+            [0, 0, 0, 0, 0, 0, 2, 8, 0],
+            [0, 5, 7, 0, 3, 0, 8, 9, 6],
+            [3, 0, 0, 8, 0, 0, 0, 0, 1],
+            [0, 0, 0, 0, 0, 9, 0, 3, 0],
+            [5, 0, 1, 9, 0, 0, 0, 0, 8],
+            [4, 0, 8, 5, 2, 0, 0, 0, 0],
+            [7, 9, 0, 0, 0, 8, 0, 0, 0],
+        ]
+        given = [row[:] for row in board]
+
+        self.assertEqual(False, BitmaskSolver().solve(board))
+        self.assertEqual(given, board)
+
+    def test_solve_with_solvable_hard(self):
+        """
+        test solve with an hard level puzzle, same result as `Solver`
+        """
+        board = [
+            [3, 0, 0, 0, 9, 0, 0, 6, 0],
+            [7, 0, 0, 8, 0, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [9, 0, 0, 0, 7, 0, 8, 0, 0],
+            [0, 0, 0, 0, 5, 0, 4, 0, 0],
+            [5, 7, 0, 0, 6, 0, 0, 0, 1],
+            [1, 0, 0, 2, 0, 0, 3, 0, 0],
+            [0, 0, 3, 9, 0, 0, 0, 0, 4],
+            [0, 4, 5, 0, 0, 0, 0, 0, 0],
+        ]
+
+        expected = [
+            [3, 1, 8, 5, 9, 4, 2, 6, 7],
+            [7, 5, 6, 8, 2, 3, 1, 4, 9],
+            [4, 2, 9, 6, 1, 7, 5, 3, 8],
+            [9, 3, 1, 4, 7, 2, 8, 5, 6],
+            [6, 8, 2, 1, 5, 9, 4, 7, 3],
+            [5, 7, 4, 3, 6, 8, 9, 2, 1],
+            [1, 9, 7, 2, 4, 6, 3, 8, 5],
+            [2, 6, 3, 9, 8, 5, 7, 1, 4],
+            [8, 4, 5, 7, 3, 1, 6, 9, 2],
+        ]
+        self.assertEqual(True, BitmaskSolver().solve(board))
+        self.assertEqual(board, expected)
+
+    def assert_solution(self, puzzle, board):
+        """
+        every row, column and box has every digit, and the givens are kept
+        """
+        digits = set(range(1, board.size + 1))
+        for index in range(board.size):
+            self.assertEqual(digits, set(board.row(index)))
+            self.assertEqual(digits, set(board.column(index)))
+            self.assertEqual(digits, set(board.box(index)))
+
+        for given, value in zip(puzzle.cells, board.cells):
+            self.assertIn(given, (0, value))
+
+    def test_count_solutions(self):
+        """
+        test counting stops at the limit and leaves the board as given
+        """
+        board = Board.from_oneliner(
+            "3..2.87...5..96832.8.7....641.....78.2..745..7.31854....2531..4.3164..5...9...61."
+        )
+        given = board.copy()
+        solver = BitmaskSolver()
+
+        self.assertEqual(1, solver.count_solutions(board))
+        self.assertEqual(given, board)
+
+        self.assertEqual(2, solver.count_solutions(Board()))
+        self.assertEqual(50, solver.count_solutions(Board(), 50))
+        self.assertEqual(0, solver.count_solutions(Board(), 0))
+
+        board.set(0, 0, 0)
+        board.set(0, 3, 0)
+        board.set(4, 0, 0)
+        board.set(4, 3, 0)
+        self.assertEqual(1, solver.count_solutions(board, 10))
+
+        board.set(0, 1, 3)
+        self.assertEqual(0, solver.count_solutions(board))
+
+    def test_count_solutions_with_two(self):
+        """
+        test a puzzle with exactly two solutions (two digits that can swap round a
+        rectangle) counts as two, whatever the limit over that
+        """
+        board = Board.from_oneliner(
+            "396218745150096832280053196415962378928374561763185429672531984831649257549827613"
+        )
+        solver = BitmaskSolver()
+
+        self.assertEqual(1, solver.count_solutions(board, 1))
+        self.assertEqual(2, solver.count_solutions(board))
+        self.assertEqual(2, solver.count_solutions(board, 100))
+
+    def test_solutions(self):
+        """
+        test solutions are yielded lazily, in the board itself, and the board is put
+        back once closed
+        """
+        board = Board.from_oneliner(
+            "396218745150096832280053196415962378928374561763185429672531984831649257549827613"
+        )
+        given = board.copy()
+        solutions = [
+            solution.to_oneliner() for solution in BitmaskSolver().solutions(board)
+        ]
+
+        self.assertEqual(
+            [
+                "396218745154796832287453196415962378928374561763185429672531984831649257549827613",
+                "396218745157496832284753196415962378928374561763185429672531984831649257549827613",
+            ],
+            solutions,
+        )
+        self.assertEqual(given, board)
+
+        board = [[0] * 9 for _ in range(9)]
+        solutions = BitmaskSolver().solutions(board)
+        seen = set()
+        for solution in solutions:
+            self.assertIs(board, solution)
+            seen.add(Run.format_oneliner(solution))
+            if len(seen) == 100:
+                break
+        solutions.close()
+
+        self.assertEqual(100, len(seen))
+        self.assertEqual([[0] * 9 for _ in range(9)], board)
+
+    def test_solve_with_16x16(self):
+        """
+        test solve with a 16x16 puzzle, then a 9x9 on the same solver
+        """
+        puzzle = Board.from_oneliner(
+            "00B020CAF003007000000070B90800020020F001D000800B05D6B0402AC031E0284000F000D5060000E579"
+            "B000001G0CF00100037600A80006090A08C0F00000AB80GC020F0E0D000000040B021000530F0E60008B00"
+            "0200000030006D000BA860509B8000020C31009BA2G0003F0E6004A01F0C0060B009000F500090002400"
+        )
+        board = puzzle.copy()
+        solver = BitmaskSolver()
+
+        self.assertEqual(True, solver.solve(board))
+        self.assert_solution(puzzle, board)
+
+        board = Board()
+        self.assertEqual(True, solver.solve(board))
+        self.assert_solution(Board(), board)
+
+    def test_solve_with_16x16_lists(self):
+        """
+        test a 16x16 list[list[int]] board is written back in place
+        """
+        puzzle = Board.from_oneliner(
+            "00B020CAF003007000000070B90800020020F001D000800B05D6B0402AC031E0284000F000D5060000E579"
+            "B000001G0CF00100037600A80006090A08C0F00000AB80GC020F0E0D000000040B021000530F0E60008B00"
+            "0200000030006D000BA860509B8000020C31009BA2G0003F0E6004A01F0C0060B009000F500090002400"
+        )
+        board = puzzle.to_lists()
+
+        self.assertEqual(True, BitmaskSolver().solve(board))
+        self.assert_solution(puzzle, Board.from_lists(board))
+
+
 if __name__ == "__main__":
     unittest.main()
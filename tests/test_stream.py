@@ -0,0 +1,153 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import io
+import json
+import unittest
+
+from budget import CancellationToken
+from stream import process_stream
+
+EASY = "003020600900305001001806400008102900700000008006708200002609500800203009005010300"
+
+# Needs a search, plain backtracking takes seconds over it
+HARD = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+
+class FlushCounter(io.BytesIO):
+    """Counts the flushes"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+
+
+def stream(requests, **options):
+    """Run requests (dicts, or bytes as is) through, (responses, counts, output)"""
+    lines = [
+        request if isinstance(request, bytes) else json.dumps(request).encode()
+        for request in requests
+    ]
+    out = FlushCounter()
+    counts = process_stream(lines, out, **options)
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    return responses, counts, out
+
+
+class TestStream(unittest.TestCase):
+
+    def test_responses_in_order(self):
+        """
+        test each request gets a response with its id, in order
+        """
+        responses, counts, _ = stream(
+            [
+                {"id": 1, "puzzle": EASY},
+                {"id": "two", "puzzle": HARD, "engine": "dlx"},
+                {"puzzle": "0" * 81},
+            ]
+        )
+
+        self.assertEqual([1, "two", None], [response["id"] for response in responses])
+        self.assertEqual(["solved"] * 3, [response["status"] for response in responses])
+        self.assertEqual(
+            "483921657967345821251876493548132976729564138136798245372689514814253769"
+            "695417382",
+            responses[0]["solution"],
+        )
+        self.assertGreater(responses[1]["operations"], 0)
+        self.assertEqual(3, counts["solved"])
+
+    def test_invalid_requests(self):
+        """
+        test lines that can't be used get an invalid response, the rest carry on
+        """
+        responses, counts, _ = stream(
+            [
+                b"not json",
+                b"",
+                {"id": 2},
+                {"id": 3, "puzzle": EASY, "engine": "cheese"},
+                {"id": 4, "puzzle": "12"},
+                {"id": 5, "puzzle": EASY, "timeout": "soon"},
+                {"id": 6, "puzzle": EASY, "engine": []},
+                {"id": 7, "puzzle": EASY, "engine": {}},
+                {"id": 8, "puzzle": EASY},
+            ]
+        )
+
+        self.assertEqual(
+            [None, 2, 3, 4, 5, 6, 7, 8], [response["id"] for response in responses]
+        )
+        self.assertEqual(7, counts["invalid"])
+        self.assertEqual(1, counts["solved"])
+        self.assertIn("error", responses[0])
+
+    def test_budget(self):
+        """
+        test a request's budget, and the default one
+        """
+        responses, _, _ = stream(
+            [
+                {"id": 1, "puzzle": HARD, "engine": "backtrack", "max_operations": 10},
+                {"id": 2, "puzzle": HARD, "engine": "backtrack"},
+            ],
+            max_operations=100,
+        )
+
+        self.assertEqual(["budget_exceeded"] * 2, [r["status"] for r in responses])
+        self.assertEqual(
+            ["max_operations"] * 2, [response["reason"] for response in responses]
+        )
+        self.assertIsNone(responses[0]["solution"])
+
+    def test_flush_every(self):
+        """
+        test flushing per line, per batch and at the end
+        """
+        requests = [{"id": index, "puzzle": EASY} for index in range(5)]
+
+        self.assertEqual(6, stream(requests)[2].flushes)
+        self.assertEqual(3, stream(requests, flush_every=2)[2].flushes)
+
+    def test_cancel(self):
+        """
+        test a cancelled token stops the stream after the request it's on
+        """
+        token = CancellationToken()
+        token.cancel()
+
+        responses, _, _ = stream(
+            [{"id": 1, "puzzle": HARD}, {"id": 2, "puzzle": EASY}], token=token
+        )
+
+        self.assertEqual(1, len(responses))
+        self.assertEqual("cancelled", responses[0]["reason"])
+
+    def test_unknown_engine(self):
+        """
+        test the default engine is checked up front
+        """
+        with self.assertRaises(ValueError):
+            stream([], engine="cheese")
+
+
+if __name__ == "__main__":
+    unittest.main()
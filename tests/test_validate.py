@@ -0,0 +1,173 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import pickle
+import unittest
+
+from run import Run
+from validate import (
+    DUPLICATE,
+    NO_CANDIDATES,
+    NO_PLACE,
+    InvalidPuzzle,
+    explain_unsolvable,
+    find_conflicts,
+)
+
+
+class TestValidate(unittest.TestCase):
+
+    puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+    def test_valid(self):
+        """
+        test a puzzle with nothing wrong in its givens has no conflicts, on a
+        `Board` or a list[list[int]]
+        """
+        board = Run.parse_oneliner(self.puzzle)
+
+        self.assertEqual([], find_conflicts(board))
+        self.assertEqual([], find_conflicts(board.to_lists()))
+        self.assertEqual([], find_conflicts(Run.parse_oneliner("0" * 81)))
+
+    def test_duplicates(self):
+        """
+        test the same value twice in a row, column and box are each reported with
+        every cell it's in
+        """
+        board = Run.parse_oneliner("5" + "0" * 7 + "5" + "0" * 9 + "5" + "0" * 62)
+
+        self.assertEqual(
+            [
+                {
+                    "reason": DUPLICATE,
+                    "unit": "row 1",
+                    "value": 5,
+                    "cells": ["r1c1", "r1c9"],
+                },
+                {
+                    "reason": DUPLICATE,
+                    "unit": "column 1",
+                    "value": 5,
+                    "cells": ["r1c1", "r3c1"],
+                },
+                {
+                    "reason": DUPLICATE,
+                    "unit": "box 1",
+                    "value": 5,
+                    "cells": ["r1c1", "r3c1"],
+                },
+            ],
+            find_conflicts(board),
+        )
+
+    def test_duplicates_three_times(self):
+        """
+        test a value given three times in a row is one conflict with all three
+        cells
+        """
+        board = Run.parse_oneliner("7007" + "0" * 3 + "7" + "0" * 73)
+
+        self.assertEqual(
+            [["r1c1", "r1c4", "r1c8"]],
+            [conflict["cells"] for conflict in find_conflicts(board)],
+        )
+
+    def test_no_candidates(self):
+        """
+        test an empty cell every value is ruled out of is reported, along with the
+        value that's then got nowhere to go in its row
+        """
+        board = Run.parse_oneliner("12345678" + "0" * 9 + "9" + "0" * 63)
+        conflicts = find_conflicts(board)
+
+        self.assertEqual(
+            {"reason": NO_CANDIDATES, "unit": None, "value": None, "cells": ["r1c9"]},
+            conflicts[0],
+        )
+        self.assertEqual(
+            {"reason": NO_PLACE, "unit": "row 1", "value": 9, "cells": ["r1c9"]},
+            conflicts[1],
+        )
+
+    def test_no_place(self):
+        """
+        test a value with every empty cell of a row or box ruled out is reported,
+        even though each of those cells has candidates
+        """
+        # 1's in rows 2 and 3 and columns 2 and 3 leave r1c1 for the 1 in box 1,
+        # which has a 2 in it. The same 1's cover all of row 1 and column 1 too
+        board = [[0] * 9 for _ in range(9)]
+        board[0][0] = 2
+        board[1][3] = board[2][6] = board[3][1] = board[6][2] = 1
+
+        self.assertEqual(
+            [
+                {
+                    "reason": NO_PLACE,
+                    "unit": "row 1",
+                    "value": 1,
+                    "cells": [f"r1c{column}" for column in range(2, 10)],
+                },
+                {
+                    "reason": NO_PLACE,
+                    "unit": "column 1",
+                    "value": 1,
+                    "cells": [f"r{row}c1" for row in range(2, 10)],
+                },
+                {
+                    "reason": NO_PLACE,
+                    "unit": "box 1",
+                    "value": 1,
+                    "cells": [
+                        f"r{row}c{column}" for row in (1, 2, 3) for column in (1, 2, 3)
+                    ][1:],
+                },
+            ],
+            find_conflicts(board),
+        )
+
+    def test_invalid_puzzle(self):
+        """
+        test an `InvalidPuzzle` is falsy, describes its conflicts and pickles whole
+        """
+        conflicts = find_conflicts(Run.parse_oneliner("11" + "0" * 79))
+        invalid = InvalidPuzzle.from_conflicts(conflicts)
+
+        self.assertEqual(False, bool(invalid))
+        self.assertEqual(
+            "Invalid puzzle, duplicate 1 in row 1 [r1c1 r1c2], "
+            "duplicate 1 in box 1 [r1c1 r1c2]",
+            str(invalid),
+        )
+
+        copy = pickle.loads(pickle.dumps(invalid))
+        self.assertEqual(str(invalid), str(copy))
+        self.assertEqual(conflicts, copy.conflicts)
+
+    def test_explain_unsolvable(self):
+        """
+        test an unsolvable board is only invalid if its givens show why
+        """
+        self.assertIsInstance(
+            explain_unsolvable(Run.parse_oneliner("11" + "0" * 79)), InvalidPuzzle
+        )
+        self.assertEqual(False, explain_unsolvable(Run.parse_oneliner(self.puzzle)))
+
+
+if __name__ == "__main__":
+    unittest.main()
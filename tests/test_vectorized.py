@@ -0,0 +1,82 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import unittest
+
+from run import Run
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "numpy isn't installed")
+class TestVectorizedBatchSolver(unittest.TestCase):
+
+    puzzles = [
+        "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+        "3..2.87...5..96832.8.7....641.....78.2..745..7.31854....2531..4.3164..5...9...61.",
+        "110000000000000000000000000000000000000000000000000000000000000000000000000000000",
+        "802000640043080005000000280057030896300800001000009030501900008408520000790008000",
+        "000000000000000000000000000000000000000000000000000000000000000000000000000000000",
+    ]
+
+    def test_solve_boards_matches_engine(self):
+        """
+        test that the block solve gives the same results and boards as solving
+        each puzzle on its own
+        """
+        from vectorized import VectorizedBatchSolver
+
+        boards = [Run.parse_oneliner(puzzle) for puzzle in self.puzzles]
+        results = VectorizedBatchSolver().solve_boards(boards)
+
+        for puzzle, result, board in zip(self.puzzles, results, boards):
+            expected = Run.parse_oneliner(puzzle)
+            # Same status rather than equal, the duplicate givens are an
+            # `InvalidPuzzle` either way
+            self.assertEqual(Run.status(Run().solve(expected)), Run.status(result))
+            self.assertEqual(expected, board)
+
+    def test_process_with_propagation_only(self):
+        """
+        test that an easy puzzle is finished without the per-puzzle engine and an
+        invalid line doesn't stop the block
+        """
+        from vectorized import VectorizedBatchSolver
+
+        solver = VectorizedBatchSolver()
+        results = list(solver.process([self.puzzles[1], "cheese"]))
+
+        self.assertEqual(
+            [
+                (
+                    0,
+                    True,
+                    "396218745157496832284753196415962378928374561763185429672531984831649257549827613",
+                ),
+                (1, None, None),
+            ],
+            results,
+        )
+        self.assertEqual(1, solver.propagation_only_count)
+        self.assertEqual(0, solver.searched_puzzle_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from packed import PackedReader
+from run import Run
+from writer import ResultWriter, squish
+
+
+class TestWriter(unittest.TestCase):
+
+    puzzle = "043890507070054002100003000830010020092560000017930854500346070760020300001705640"
+    solution = "243891567978654132156273498835417926492568713617932854589346271764129385321785649"
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, "solutions")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, format, puzzle=None):
+        with ResultWriter(self.file_name, format) as writer:
+            writer.write(self.solution, puzzle or self.puzzle, 0)
+            writer.write(self.solution, puzzle or self.puzzle, 1)
+
+        with open(self.file_name) as file:
+            return file.read().splitlines()
+
+    def test_oneliner(self):
+        """
+        test each solution is written on its own line
+        """
+        self.assertEqual([self.solution, self.solution], self.write("oneliner"))
+
+    def test_csv(self):
+        """
+        test the rows are puzzle,solution under a header, a comma seperated puzzle
+        is squished first
+        """
+        self.assertEqual(
+            ["puzzle,solution"] + [f"{self.puzzle},{self.solution}"] * 2,
+            self.write("csv", ",".join(self.puzzle.replace("0", "."))),
+        )
+
+    def test_jsonl(self):
+        """
+        test each line is a JSON object with the index, puzzle and solution
+        """
+        self.assertEqual(
+            [
+                {"index": index, "puzzle": self.puzzle, "solution": self.solution}
+                for index in (0, 1)
+            ],
+            [json.loads(line) for line in self.write("jsonl")],
+        )
+
+    def test_diff(self):
+        """
+        test only the cells that were filled in are written, and they fill in the
+        puzzle to the solution
+        """
+        lines = self.write("diff")
+
+        cells = list(self.puzzle)
+        for filled in lines[0].split():
+            name, value = filled.split("=")
+            row, column = map(int, name[1:].split("c"))
+            cells[(row - 1) * 9 + column - 1] = value
+
+        self.assertEqual(self.puzzle.count("0"), len(lines[0].split()))
+        self.assertEqual("r1c1=2", lines[0].split()[0])
+        self.assertEqual(self.solution, "".join(cells))
+
+    def test_diff_16x16(self):
+        """
+        test values from 10 up are written as numbers, not letters
+        """
+        solution = Run.format_oneliner(
+            [
+                [(row * 4 + row // 4 + column) % 16 + 1 for column in range(16)]
+                for row in range(16)
+            ]
+        )
+        puzzle = "0" + solution[1:]
+
+        with ResultWriter(self.file_name, "diff") as writer:
+            writer.write(solution[16:] + solution[:16], puzzle[16:] + puzzle[:16])
+            writer.write(solution, puzzle)
+
+        with open(self.file_name) as file:
+            self.assertEqual(["r16c1=1", "r1c1=1"], file.read().splitlines())
+
+    def test_packed(self):
+        """
+        test solutions are written as packed records marked as solutions
+        """
+        with ResultWriter(self.file_name, "packed") as writer:
+            writer.write(self.solution, self.puzzle, 0)
+
+        with PackedReader(self.file_name) as reader:
+            self.assertEqual(True, reader.solutions)
+            self.assertEqual([self.solution], list(reader.oneliners()))
+
+    def test_packed_without_file(self):
+        """
+        test packed can't go to stdout, and only holds 9x9 boards
+        """
+        with self.assertRaises(ValueError):
+            ResultWriter(None, "packed")
+
+        with ResultWriter(self.file_name, "packed") as writer:
+            with self.assertRaises(ValueError):
+                writer.write("1" * 256)
+
+    def test_unknown_format(self):
+        """
+        test an unknown format is refused
+        """
+        with self.assertRaises(ValueError):
+            ResultWriter(self.file_name, "xml")
+
+    def test_needs_puzzle(self):
+        """
+        test the formats that write the puzzle refuse a solution without it
+        """
+        for format, needs_puzzle in (
+            ("oneliner", False),
+            ("csv", True),
+            ("jsonl", True),
+            ("diff", True),
+        ):
+            with ResultWriter(self.file_name, format) as writer:
+                self.assertEqual(needs_puzzle, writer.needs_puzzle)
+                if needs_puzzle:
+                    with self.assertRaises(ValueError):
+                        writer.write(self.solution)
+
+    def test_buffered(self):
+        """
+        test nothing is written until there's a buffer's worth, then it's all
+        written at once
+        """
+        writer = ResultWriter(self.file_name, buffer_size=3 * 82)
+
+        writer.write(self.solution)
+        writer.write(self.solution)
+        self.assertEqual(0, os.path.getsize(self.file_name))
+
+        writer.write(self.solution)
+        self.assertEqual(3 * 82, os.path.getsize(self.file_name))
+
+        writer.write(self.solution)
+        writer.close()
+        self.assertEqual(4 * 82, os.path.getsize(self.file_name))
+        self.assertEqual(4, writer.count)
+
+    def test_squish(self):
+        """
+        test puzzles come out one character per cell with 0's for unsolved
+        """
+        self.assertEqual(self.puzzle, squish(self.puzzle.replace("0", ".")))
+        self.assertEqual(self.puzzle, squish(",".join(self.puzzle)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,283 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from math import isqrt
+
+from board import Board
+from solver import get_geometry
+
+# Why a puzzle can't be solved, seen from the givens alone
+#   duplicate - the same value given twice in a row, column or box
+#   no_candidates - an empty cell every value is ruled out of
+#   no_place - a value missing from a row, column or box that can't go in any of
+#     its empty cells
+DUPLICATE = "duplicate"
+NO_CANDIDATES = "no_candidates"
+NO_PLACE = "no_place"
+
+UNIT_KINDS = ("row", "column", "box")
+
+
+class InvalidPuzzle(ValueError):
+    """
+    A puzzle that can't be read, or can be seen to have no solution without
+    searching for one
+
+    Raised when reading a puzzle, and handed back by `Run.solve()` as the outcome
+    of the solve instead of searching. It's falsy like `BudgetExceeded`, so code
+    only asking "was it solved?" still gets the right answer
+    """
+
+    def __init__(self, message, conflicts=()) -> None:
+        """
+        Parameters
+        ----------
+        message : str
+            What's wrong with it
+        conflicts : list[dict], default=()
+            From `find_conflicts()`, empty if it couldn't be read at all
+        """
+        # Both in args so it pickles whole, on its way back from a worker
+        super().__init__(message, list(conflicts))
+        self.message = message
+        self.conflicts = list(conflicts)
+
+    def __bool__(self):
+        return False
+
+    def __str__(self):
+        return self.message
+
+    @classmethod
+    def from_conflicts(cls, conflicts):
+        """Describe the conflicts found in a puzzle
+
+        Parameters
+        ----------
+        conflicts : list[dict]
+            From `find_conflicts()`, at least one
+
+        Return
+        ------
+        InvalidPuzzle
+        """
+        return cls(
+            "Invalid puzzle, " + ", ".join(map(format_conflict, conflicts)), conflicts
+        )
+
+
+def cell_name(cell, size):
+    """Name of a cell in row/column notation, counting from 1
+
+    Parameters
+    ----------
+    cell : int
+        Flat cell number, row * size + column
+    size : int
+        9 for a 9x9 board
+
+    Return
+    ------
+    str
+        e.g. r1c3
+    """
+    return f"r{cell // size + 1}c{cell % size + 1}"
+
+
+def format_conflict(conflict):
+    """One conflict as text
+
+    Parameters
+    ----------
+    conflict : dict
+        From `find_conflicts()`
+
+    Return
+    ------
+    str
+        e.g. "duplicate 5 in row 1 [r1c2 r1c7]"
+    """
+    cells = " ".join(conflict["cells"])
+
+    if conflict["reason"] == DUPLICATE:
+        return f"duplicate {conflict['value']} in {conflict['unit']} [{cells}]"
+
+    if conflict["reason"] == NO_PLACE:
+        return f"nowhere for {conflict['value']} in {conflict['unit']} [{cells}]"
+
+    return f"no candidates for [{cells}]"
+
+
+def find_conflicts(board):
+    """Check a puzzle's givens, in one pass over the cells and one over the empty
+    ones. Duplicate givens are looked for first, if there aren't any then every
+    empty cell has to have a candidate and every missing value has to have an
+    empty cell it can go in, in each row, column and box
+
+    Parameters
+    ----------
+    board : Board or list[list[int]]
+        0's are for unsolved
+
+    Return
+    ------
+    list[dict]
+        One per conflict - reason (`DUPLICATE`, `NO_CANDIDATES` or `NO_PLACE`),
+        unit (e.g. "row 1", None for `NO_CANDIDATES`), value (None for
+        `NO_CANDIDATES`) and cells (the names of the cells involved, e.g.
+        ["r1c2", "r1c7"]). Empty if nothing's wrong that can be seen from the
+        givens
+    """
+    if isinstance(board, Board):
+        cells = board.cells
+        box_size = board.box_size
+    else:
+        cells = [value for row in board for value in row]
+        box_size = isqrt(len(board))
+
+    geometry = get_geometry(box_size)
+    size = geometry.size
+    cell_row = geometry.cell_row
+    cell_column = geometry.cell_column
+    cell_box = geometry.cell_box
+    row_masks = [0] * size
+    column_masks = [0] * size
+    box_masks = [0] * size
+    empty_cells = []
+    duplicates = {}
+
+    for cell, value in enumerate(cells):
+        if not value:
+            empty_cells.append(cell)
+            continue
+
+        bit = 1 << value
+        row = cell_row[cell]
+        column = cell_column[cell]
+        box = cell_box[cell]
+
+        if (row_masks[row] | column_masks[column] | box_masks[box]) & bit:
+            # Only ever done for a duplicate, find who it clashes with
+            for kind, unit, mask in (
+                (0, row, row_masks[row]),
+                (1, column, column_masks[column]),
+                (2, box, box_masks[box]),
+            ):
+                if mask & bit:
+                    clashes = duplicates.setdefault((kind, unit, value), [])
+                    if not clashes:
+                        clashes.extend(
+                            other
+                            for other in geometry.units[kind * size + unit]
+                            if other < cell and cells[other] == value
+                        )
+                    clashes.append(cell)
+
+        row_masks[row] |= bit
+        column_masks[column] |= bit
+        box_masks[box] |= bit
+
+    if duplicates:
+        return [
+            {
+                "reason": DUPLICATE,
+                "unit": f"{UNIT_KINDS[kind]} {unit + 1}",
+                "value": value,
+                "cells": [cell_name(cell, size) for cell in clashes],
+            }
+            for (kind, unit, value), clashes in sorted(duplicates.items())
+        ]
+
+    conflicts = []
+    all_digits = geometry.all_digits_mask
+    # Values that can go in an empty cell of each row, column and box
+    row_places = [0] * size
+    column_places = [0] * size
+    box_places = [0] * size
+
+    for cell in empty_cells:
+        row = cell_row[cell]
+        column = cell_column[cell]
+        box = cell_box[cell]
+        used = row_masks[row] | column_masks[column] | box_masks[box]
+        candidates = all_digits & ~used
+
+        if not candidates:
+            conflicts.append(
+                {
+                    "reason": NO_CANDIDATES,
+                    "unit": None,
+                    "value": None,
+                    "cells": [cell_name(cell, size)],
+                }
+            )
+            continue
+
+        row_places[row] |= candidates
+        column_places[column] |= candidates
+        box_places[box] |= candidates
+
+    for kind, (masks, places) in enumerate(
+        (
+            (row_masks, row_places),
+            (column_masks, column_places),
+            (box_masks, box_places),
+        )
+    ):
+        for unit in range(size):
+            missing = all_digits & ~(masks[unit] | places[unit])
+            if not missing:
+                continue
+
+            empty = [
+                cell_name(cell, size)
+                for cell in geometry.units[kind * size + unit]
+                if not cells[cell]
+            ]
+            for value in range(1, size + 1):
+                if missing >> value & 1:
+                    conflicts.append(
+                        {
+                            "reason": NO_PLACE,
+                            "unit": f"{UNIT_KINDS[kind]} {unit + 1}",
+                            "value": value,
+                            "cells": empty,
+                        }
+                    )
+
+    return conflicts
+
+
+def explain_unsolvable(board):
+    """The outcome for a board an engine couldn't solve, `InvalidPuzzle` if the
+    givens show why so it's reported the same whichever engine found it
+
+    Parameters
+    ----------
+    board : Board or list[list[int]]
+        As given, the engines leave an unsolvable board how it was
+
+    Return
+    ------
+    InvalidPuzzle or bool
+        False if nothing can be seen wrong with the givens, it's just unsolvable
+    """
+    conflicts = find_conflicts(board)
+    if conflicts:
+        return InvalidPuzzle.from_conflicts(conflicts)
+
+    return False
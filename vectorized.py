@@ -0,0 +1,360 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from itertools import islice
+
+from board import Board
+from budget import solve_within
+from metrics import Metrics, instrument
+from run import Run, ENGINES
+from solver import UNITS
+from validate import explain_unsolvable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class VectorizedBatchSolver:
+    """
+    Solves puzzles a block at a time with NumPy, the whole block is held as one
+    (N, 9, 9) array and naked/hidden singles are filled in for every puzzle at
+    once. Only the puzzles left unfinished by that go through a normal per-puzzle
+    engine
+
+    NumPy is an optional dependency, only needed if this is used
+    """
+
+    def __init__(
+        self, engine="bitmask", block_size=4096, budget=None, metrics=False
+    ) -> None:
+        """
+        Parameters
+        ----------
+        engine : str, default='bitmask'
+            Name of the engine in `ENGINES` to finish off puzzles that need a search
+        block_size : int, default=4096
+            How many puzzles to load into each array when processing a stream
+        budget : Budget, default=None
+            If not None, limits each puzzle that needs the per-puzzle engine, the
+            vectorized part always finishes
+        metrics : bool, default=False
+            Count the work done into `metrics`, cells filled in by the vectorized
+            part count as propagations
+
+        Raises
+        ------
+        RuntimeError
+            If NumPy isn't installed
+        ValueError
+            If the engine isn't known
+        """
+        if numpy is None:
+            raise RuntimeError(
+                "The vectorized solver needs numpy, pip install numpy to use it"
+            )
+
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown engine [{engine}], choose from [{', '.join(ENGINES)}]"
+            )
+
+        self.solver = ENGINES[engine]()
+        self.block_size = block_size
+        self.budget = budget
+        self.operation_count = 0
+        self.metrics = None
+
+        if metrics:
+            self.metrics = instrument(self.solver, Metrics())
+
+        # Cells that fill by propagation alone vs needed the per-puzzle engine
+        self.propagation_only_count = 0
+        self.searched_puzzle_count = 0
+
+        self.units = numpy.array(UNITS, dtype=numpy.intp)
+
+        # The three units (row, column, box) each cell belongs to
+        cell_units = [[] for _ in range(81)]
+        for unit_number, unit in enumerate(UNITS):
+            for cell in unit:
+                cell_units[cell].append(unit_number)
+        self.cell_units = numpy.array(cell_units, dtype=numpy.intp)
+
+        # Lookups over every 10 bit mask, how many bits are set and which digit a
+        # single bit mask is
+        masks = numpy.arange(1024)
+        self.popcount = numpy.zeros(1024, dtype=numpy.int8)
+        self.single_digit = numpy.zeros(1024, dtype=numpy.int8)
+        for digit in range(1, 10):
+            self.popcount += ((masks >> digit) & 1).astype(numpy.int8)
+            self.single_digit[1 << digit] = digit
+
+        self.digit_bits = (1 << numpy.arange(1, 10)).astype(numpy.uint16)
+
+    def get_candidates(self, grid):
+        """Candidate masks for every cell of every puzzle
+
+        Parameters
+        ----------
+        grid : numpy.ndarray
+            (N, 81) digits, 0 for unsolved
+
+        Return
+        ------
+        tuple
+            (candidates, unit_used, valid) - (N, 81) candidate bitmasks with 0 for
+            filled cells, (N, 27) digits used in each unit and (N,) False for any
+            puzzle with a digit twice in a unit
+        """
+        bits = numpy.where(
+            grid > 0, numpy.left_shift(numpy.uint16(1), grid.astype(numpy.uint16)), 0
+        ).astype(numpy.uint16)
+        unit_bits = bits[:, self.units]
+
+        unit_used = numpy.bitwise_or.reduce(unit_bits, axis=2)
+
+        # Distinct powers of two sum to the same as or'ing them, unless one repeats
+        valid = (unit_bits.sum(axis=2, dtype=numpy.uint32) == unit_used).all(axis=1)
+
+        used = numpy.bitwise_or.reduce(unit_used[:, self.cell_units], axis=2)
+        candidates = numpy.where(grid == 0, ~used & 0b1111111110, 0).astype(
+            numpy.uint16
+        )
+
+        return candidates, unit_used, valid
+
+    def propagate(self, grid):
+        """Fill naked and hidden singles across the whole block until nothing changes
+
+        Parameters
+        ----------
+        grid : numpy.ndarray
+            (N, 81) digits, 0 for unsolved, updated in place
+
+        Return
+        ------
+        numpy.ndarray
+            (N,) False for every puzzle that hit a contradiction
+        """
+        alive = numpy.ones(len(grid), dtype=bool)
+        active = numpy.arange(len(grid))
+
+        while len(active):
+            block = grid[active]
+            candidates, unit_used, valid = self.get_candidates(block)
+            counts = self.popcount[candidates]
+            empty = block == 0
+
+            # Per unit, how many cells could take each digit
+            unit_candidates = candidates[:, self.units]
+            digit_places = (
+                (unit_candidates[..., None] & self.digit_bits) != 0
+            ).sum(axis=2)
+            digit_used = (unit_used[..., None] & self.digit_bits) != 0
+
+            # Cell with no options left, or a digit with nowhere to go
+            dead = (
+                ~valid
+                | (empty & (counts == 0)).any(axis=1)
+                | ((digit_places == 0) & ~digit_used).any(axis=(1, 2))
+            )
+
+            # Naked singles
+            naked = empty & (counts == 1)
+            block[naked] = self.single_digit[candidates[naked]]
+
+            # Hidden singles, only into cells the naked singles didn't just fill
+            hidden = (digit_places == 1) & ~digit_used
+            puzzle, unit, digit = numpy.nonzero(hidden)
+            if len(puzzle):
+                place = (
+                    unit_candidates[puzzle, unit] & self.digit_bits[digit][:, None]
+                ).argmax(axis=1)
+                cell = self.units[unit, place]
+                free = block[puzzle, cell] == 0
+                block[puzzle[free], cell[free]] = digit[free] + 1
+
+            changed = (block != grid[active]).any(axis=1) & ~dead
+            alive[active[dead]] = False
+            grid[active] = block
+            active = active[changed]
+
+        # Whatever filled last may have clashed, check once more
+        alive &= self.get_candidates(grid)[2]
+        return alive
+
+    @staticmethod
+    def set_cells(board, cells):
+        """Overwrite every cell of a board
+
+        @staticmethod
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+        cells : bytes
+            81 cell values
+        """
+        if isinstance(board, Board):
+            board.cells[:] = cells
+            return
+
+        for row in range(9):
+            board[row][:] = cells[row * 9 : row * 9 + 9]
+
+    def solve_boards(self, boards):
+        """Solve a list of boards in place, same outcome as calling `solve()` on the
+        per-puzzle engine for each one
+
+        Only 9x9 boards are vectorized, bigger boards are handed straight to the
+        per-puzzle engine
+
+        Parameters
+        ----------
+        boards : list[Board]
+            0's are for unsolved, list[list[int]] boards work too but `Board`s are
+            loaded straight from their buffers
+
+        Return
+        ------
+        list[bool]
+            Result of each solve, a `BudgetExceeded` for a board left as given
+            because it ran out of budget, an `InvalidPuzzle` for one whose givens
+            conflict
+        """
+        if not boards:
+            return []
+
+        if any(len(board) != 9 for board in boards):
+            results = iter(
+                self.solve_boards([board for board in boards if len(board) == 9])
+            )
+            return [
+                next(results) if len(board) == 9 else self.search_board(board)
+                for board in boards
+            ]
+
+        # The bytes of every board end to end are the (N, 81) array
+        given = [
+            bytes(board.cells)
+            if isinstance(board, Board)
+            else bytes(value for row in board for value in row)
+            for board in boards
+        ]
+        grid = numpy.frombuffer(b"".join(given), dtype=numpy.int8)
+        grid = grid.reshape(len(boards), 81).copy()
+
+        if self.metrics is not None:
+            given_count = numpy.count_nonzero(grid, axis=1)
+
+        alive = self.propagate(grid)
+        complete = (grid != 0).all(axis=1)
+
+        if self.metrics is not None:
+            filled = numpy.count_nonzero(grid, axis=1) - given_count
+            self.metrics.propagations += int(filled[alive].sum())
+
+        results = []
+        for index, board in enumerate(boards):
+            if not alive[index]:
+                # Leave the board as given, like the engines do for unsolvable
+                results.append(explain_unsolvable(board))
+                continue
+
+            self.set_cells(board, grid[index].tobytes())
+
+            if complete[index]:
+                self.propagation_only_count += 1
+                results.append(True)
+                continue
+
+            result = self.search_board(board)
+
+            if not result:
+                self.set_cells(board, given[index])
+
+            if result is False:
+                result = explain_unsolvable(board)
+
+            results.append(result)
+
+        return results
+
+    def search_board(self, board):
+        """Finish a board off with the per-puzzle engine
+
+        Parameters
+        ----------
+        board : Board or list[list[int]]
+
+        Return
+        ------
+        bool or BudgetExceeded
+            Result of the solve
+        """
+        self.searched_puzzle_count += 1
+        result = solve_within(self.solver, board, self.budget)
+        if self.budget is not None:
+            self.operation_count += self.budget.operations
+
+        return result
+
+    def process(self, lines):
+        """Solve every puzzle in `lines`, a block at a time
+
+        Parameters
+        ----------
+        lines : iterable[str]
+            Puzzles, one per line in either oneliner format, blank lines are skipped
+
+        Yield
+        -----
+        tuple
+            (index, True/False, oneliner solution) - same as
+            `ParallelRunner.process()`, result and solution are None for a puzzle
+            that isn't valid, result is a `BudgetExceeded` for one that ran out of
+            budget
+        """
+        puzzles = (line.strip() for line in lines)
+        puzzles = (puzzle for puzzle in puzzles if puzzle)
+        index = 0
+
+        while True:
+            block = list(islice(puzzles, self.block_size))
+            if not block:
+                break
+
+            boards = []
+            positions = []
+            for position, puzzle in enumerate(block):
+                try:
+                    boards.append(Run.parse_oneliner(puzzle))
+                    positions.append(position)
+                except (RuntimeError, ValueError):
+                    continue
+
+            outcome = [(None, None)] * len(block)
+            for position, board, result in zip(
+                positions, boards, self.solve_boards(boards)
+            ):
+                outcome[position] = (result, Run.format_oneliner(board))
+
+            for result, solution in outcome:
+                yield index, result, solution
+                index += 1
@@ -0,0 +1,309 @@
+"""
+    Copyright (C) 2024  Lui Crowie (@crowz-fx)
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import sys
+
+from options import FORMATS, DEFAULT_FORMAT, DEFAULT_OUTPUT_FILE
+from run import Run
+
+# Characters held before they're written, one write per this much output means
+# writing never gets in the way of solving even at tens of thousands a second
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+# Oneliner character to the number written in the diff format, A=10...
+DIFF_VALUES = {
+    character: str(int(character, 36))
+    for character in "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+}
+
+# "r1c1=", "r1c2="... for each number of cells, made the first time they're needed
+CELL_NAMES = {}
+
+
+def squish(puzzle):
+    """Puzzle as one character per cell, for comparing with its solution
+
+    Parameters
+    ----------
+    puzzle : str
+        In either oneliner format, see `Run.parse_oneliner()`
+
+    Return
+    ------
+    str
+        0's for unsolved, the same string if it's already like that
+    """
+    if "," in puzzle:
+        return Run.format_oneliner(Run.parse_oneliner(puzzle))
+
+    return puzzle.replace(".", "0")
+
+
+def cell_names(cell_count):
+    """Prefix for each cell in the diff format, rows and columns count from 1
+
+    Parameters
+    ----------
+    cell_count : int
+        81 for a 9x9 board
+
+    Return
+    ------
+    tuple[str]
+        "r1c1=", "r1c2="... one per cell
+    """
+    if cell_count not in CELL_NAMES:
+        size = round(cell_count**0.5)
+        CELL_NAMES[cell_count] = tuple(
+            f"r{cell // size + 1}c{cell % size + 1}=" for cell in range(cell_count)
+        )
+
+    return CELL_NAMES[cell_count]
+
+
+class ResultWriter:
+    """
+    Writes solutions to a file or stdout in one of `FORMATS`, holding them in
+    memory until there's `buffer_size` worth so each write to the file is a big one
+
+    Usage
+    -----
+    with ResultWriter("solutions.csv", "csv") as writer:
+        writer.write(solution, puzzle)
+    """
+
+    def __init__(
+        self, file_name=None, format=DEFAULT_FORMAT, buffer_size=DEFAULT_BUFFER_SIZE
+    ) -> None:
+        """
+        Parameters
+        ----------
+        file_name : str, default=None
+            Relative path and name of file to write to, None for stdout
+        format : str, default='oneliner'
+            One of `FORMATS`
+        buffer_size : int, default=1048576
+            Characters to hold before writing them out, 0 writes every solution
+            straight away
+
+        Raises
+        ------
+        ValueError
+            If the format isn't known, or is packed without a file name
+        """
+        if format not in FORMATS:
+            raise ValueError(
+                f"Unknown format [{format}], choose from [{', '.join(FORMATS)}]"
+            )
+
+        self.file_name = file_name
+        self.format = format
+        self.buffer_size = buffer_size
+        self.count = 0
+        self.lines = []
+        self.buffered = 0
+        self.file = None
+        self.packed = None
+
+        if format == "packed":
+            if file_name is None:
+                raise ValueError("Packed output needs a file name, not stdout")
+
+            from packed import PackedWriter
+
+            self.packed = PackedWriter(file_name, solutions=True)
+            return
+
+        self.format_line = getattr(self, f"format_{format}")
+        self.file = sys.stdout if file_name is None else open(file_name, "w")
+
+        if format == "jsonl":
+            # Only loaded if it's used, see `headless benchmark --startup`
+            import json
+
+            self.dumps = json.dumps
+        elif format == "csv":
+            self.add("puzzle,solution\n")
+
+    @property
+    def needs_puzzle(self):
+        """Whether `write()` has to be given the puzzle as well as its solution
+
+        Return
+        ------
+        bool
+        """
+        return self.format in ("csv", "jsonl", "diff")
+
+    def write(self, solution, puzzle=None, index=None):
+        """Add a solution, written out once the buffer is full
+
+        Parameters
+        ----------
+        solution : str
+            Oneliner of the solved (or as far as it got) board
+        puzzle : str, default=None
+            The puzzle it's the solution to, in either oneliner format, only
+            needed if `needs_puzzle`
+        index : int, default=None
+            Where the puzzle was in the batch, only written in JSON lines
+
+        Raises
+        ------
+        ValueError
+            If the puzzle is needed and not given, or a packed solution isn't 9x9
+        """
+        self.count += 1
+
+        if self.packed is not None:
+            if len(solution) != 81:
+                raise ValueError(
+                    f"Packed files only hold 9x9 boards, not [{len(solution)}] cells"
+                )
+
+            self.packed.write_oneliner(solution)
+            return
+
+        if puzzle is None and self.needs_puzzle:
+            raise ValueError(f"The [{self.format}] format needs the puzzle too")
+
+        self.add(self.format_line(solution, puzzle, index))
+
+    def add(self, text):
+        """Hold text to be written, writing everything held once it's enough
+
+        Parameters
+        ----------
+        text : str
+        """
+        self.lines.append(text)
+        self.buffered += len(text)
+
+        if self.buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write out everything held, in one write"""
+        if self.packed is not None:
+            self.packed.file.flush()
+            return
+
+        if self.lines:
+            self.file.write("".join(self.lines))
+            self.file.flush()
+            self.lines.clear()
+            self.buffered = 0
+
+    def close(self):
+        """Flush and close the file, stdout is flushed but left open"""
+        if self.packed is not None:
+            self.packed.close()
+            return
+
+        self.flush()
+        if self.file is not sys.stdout:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def format_oneliner(solution, puzzle, index):
+        """Line for the oneliner format
+
+        @staticmethod
+
+        Parameters
+        ----------
+        solution : str
+        puzzle : str
+        index : int
+
+        Return
+        ------
+        str
+        """
+        return solution + "\n"
+
+    @staticmethod
+    def format_csv(solution, puzzle, index):
+        """Row for the csv format, puzzle then solution
+
+        @staticmethod
+
+        Parameters
+        ----------
+        solution : str
+        puzzle : str
+        index : int
+
+        Return
+        ------
+        str
+        """
+        return f"{squish(puzzle)},{solution}\n"
+
+    def format_jsonl(self, solution, puzzle, index):
+        """Line for the JSON lines format
+
+        Parameters
+        ----------
+        solution : str
+        puzzle : str
+        index : int
+
+        Return
+        ------
+        str
+        """
+        return (
+            self.dumps({"index": index, "puzzle": squish(puzzle), "solution": solution})
+            + "\n"
+        )
+
+    @staticmethod
+    def format_diff(solution, puzzle, index):
+        """Line for the diff format, rows and columns count from 1 and values from
+        10 up are written as numbers
+
+        @staticmethod
+
+        Parameters
+        ----------
+        solution : str
+        puzzle : str
+        index : int
+
+        Return
+        ------
+        str
+        """
+        names = cell_names(len(solution))
+
+        return (
+            " ".join(
+                [
+                    name + DIFF_VALUES[value]
+                    for name, given, value in zip(names, squish(puzzle), solution)
+                    if given == "0" and value != "0"
+                ]
+            )
+            + "\n"
+        )